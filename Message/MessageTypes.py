@@ -10,4 +10,11 @@ class Type(Enum):
     REQUEST = 'request'
     PING = 'ping'
     REGISTER = 'register'
+    TX_STATUS = 'tx_status'
+    CLOSE_CASE = 'close_case'
+    OPEN_CASES = 'open_cases'
+    ADD_ITEMS = 'add_items'
+    GET_ITEMS = 'get_items'
+    BATCH = 'batch'
+    CURRENT_LEADER = 'current_leader'
 
@@ -2,11 +2,13 @@
 Sanic app.
 """
 import argparse
-from threading import Thread
+import os
+from functools import partial
 
 import sanic
 from sanic import response, request
 from sanic.exceptions import ServerError
+from sanic.worker.loader import AppLoader
 
 from sanic_ext import openapi
 from sanic_ext import validate
@@ -26,11 +28,39 @@ from .daemonize import daemonize
 
 from .node_connection import want_to_become_expert_in_field
 from .node_connection import check_expert_in_field
+from .node_connection import open_expert_case
 from .node_connection import get_open_expert_cases
+from .node_connection import get_current_leader
 from .node_connection import add_item
+from .node_connection import add_items
 from .node_connection import get_items
-
-from .node_connection_client import NodeConnectionClient
+from .node_connection import get_transaction_status
+from .node_connection import MAX_TX_WAIT
+
+from .pagination import CASES_PAGE_SIZE
+from .pagination import ITEMS_PAGE_SIZE
+from .pagination import StaleCursor
+from .pagination import case_pages
+from .pagination import check_cases_version
+from .pagination import decode_cursor
+from .pagination import item_pages
+from .pagination import next_cases_cursor
+from .pagination import next_items_cursor
+from .pagination import stream_ndjson
+from .pagination import wants_ndjson
+
+from .batch import MAX_OPERATIONS
+from .batch import run_batch
+
+from .node_connection_pool import NodeConnectionPool
+from .token_cache import TokenCache
+from .key_cache import PublicKeyCache
+from .crypto_pool import CryptoPool
+from .challenge import ReplayFilter
+from .key_store import KeyStore
+from .response_cache import ResponseCache
+from .shared_state import start_shared_state
+from .shared_state import stop_shared_state
 
 
 __version__ = '1.0.0'
@@ -42,6 +72,16 @@ def get_args():
                                  help='ip address to bind to')
     argument_parser.add_argument('-p', '--port', type=int, default=1234, help='port number')
     argument_parser.add_argument('-bg', '--background', action='store_true', help='run as deamon')
+    argument_parser.add_argument('--production', action='store_true',
+                                 help='run several workers without debug, implies --stateless-challenges')
+    argument_parser.add_argument('-w', '--workers', type=int, default=os.cpu_count(),
+                                 help='number of workers in production mode (default: number of cores)')
+    argument_parser.add_argument('--stateless-challenges', action='store_true',
+                                 help='sign login challenges instead of storing them')
+    argument_parser.add_argument('--crypto-workers', type=int, default=None,
+                                 help='threads for RSA operations (default: number of cores)')
+    argument_parser.add_argument('--node-connections', type=int, default=NodeConnectionPool.SIZE,
+                                 help=f'connections with the Node per worker (default: {NodeConnectionPool.SIZE})')
     argument_parser.add_argument('--version', action='version', version=f'app {__version__}')
 
     return argument_parser.parse_args()
@@ -62,6 +102,16 @@ def attach_endpoints(app):
         + f"Version: {__version__}\n"
         )
 
+    @app.get('/metrics')
+    async def handle_metrics(request: request.Request):
+        return response.json({
+            "token_cache": app.ctx.token_cache.stats(),
+            "public_key_cache": app.ctx.public_key_cache.stats(),
+            "crypto_pool": app.ctx.crypto_pool.stats(),
+            "response_cache": app.ctx.response_cache.stats(),
+            "node_connections": app.ctx.node_connection_client.stats(),
+        })
+
 
     # Authentication and registration
     @app.route('/register', methods=["POST"])
@@ -74,8 +124,8 @@ def attach_endpoints(app):
         }
     )
     @validate(json=ValidUser)
-    def handle_register(request, body: ValidUser):
-        return register(app.ctx.node_connection_client, body)
+    async def handle_register(request, body: ValidUser):
+        return await register(app.ctx.node_connection_client, request, body)
 
     @app.route('/challenge', methods=["POST"])
     @openapi.definition(
@@ -87,8 +137,8 @@ def attach_endpoints(app):
         }
     )
     @validate(json=ValidChallengeRequest)
-    def handle_challenge(request, body: ValidChallengeRequest):
-        return generate_challenge(app.ctx.node_connection_client, request, body)
+    async def handle_challenge(request, body: ValidChallengeRequest):
+        return await generate_challenge(app.ctx.node_connection_client, request, body)
 
     @app.route('/auth', methods=["POST"])
     @openapi.definition(
@@ -101,13 +151,13 @@ def attach_endpoints(app):
         }
     )
     @validate(json=ValidAuthRequest)
-    def handle_authentication(request, body: ValidAuthRequest):
-        return authenticate(app.ctx.node_connection_client, request, body)
+    async def handle_authentication(request, body: ValidAuthRequest):
+        return await authenticate(app.ctx.node_connection_client, request, body)
 
     # Becoming expert
     @app.post('/expert/become')
     @protected
-    def handle_become_expert(request):
+    async def handle_become_expert(request):
         user_id = request.json.get("user_id", None)
         field = request.json.get("field", None)
         if not user_id or not field:
@@ -116,7 +166,7 @@ def attach_endpoints(app):
 
     @app.post('/expert/check')
     @protected
-    def handle_check_expert(request):
+    async def handle_check_expert(request):
         user_id = request.json.get("user_id", None)
         field = request.json.get("field", None)
         if not user_id or not field:
@@ -126,39 +176,171 @@ def attach_endpoints(app):
     # Expert cases
     @app.post('/expert/case/open')
     @protected
-    def handle_open_expert_case(request):
+    async def handle_open_expert_case(request):
         user_id = request.json.get("user_id", None)
         case_name = request.json.get("case_name", None)
         if not user_id or not case_name:
             raise ServerError("Missing user_id or field.")
+        # A mock, nothing is opened on chain, so the cached case lists stay valid
         return response.json({"success": open_expert_case(user_id, case_name)})
 
-    @app.get('/expert/case/all')
+    @app.get('/expert/case/<case_id:int>/leader')
+    @protected
+    async def handle_get_current_leader(request, case_id: int):
+        leader = await get_current_leader(app.ctx.node_connection_client, case_id)
+        if not leader:
+            return response.json({"error": "Expert case not found."}, status=404)
+        return response.json(leader)
+
+    @app.get('/expert/case/all', ignore_body=False)
     @protected
-    def handle_get_expert_cases(request):
+    async def handle_get_expert_cases(request):
         user_id = request.json.get("user_id", None)
         if not user_id:
             raise ServerError("Missing user_id.")
-        open_cases = get_open_expert_cases(user_id)
-        return response.json({"open_cases": open_cases})
+        try:
+            cursor = request.args.get("cursor", None)
+            if cursor:
+                position = decode_cursor(cursor)
+                field, offset, version = position["field"], int(position["offset"]), int(position["version"])
+            else:
+                field = request.args.get("field", None)
+                offset = int(request.args.get("offset", 0))
+                version = None
+            field = int(field) if field is not None else None
+            # The Node answers at most a page, larger limits would only split the cache
+            limit = min(max(int(request.args.get("limit", CASES_PAGE_SIZE)), 0), CASES_PAGE_SIZE)
+        except (ValueError, KeyError, TypeError):
+            return response.json({"error": "Invalid field, offset, limit or cursor."}, status=400)
+
+        try:
+            if wants_ndjson(request):
+                pages = case_pages(app.ctx.node_connection_client, user_id, field, offset, version)
+                return await stream_ndjson(request, pages, "Failed to get open expert cases.")
+
+            async def fetch():
+                page = await get_open_expert_cases(app.ctx.node_connection_client, user_id, field, offset, limit)
+                if page is None:
+                    return None
+                check_cases_version(page, version)
+                # Pages cached before a case opened or closed are no longer used
+                app.ctx.response_cache.observe("cases", page["version"])
+                return {
+                    "open_cases": page["cases"],
+                    "total": page["total"],
+                    "next_cursor": next_cases_cursor(field, offset, page),
+                }
+
+            resp = await app.ctx.response_cache.respond(request, "cases", (field, offset, limit, version), fetch)
+        except StaleCursor as ex:
+            return response.json({"error": str(ex)}, status=409)
+        if resp is None:
+            raise ServerError("Failed to get open expert cases.")
+        return resp
 
 
     # Item registry
+    def bump_when_mined(tickets, resource):
+        """Invalidates the cached lists of the resource as each ticket is mined.
+
+        Until then the lists still lack the change, and caching them under a
+        version bumped at queueing time would keep them stale for MAX_AGE.
+        """
+        async def watch():
+            for ticket in tickets:
+                try:
+                    status = await get_transaction_status(app.ctx.node_connection_client, ticket, MAX_TX_WAIT)
+                except ConnectionError as ex:
+                    logger.error(f"Watching ticket {ticket} failed: {ex}")
+                    continue
+                if status and status["status"] == "mined":
+                    app.ctx.response_cache.bump(resource)
+
+        app.add_task(watch())
+
     @app.post('/items/add')
     @protected
-    def handle_add_item(request):
+    async def handle_add_item(request):
         category = request.json.get("category", None)
         item_info = request.json.get("item_info", None)
         owner_public_key = request.json.get("owner_public_key", None)
         if not category or not item_info or not owner_public_key:
             raise ServerError("Missing category, item_info or owner_public_key.")
-        return response.json({"success": add_item(category, item_info, owner_public_key)})
+        ticket = await add_item(app.ctx.node_connection_client, category, item_info, owner_public_key)
+        if ticket is not None:
+            bump_when_mined([ticket], "items")
+        return response.json({"success": ticket is not None, "ticket": ticket})
+
+    @app.post('/items/import')
+    @protected
+    async def handle_import_items(request):
+        items = request.json.get("items", None)
+        if not items or not isinstance(items, list):
+            raise ServerError("Missing items.")
+        for item in items:
+            if not isinstance(item, dict) or not all(item.get(key) for key in ("category", "item_info", "owner_public_key")):
+                raise ServerError("Every item needs category, item_info and owner_public_key.")
+        tickets = await add_items(app.ctx.node_connection_client, items)
+        if tickets is not None:
+            bump_when_mined(tickets, "items")
+        return response.json({"success": tickets is not None, "tickets": tickets})
 
     @app.get('/items/all')
     @protected
-    def handle_get_items(request):
-        items = get_items()
-        return response.json({"items": items})
+    async def handle_get_items(request):
+        try:
+            cursor = request.args.get("cursor", None)
+            from_id = int(decode_cursor(cursor)["from"] if cursor else request.args.get("from", 1))
+            count = int(request.args.get("limit", request.args.get("count", ITEMS_PAGE_SIZE)))
+            count = min(max(count, 0), ITEMS_PAGE_SIZE)
+        except (ValueError, KeyError, TypeError):
+            return response.json({"error": "Invalid from, count, limit or cursor."}, status=400)
+
+        if wants_ndjson(request):
+            pages = item_pages(app.ctx.node_connection_client, from_id)
+            return await stream_ndjson(request, pages, "Failed to get items.")
+
+        async def fetch():
+            page = await get_items(app.ctx.node_connection_client, from_id, count)
+            return page and {
+                "items": page["items"],
+                "total": page["total"],
+                "next_cursor": next_items_cursor(from_id, page),
+            }
+
+        resp = await app.ctx.response_cache.respond(request, "items", (from_id, count), fetch)
+        if resp is None:
+            raise ServerError("Failed to get items.")
+        return resp
+
+
+    # Queued transactions
+    @app.get('/tx/<ticket:str>')
+    @protected
+    async def handle_transaction_status(request, ticket: str):
+        try:
+            wait = float(request.args.get("wait", 0))
+        except ValueError:
+            raise ServerError("Invalid wait.")
+        status = await get_transaction_status(app.ctx.node_connection_client, ticket, wait)
+        if not status:
+            return response.json({"error": "Ticket not found."}, status=404)
+        return response.json(status)
+
+
+    # Several operations in one request
+    @app.post('/batch')
+    @protected
+    async def handle_batch(request):
+        operations = request.json.get("operations", None)
+        if not operations or not isinstance(operations, list):
+            raise ServerError("Missing operations.")
+        if len(operations) > MAX_OPERATIONS:
+            raise ServerError(f"At most {MAX_OPERATIONS} operations per batch.")
+        if not all(isinstance(operation, dict) for operation in operations):
+            raise ServerError("Every operation needs op and args.")
+        results = await run_batch(app.ctx.node_connection_client, operations)
+        return response.json({"results": results})
 
 
     # Exception handling
@@ -183,38 +365,83 @@ def attach_endpoints(app):
             status=500
         )
 
+    @app.exception(ConnectionError)
+    def handle_node_unavailable(request, exception):
+        return response.json(
+            {
+                "error": "NodeUnavailable",
+                "message": "No connection with the Node, try again later."
+            },
+            status=503
+        )
+
 
 def create_app(arguments):
     "Sanic app factory."
     app = sanic.Sanic("Gateway")
     app.ctx.args = arguments
     app.ctx.challenges = {}
+    app.ctx.token_cache = TokenCache()
+    app.ctx.public_key_cache = PublicKeyCache()
+    # Replaced by the shared store in production mode
+    app.ctx.key_store = KeyStore()
     app.config.SECRET = "secret" #TODO: change this to a more secure secret
+    app.config.STATELESS_CHALLENGES = getattr(arguments, 'stateless_challenges', False)
+
+    if getattr(arguments, 'production', False):
+        # Challenges issued by one worker are checked by another
+        app.config.STATELESS_CHALLENGES = True
+        app.main_process_start(start_shared_state)
+        app.main_process_stop(stop_shared_state)
+
+    @app.before_server_start()
+    async def setup_worker_state(app):
+        replay_filter = getattr(app.shared_ctx, 'replay_filter', None)
+        app.ctx.replay_filter = replay_filter if replay_filter is not None else ReplayFilter()
+        key_store = getattr(app.shared_ctx, 'key_store', None)
+        if key_store is not None:
+            app.ctx.key_store = key_store
+        app.ctx.response_cache = ResponseCache(getattr(app.shared_ctx, 'cache_versions', None))
+
+    @app.before_server_start()
+    async def start_crypto_pool(app):
+        app.ctx.crypto_pool = CryptoPool(getattr(app.ctx.args, 'crypto_workers', None))
 
-    app.ctx.node_connection_client = NodeConnectionClient()
+    @app.after_server_stop
+    async def stop_crypto_pool(app):
+        app.ctx.crypto_pool.shutdown()
 
     @app.before_server_start()
     async def node_connection_manager(app):
-        # Thread for creating and maintaining connection with Node
-        app.ctx.bg_connection_thread = Thread(target=app.ctx.node_connection_client.connection_manager, args=())
-        app.ctx.bg_connection_thread.daemon = True
-        app.ctx.bg_connection_thread.start()
+        # Every worker has its own connections with Node
+        app.ctx.node_connection_client = NodeConnectionPool(getattr(app.ctx.args, 'node_connections', None))
+        app.ctx.node_connection_client.start()
 
     @app.before_server_stop
     async def stop_background_thread(app, loop):
         # Garefully close connection with Node
-        logger.info("Stopping Node connection manager thread...")
+        logger.info("Stopping Node connection manager threads...")
         app.ctx.node_connection_client.exit()
-        app.ctx.bg_connection_thread.join()
-        logger.info("Node connection manager thread stopped.")
+        logger.info("Node connection manager threads stopped.")
 
     attach_endpoints(app)
     return app
 
 def main(arguments):
     """Main entry point."""
-    app = create_app(arguments)
-    app.run(host=arguments.ip, port=arguments.port, single_process=True, debug=True)
+    if not arguments.production:
+        app = create_app(arguments)
+        app.run(host=arguments.ip, port=arguments.port, single_process=True, debug=True)
+        return
+
+    # Workers are separate processes, each creates the app with the factory.
+    # They import it as gateway.__main__, not as the __main__ run here.
+    from .__main__ import create_app as app_factory
+    loader = AppLoader(factory=partial(app_factory, arguments))
+    app = loader.load()
+    app.prepare(host=arguments.ip, port=arguments.port, workers=arguments.workers,
+                debug=False, access_log=False)
+    sanic.Sanic.serve(primary=app, app_loader=loader)
 
 if __name__ == '__main__':
     args = get_args()
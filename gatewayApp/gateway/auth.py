@@ -4,6 +4,7 @@ This module contains the authentication logic for the gateway service.
 import random
 from datetime import datetime
 from functools import wraps
+from inspect import isawaitable
 import jwt
 
 from sanic import response
@@ -13,6 +14,9 @@ from cryptography.exceptions import InvalidKey
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.serialization import load_pem_public_key
 
+from .challenge import issue_challenge
+from .challenge import verify_challenge
+from .crypto_pool import CryptoPoolFull
 from .node_connection import user_exists
 from .node_connection import add_public_key
 from .node_connection import get_public_key
@@ -22,24 +26,33 @@ def check_token(request):
     if not request.token:
         return False
 
+    token_cache = request.app.ctx.token_cache
+    if token_cache.check(request.token, request.app.config.SECRET):
+        return True
+
     try:
-        jwt.decode(
+        payload = jwt.decode(
             request.token, request.app.config.SECRET, algorithms=["HS256"]
         )
     except jwt.exceptions.InvalidTokenError:
         return False
     else:
+        token_cache.add(request.token, request.app.config.SECRET, payload.get("exp"))
         return True
 
 def protected(wrapped):
-    """ Decorator to protect endpoints with JWT token."""
+    """ Decorator to protect endpoints with JWT token.
+    Works with both sync and async handlers.
+    """
     def decorator(f):
         @wraps(f)
-        def decorated_function(request, *args, **kwargs):
+        async def decorated_function(request, *args, **kwargs):
             is_authenticated = check_token(request)
 
             if is_authenticated:
                 resp = f(request, *args, **kwargs)
+                if isawaitable(resp):
+                    resp = await resp
                 return resp
             else:
                 return response.json({"error": "You are unauthorized."}, status=401)
@@ -48,9 +61,22 @@ def protected(wrapped):
 
     return decorator(wrapped)
 
-def register(node_connection_client, request_body):
+async def _get_public_key(node_connection_client, request, user_id):
+    """
+    Get the parsed public key of a user from the cache, or from the NODE on a miss.
+    """
+    public_key_cache = request.app.ctx.public_key_cache
+    public_key = public_key_cache.get(user_id)
+    if public_key is None:
+        public_key = await get_public_key(node_connection_client, request.app.ctx.key_store, user_id)
+        if public_key is not None:
+            public_key_cache.put(user_id, public_key)
+    return public_key
+
+async def register(node_connection_client, request, request_body):
     """
     Register a new user with user_id and his public key.
+    The parsed key is cached for the user's logins.
     """
     user_id = request_body.user_id
     public_key_pem = request_body.public_key
@@ -58,23 +84,32 @@ def register(node_connection_client, request_body):
     if not user_id or not public_key_pem:
         return response.json({"error": "user_id and public_key are required."}, status=400)
 
-    if user_exists(node_connection_client, user_id):
+    key_store = request.app.ctx.key_store
+    if user_exists(key_store, user_id):
         return response.json({"error": "User ID already exists."}, status=400)
 
     try:
         public_key = load_pem_public_key(public_key_pem.encode())
-        add_public_key(node_connection_client, user_id, public_key)
     except (ValueError, InvalidKey):
         return response.json({"error": "Invalid public key format"}, status=400)
+    try:
+        ticket = await add_public_key(node_connection_client, key_store, user_id, public_key)
+    except ValueError:
+        # Registered concurrently through another request
+        return response.json({"error": "User ID already exists."}, status=400)
+    if ticket is None:
+        return response.json({"error": "Registration rejected by the Node."}, status=502)
+    request.app.ctx.public_key_cache.put(user_id, public_key)
 
-    return response.json({"message": "User registered successfully."}, status=201)
+    return response.json({"message": "User registered successfully.", "ticket": ticket}, status=201)
 
 
-def generate_challenge(node_connection_client, request, request_body):
+async def generate_challenge(node_connection_client, request, request_body):
     """
     Generate a challenge for a given user_id.
     Fetch the user's public key and encrypt the challenge with it.
-    Store the challenge in the app context for validation.
+    Store the challenge in the app context for validation, or in stateless
+    mode sign it so that it can be checked without storing it.
     Respond with the encrypted challenge and user_id.
     """
     user_id = request_body.user_id
@@ -82,18 +117,23 @@ def generate_challenge(node_connection_client, request, request_body):
     if not user_id:
         return response.json({"error": "Missing user_id."})
 
-    if not user_exists(node_connection_client, user_id):
+    if not user_exists(request.app.ctx.key_store, user_id):
         return response.json({"error": "User not found."})
 
-    nonce = str(random.randint(0, 1_000_000))
-    timestamp = datetime.utcnow().isoformat()
-    challenge = f"LOGIN_REQUEST|{nonce}|{timestamp}"
+    if request.app.config.STATELESS_CHALLENGES:
+        challenge = issue_challenge(request.app.config.SECRET, user_id)
+    else:
+        nonce = str(random.randint(0, 1_000_000))
+        timestamp = datetime.utcnow().isoformat()
+        challenge = f"LOGIN_REQUEST|{nonce}|{timestamp}"
 
-    request.app.ctx.challenges[user_id] = challenge.encode()
+        request.app.ctx.challenges[user_id] = challenge.encode()
 
     try:
-        public_key = get_public_key(node_connection_client, user_id)
-        encrypted_challenge = public_key.encrypt(
+        public_key = await _get_public_key(node_connection_client, request, user_id)
+        # RSA is CPU bound, keep it off the event loop
+        encrypted_challenge = await request.app.ctx.crypto_pool.run(
+            public_key.encrypt,
             challenge.encode(),
             padding.OAEP(
                 mgf=padding.MGF1(algorithm=hashes.SHA256()),
@@ -104,31 +144,42 @@ def generate_challenge(node_connection_client, request, request_body):
 
         return response.json({"user_id": user_id, "challenge": encrypted_challenge.hex()})
 
+    except CryptoPoolFull:
+        return response.json({"error": "Server busy, try again later."}, status=503)
     except Exception as e:
         return response.json({"error": f"Failed to generate challenge: {str(e)}"})
 
 
 
-def authenticate(node_connection_client, request, body):
+async def authenticate(node_connection_client, request, body):
     """
     Authenticate a user by verifying the signed challenge.
     This function is called automatically by the sanic-jwt middleware on /auth endpoint.
     When passed user can access endpoints protected by the @protected decorator
     by providing a valid JWT token in the Authorization header.
+    In stateless mode the client sends back the decrypted challenge, whose
+    nonce can be used only once.
     """
     user_id = body.user_id
     signed_challenge = bytes.fromhex(body.signed_challenge)
 
-    challenge = request.app.ctx.challenges.pop(user_id, None)
-    if not challenge:
-        return response.json({"eror": "Challenge not found for user."})
+    if request.app.config.STATELESS_CHALLENGES:
+        verified = verify_challenge(request.app.config.SECRET, user_id, body.challenge or "")
+        if not verified:
+            return response.json({"error": "Invalid or expired challenge."})
+        challenge = body.challenge.encode()
+    else:
+        challenge = request.app.ctx.challenges.pop(user_id, None)
+        if not challenge:
+            return response.json({"eror": "Challenge not found for user."})
 
-    public_key = get_public_key(node_connection_client, user_id)
+    public_key = await _get_public_key(node_connection_client, request, user_id)
     if not public_key:
         return response.json({"eror:": "User's public key not found."})
 
     try:
-        public_key.verify(
+        await request.app.ctx.crypto_pool.run(
+            public_key.verify,
             signed_challenge,
             challenge,
             padding.PSS(
@@ -137,6 +188,14 @@ def authenticate(node_connection_client, request, body):
             ),
             hashes.SHA256()
         )
+    except CryptoPoolFull:
+        # The challenge was consumed, the client has to request a new one
+        return response.json({"error": "Server busy, try again later."}, status=503)
     except Exception:
+        # A stale cached key fails only once, the next login fetches it again
+        request.app.ctx.public_key_cache.invalidate(user_id)
         return response.json({"eror:": "Challenge verification failed."})
+
+    if request.app.config.STATELESS_CHALLENGES and not request.app.ctx.replay_filter.use(*verified):
+        return response.json({"error": "Challenge already used."})
     return response.json({"access_token": jwt.encode({}, request.app.config.SECRET)})
@@ -0,0 +1,101 @@
+"""
+Several API operations in one HTTP request.
+
+A batch is a list of operations such as
+
+    {"op": "items/all", "args": {"from": 1, "count": 50}}
+
+The results are returned in the same order as {"status": ..., "body": ...}.
+All Node reads of the batch are sent in a single BATCH message.
+"""
+from .node_connection import batch_request
+from .node_connection import check_expert_in_field
+from .node_connection import current_leader_request
+from .node_connection import items_request
+from .node_connection import json_payload
+from .node_connection import open_cases_request
+from .node_connection import transaction_status_request
+
+MAX_OPERATIONS: int = 50
+
+
+def _check_expert(args):
+    if not args.get("user_id") or not args.get("field"):
+        raise ValueError("Missing user_id or field.")
+    return {"is_expert": check_expert_in_field(args["user_id"], args["field"])}
+
+def _expert_cases(args):
+    field = args.get("field")
+    request = open_cases_request(
+        int(field) if field is not None else None, int(args.get("offset", 0)), int(args.get("limit", 100)))
+    return request, lambda page: {"open_cases": page["cases"], "total": page["total"]}
+
+def _current_leader(args):
+    return current_leader_request(int(args["case_id"])), lambda leader: leader
+
+def _items(args):
+    request = items_request(int(args.get("from", 1)), int(args.get("count", 500)))
+    return request, lambda page: {"items": page["items"], "total": page["total"]}
+
+def _transaction_status(args):
+    return transaction_status_request(str(args["ticket"])), lambda status: status
+
+# Operations answered by the gateway itself
+LOCAL_OPERATIONS: dict = {
+    "expert/check": _check_expert,
+}
+
+# Operations reading from the Node: return the request and how to shape its payload
+NODE_OPERATIONS: dict = {
+    "expert/case/all": _expert_cases,
+    "expert/case/leader": _current_leader,
+    "items/all": _items,
+    "tx": _transaction_status,
+}
+
+
+def _error(status, message):
+    return {"status": status, "body": {"error": message}}
+
+async def run_batch(node_connection_client, operations):
+    """Run the operations of a batch.
+
+    Args:
+        node_connection_client (NodeConnectionPool): Connections with the Node.
+        operations (list): At most MAX_OPERATIONS dicts with *op* and optional *args*.
+
+    Returns:
+        list: A dict with *status* and *body* per operation.
+    """
+    results = [None] * len(operations)
+    requests, pending = [], []
+
+    for i, operation in enumerate(operations):
+        try:
+            name = operation["op"]
+            args = operation.get("args") or {}
+            if name in LOCAL_OPERATIONS:
+                results[i] = {"status": 200, "body": LOCAL_OPERATIONS[name](args)}
+            elif name in NODE_OPERATIONS:
+                request, shape = NODE_OPERATIONS[name](args)
+                requests.append(request)
+                pending.append((i, shape))
+            else:
+                results[i] = _error(400, f"Unknown operation: {name}.")
+        except (KeyError, TypeError, ValueError, AttributeError):
+            results[i] = _error(400, "Invalid operation.")
+
+    if requests:
+        responses = await batch_request(node_connection_client, requests)
+        if responses is None:
+            responses = [None] * len(requests)
+
+        for (i, shape), response in zip(pending, responses):
+            if response is None:
+                results[i] = _error(502, "Node rejected the batch.")
+            elif (payload := json_payload(response)) is None:
+                results[i] = _error(response.get_status(), response.get_payload())
+            else:
+                results[i] = {"status": 200, "body": shape(payload)}
+
+    return results
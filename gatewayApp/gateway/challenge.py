@@ -0,0 +1,107 @@
+"""
+Stateless login challenges.
+
+A challenge carries a random nonce, its expiry and an HMAC of both bound to
+the user, so any gateway worker can check it without storing it:
+
+    LOGIN_REQUEST|<nonce>|<expires>|<hmac>
+"""
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+PREFIX: str = "LOGIN_REQUEST"
+CHALLENGE_TTL: int = 60 #[s]
+
+
+def _mac(secret: str, user_id: str, nonce: str, expires: int) -> str:
+    message = f"{PREFIX}|{user_id}|{nonce}|{expires}".encode()
+    return hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+
+def issue_challenge(secret: str, user_id: str, ttl: int = CHALLENGE_TTL) -> str:
+    """Creates a signed challenge for the user.
+
+    Args:
+        secret (str): Server secret.
+        user_id (str): Id of the user logging in.
+        ttl (int, optional): Validity of the challenge [s]. Defaults to CHALLENGE_TTL.
+
+    Returns:
+        str: The challenge.
+    """
+    nonce = secrets.token_hex(16)
+    expires = int(time.time()) + ttl
+    return f"{PREFIX}|{nonce}|{expires}|{_mac(secret, user_id, nonce, expires)}"
+
+def verify_challenge(secret: str, user_id: str, challenge: str) -> tuple[str, int] | None:
+    """Checks that the challenge was issued for the user and has not expired.
+
+    Args:
+        secret (str): Server secret.
+        user_id (str): Id of the user logging in.
+        challenge (str): Challenge returned by the client.
+
+    Returns:
+        tuple[str, int] | None: Nonce and expiry of the challenge, *None* if it is invalid.
+    """
+    try:
+        prefix, nonce, expires, mac = challenge.split("|")
+        expires = int(expires)
+    except ValueError:
+        return None
+
+    if prefix != PREFIX or expires < time.time():
+        return None
+    if not hmac.compare_digest(mac, _mac(secret, user_id, nonce, expires)):
+        return None
+    return nonce, expires
+
+
+class ReplayFilter():
+    """Bounded set of nonces of challenges used until they expire.
+
+    Each nonce can be used to log in once. Nonces are dropped when their
+    challenge expires, so the filter holds at most the logins of the last
+    CHALLENGE_TTL seconds. When it is full new logins are refused rather
+    than forgetting nonces that could still be replayed.
+
+    Args:
+        max_size (int, optional): Maximum number of nonces. Defaults to MAX_SIZE.
+    """
+    MAX_SIZE: int = 100_000
+
+    def __init__(self, max_size: int = MAX_SIZE) -> None:
+        self._max_size: int = max_size
+        self._nonces: OrderedDict[str, int] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def _purge(self, now: float) -> None:
+        # Challenges expire in the order they were used, give or take the TTL
+        while self._nonces:
+            nonce, expires = next(iter(self._nonces.items()))
+            if expires >= now:
+                break
+            del self._nonces[nonce]
+
+    def use(self, nonce: str, expires: int) -> bool:
+        """Marks the nonce as used.
+
+        Args:
+            nonce (str): Nonce of the challenge.
+            expires (int): Expiry of the challenge.
+
+        Returns:
+            bool: *False* if the nonce was already used or the filter is full.
+        """
+        with self._lock:
+            self._purge(time.time())
+            if nonce in self._nonces or len(self._nonces) >= self._max_size:
+                return False
+            self._nonces[nonce] = expires
+            return True
+
+    def __len__(self) -> int:
+        return len(self._nonces)
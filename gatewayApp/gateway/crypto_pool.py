@@ -0,0 +1,102 @@
+"""
+Thread pool for the RSA operations of the login steps.
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class CryptoPoolFull(RuntimeError):
+    """Raised when too many operations are waiting for the pool."""
+
+
+class CryptoPool():
+    """Bounded thread pool running CPU bound crypto off the event loop.
+
+    *cryptography* releases the GIL during RSA operations, so a login burst
+    spreads over the cores while the event loop keeps serving other routes.
+    At most *max_queue* operations wait for a thread, further ones are
+    rejected with CryptoPoolFull instead of piling up.
+
+    Args:
+        workers (int, optional): Number of threads. Defaults to the number of cores.
+        max_queue (int, optional): Maximum number of waiting operations.
+            Defaults to MAX_QUEUE.
+    """
+    MAX_QUEUE: int = 1000
+
+    def __init__(self, workers: int = None, max_queue: int = MAX_QUEUE) -> None:
+        self.workers: int = workers or os.cpu_count() or 1
+        self._max_queue: int = max_queue
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="crypto")
+        self._lock: threading.Lock = threading.Lock()
+        self._queued: int = 0
+        self._running: int = 0
+        self._completed: int = 0
+        self._rejected: int = 0
+        self._wait_time: float = 0 #[s]
+        self._run_time: float = 0 #[s]
+        self._max_latency: float = 0 #[s]
+
+    async def run(self, function, *args):
+        """Runs *function(*args)* in the pool and awaits its result.
+
+        Raises:
+            CryptoPoolFull: Too many operations are already waiting.
+
+        Returns:
+            Result of the function.
+        """
+        with self._lock:
+            if self._queued >= self._max_queue:
+                self._rejected += 1
+                raise CryptoPoolFull("Too many pending crypto operations.")
+            self._queued += 1
+        submitted = time.perf_counter()
+
+        def task():
+            started = time.perf_counter()
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+            try:
+                return function(*args)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+                    self._wait_time += started - submitted
+                    self._run_time += finished - started
+                    self._max_latency = max(self._max_latency, finished - submitted)
+
+        future = self._executor.submit(task)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # A task cancelled before it started never leaves the queue itself
+            if future.cancelled():
+                with self._lock:
+                    self._queued -= 1
+            raise
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        """Returns the queue depth and latencies of the pool, times in ms."""
+        with self._lock:
+            completed = self._completed
+            return {
+                "workers": self.workers,
+                "queued": self._queued,
+                "running": self._running,
+                "completed": completed,
+                "rejected": self._rejected,
+                "avg_wait_ms": 1000 * self._wait_time / completed if completed else 0.0,
+                "avg_run_ms": 1000 * self._run_time / completed if completed else 0.0,
+                "max_latency_ms": 1000 * self._max_latency,
+            }
@@ -0,0 +1,75 @@
+"""
+Cache of parsed public keys of users.
+"""
+from collections import OrderedDict
+
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey
+
+
+class PublicKeyCache():
+    """Bounded LRU cache of parsed RSA public keys by user id.
+
+    Every login step needs the user's public key. A hit saves the round
+    trip to the Node and parsing the PEM.
+
+    Keys carry no version: the Node does not report key changes, and a
+    user's key is written once, to the key store and on chain, where a nick
+    or key cannot be registered again. A cached key only goes stale when the
+    registry is reset; authenticate then drops it after the first failed
+    verification, and the next login fetches it again.
+
+    Args:
+        max_size (int, optional): Maximum number of cached keys.
+            Defaults to MAX_SIZE.
+    """
+    MAX_SIZE: int = 10_000
+
+    def __init__(self, max_size: int = MAX_SIZE) -> None:
+        self._max_size: int = max_size
+        self._keys: OrderedDict[str, RSAPublicKey] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def get(self, user_id: str) -> RSAPublicKey | None:
+        """Returns the cached key of the user.
+
+        Args:
+            user_id (str): Id of the user.
+
+        Returns:
+            RSAPublicKey | None: The key or *None* on a cache miss.
+        """
+        public_key = self._keys.get(user_id)
+        if public_key is None:
+            self.misses += 1
+            return None
+
+        self._keys.move_to_end(user_id)
+        self.hits += 1
+        return public_key
+
+    def put(self, user_id: str, public_key: RSAPublicKey) -> None:
+        """Stores the key of the user.
+
+        Args:
+            user_id (str): Id of the user.
+            public_key (RSAPublicKey): Parsed public key.
+        """
+        self._keys[user_id] = public_key
+        self._keys.move_to_end(user_id)
+        if len(self._keys) > self._max_size:
+            self._keys.popitem(last=False)
+
+    def invalidate(self, user_id: str) -> None:
+        """Drops the key of the user, e.g. after it failed to verify a signature."""
+        self._keys.pop(user_id, None)
+
+    def stats(self) -> dict:
+        """Returns the size and hit rate of the cache."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._keys),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,41 @@
+"""
+Public keys of the registered users.
+
+Stands in for the user registry of the NODE until it can look up keys. In
+production mode the store is served by the shared state manager, so a user
+registered through one worker can log in through any other.
+"""
+import threading
+
+
+class KeyStore():
+    """Public keys in PEM format by user id.
+
+    Keys are kept as PEM strings, parsed keys cannot be sent to other processes.
+    """
+
+    def __init__(self) -> None:
+        self._keys: dict[str, str] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def add(self, user_id: str, public_key_pem: str) -> bool:
+        """Stores the public key of a new user.
+
+        Args:
+            user_id (str): Id of the user.
+            public_key_pem (str): Public key in PEM format.
+
+        Returns:
+            bool: *False* if the user already has a key.
+        """
+        with self._lock:
+            if user_id in self._keys:
+                return False
+            self._keys[user_id] = public_key_pem
+            return True
+
+    def get(self, user_id: str) -> str | None:
+        return self._keys.get(user_id)
+
+    def exists(self, user_id: str) -> bool:
+        return user_id in self._keys
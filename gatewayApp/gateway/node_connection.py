@@ -1,39 +1,149 @@
+import asyncio
+import json
 import os
 import sys
+from functools import wraps
 
-from .node_connection_client import NodeConnectionClient
+from cryptography.hazmat.primitives import serialization
+
+from .node_connection_pool import NodeConnectionPool
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../Message')))
 from Message import Message, Type
 
 """
-This module is a mock of the NODE service. It stores public keys of users.
+This module is a mock of the NODE service. Public keys of users are kept in
+a KeyStore.
 """
 
-public_keys = {}
-
-def add_public_key(node_connection_client: NodeConnectionClient, user_id, public_key):
-    """Adds a user's public key to the NODE service if it doesn't already exist."""
-    node_connection_client.send(Message(type=Type.REQUEST, payload=str(user_id)))
-
-    response = node_connection_client.receive().to_json()
-    print(response)
-
-    if user_id in public_keys:
+MAX_TX_WAIT: float = 30 #[s]
+TX_POLL_INTERVAL: float = 1 #[s]
+
+def single_flight(function):
+    """Coalesce concurrent identical NODE lookups.
+
+    While a call is in flight, calls with the same client and arguments
+    await it instead of sending their own request, and all of them get its
+    result or its exception. Nothing is kept after the call completes.
+    """
+    in_flight: dict[tuple, asyncio.Future] = {}
+
+    @wraps(function)
+    async def wrapper(node_connection_client, *args, **kwargs):
+        key = (id(node_connection_client), args, tuple(sorted(kwargs.items())))
+        future = in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(function(node_connection_client, *args, **kwargs))
+            in_flight[key] = future
+            future.add_done_callback(lambda _: in_flight.pop(key, None))
+        # A cancelled caller must not cancel the call the others wait for
+        return await asyncio.shield(future)
+
+    return wrapper
+
+def json_payload(response: Message, status=200):
+    """Return the decoded JSON payload of a NODE response, None if it has another status."""
+    if response.get_status() != status:
+        return None
+    return json.loads(response.get_payload())
+
+def transaction_status_request(ticket):
+    return Message(type=Type.TX_STATUS, payload=json.dumps({"ticket": ticket}))
+
+def open_cases_request(field=None, offset=0, limit=100):
+    request = {"offset": offset, "limit": limit}
+    if field is not None:
+        request["field_id"] = field
+    return Message(type=Type.OPEN_CASES, payload=json.dumps(request))
+
+def current_leader_request(case_id):
+    return Message(type=Type.CURRENT_LEADER, payload=json.dumps({"case_id": case_id}))
+
+def items_request(from_id=1, count=500):
+    return Message(type=Type.GET_ITEMS, payload=json.dumps({"from_id": from_id, "count": count}))
+
+async def batch_request(node_connection_client: NodeConnectionPool, messages):
+    """Send several read requests to the NODE in one round trip.
+
+    Return the responses in the order of the requests, or None if the NODE
+    rejected the batch.
+    """
+    response = await node_connection_client.request_async(
+        Message(type=Type.BATCH, payload=json.dumps([message.to_json() for message in messages]))
+    )
+    responses = json_payload(response)
+    if responses is None:
+        return None
+    return [Message.from_json(r) for r in responses]
+
+async def add_public_key(node_connection_client: NodeConnectionPool, key_store, user_id, public_key):
+    """Adds a user's public key to the NODE service if it doesn't already exist.
+
+    The on-chain registration is queued by the NODE, the returned ticket can be
+    passed to get_transaction_status. The key is stored only once the NODE
+    accepted the registration.
+    Return None if the NODE rejected it.
+    """
+    if key_store.exists(user_id):
         raise ValueError("User ID already exists.")
-    public_keys[user_id] = public_key
-
-def get_public_key(node_connection_client: NodeConnectionClient, user_id):
-    """Retrieve the public key of a given user_id."""
-    node_connection_client.send(Message(type=Type.REQUEST, payload=str(user_id)))
-    response = node_connection_client.receive().to_json()
-    print(response)
-
-    return response
-    # return public_keys.get(user_id, None)
 
-def user_exists(node_connection_client: NodeConnectionClient, user_id):
+    public_key_pem = public_key.public_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    response = await node_connection_client.request_async(Message(type=Type.REGISTER, payload=json.dumps({
+        "nick": str(user_id),
+        "public_key": public_key_pem,
+        "additional_data": "",
+        "is_bot": False,
+    })))
+
+    if response.get_status() != 202:
+        return None
+    if not key_store.add(user_id, public_key_pem):
+        raise ValueError("User ID already exists.")
+    return json.loads(response.get_payload())["ticket"]
+
+@single_flight
+async def _transaction_status(node_connection_client: NodeConnectionPool, ticket):
+    response = await node_connection_client.request_async(transaction_status_request(ticket))
+    return json_payload(response)
+
+async def get_transaction_status(node_connection_client: NodeConnectionPool, ticket, wait=0):
+    """Get the status of a transaction queued by the NODE.
+
+    With wait > 0 the NODE is polled every TX_POLL_INTERVAL until the
+    transaction is mined or failed, or until wait (at most MAX_TX_WAIT)
+    seconds pass. The NODE answers every poll right away, so the connection
+    is free for other requests in between.
+    Return None if the ticket is unknown.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + min(max(wait, 0), MAX_TX_WAIT)
+    while True:
+        status = await _transaction_status(node_connection_client, ticket)
+        remaining = deadline - loop.time()
+        if not status or status["status"] in ("mined", "failed") or remaining <= 0:
+            return status
+        await asyncio.sleep(min(TX_POLL_INTERVAL, remaining))
+
+@single_flight
+async def get_public_key(node_connection_client: NodeConnectionPool, key_store, user_id):
+    """Retrieve the parsed public key of a given user_id.
+
+    Fall back to the key store if the NODE does not know the key.
+    Return None if the user is unknown.
+    """
+    response = await node_connection_client.request_async(Message(type=Type.REQUEST, payload=str(user_id)))
+    if response.get_status() == 200:
+        return serialization.load_pem_public_key(response.get_payload().encode())
+    public_key_pem = key_store.get(user_id)
+    if public_key_pem is None:
+        return None
+    return serialization.load_pem_public_key(public_key_pem.encode())
+
+def user_exists(key_store, user_id):
     """Check if a user_id exists in NODE."""
-    return user_id in public_keys
+    return key_store.exists(user_id)
 
 def want_to_become_expert_in_field(user_id, field):
     """Send request to become expert in a given field."""
@@ -56,19 +166,54 @@ def open_expert_case(user_id, case_name):
     # Return False - if case opening failed
     return True #TODO Dobrek - implement this
 
-def get_open_expert_cases(user_id):
-    """Get all open cases for an expert."""
-
-    # Return list of open cases for given user_id
-    return [] #TODO Dobrek - implement this
-
-def add_item(category, itemInfo, owner_public_key):
-    """Add an item to the NODE service."""
-    # Add the item to the NODE service
-    # Return True - if item was added successfully
-    # Return False - if item addition failed
-    return True #TODO Dobrek - implement this
-
-def get_items():
-    """Get all items from the NODE service."""
-    return ["item1", "item2", "item3"] #TODO Dobrek - implement this
+@single_flight
+async def get_open_expert_cases(node_connection_client: NodeConnectionPool, user_id, field=None, offset=0, limit=100):
+    """Get a page of open expert cases, optionally only those of a given field.
+
+    Return a dict with the cases of the page and the total number of open cases,
+    or None if the NODE could not list them.
+    """
+    response = await node_connection_client.request_async(open_cases_request(field, offset, limit))
+    return json_payload(response)
+
+@single_flight
+async def get_current_leader(node_connection_client: NodeConnectionPool, case_id):
+    """Get the leading option of an open expert case.
+
+    Return a dict with the option, its votes and the number of voters, or None
+    if the case is unknown or the NODE could not read it.
+    """
+    response = await node_connection_client.request_async(current_leader_request(case_id))
+    return json_payload(response)
+
+async def add_items(node_connection_client: NodeConnectionPool, items):
+    """Add items to the NODE service.
+
+    items is a list of dicts with category, item_info and owner_public_key.
+    The NODE registers them in a few queued transactions; return their
+    ticket ids, or None if the items were rejected.
+    """
+    response = await node_connection_client.request_async(Message(type=Type.ADD_ITEMS, payload=json.dumps({"items": items})))
+    if response.get_status() != 202:
+        return None
+    return [ticket["ticket"] for ticket in json.loads(response.get_payload())["tickets"]]
+
+async def add_item(node_connection_client: NodeConnectionPool, category, itemInfo, owner_public_key):
+    """Add an item to the NODE service.
+
+    Return the ticket id of the queued transaction, or None if the item was rejected.
+    """
+    tickets = await add_items(node_connection_client, [
+        {"category": category, "item_info": itemInfo, "owner_public_key": owner_public_key}
+    ])
+    return tickets[0] if tickets else None
+
+@single_flight
+async def get_items(node_connection_client: NodeConnectionPool, from_id=1, count=500):
+    """Get a range of items from the NODE service.
+
+    Return a dict with the items and the total number of items, or None if
+    the NODE could not read them.
+    """
+    response = await node_connection_client.request_async(items_request(from_id, count))
+    return json_payload(response)
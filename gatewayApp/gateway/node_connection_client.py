@@ -27,7 +27,29 @@ class NodeConnectionClient():
         self.node_socket: socket.socket = None
         self._aes_key: bytes = None
         self._running: bool = False
+        self._lock: threading.Lock = threading.Lock()
+        self._stopped: threading.Event = threading.Event()
+        self._handshake_done: threading.Event = threading.Event()
 
+    def is_connected(self) -> bool:
+        """Returns whether the connection with the Node is established."""
+        return self._running
+
+    def is_closed(self) -> bool:
+        """Returns whether the connection has been given up or lost; it is not reopened."""
+        return self._stopped.is_set()
+
+    def wait_connected(self, timeout: float = None) -> bool:
+        """Waits for the handshake with the Node to finish.
+
+        Args:
+            timeout (float, optional): Maximal waiting time [s]. Defaults to None.
+
+        Returns:
+            bool: The connection is established.
+        """
+        self._handshake_done.wait(timeout)
+        return self._running
 
     def send(self, message: Message) -> None:
         """Sends data to Node.
@@ -65,6 +87,40 @@ class NodeConnectionClient():
         decrypted_message = self._decrypt(data)
         return Message.from_json(decrypted_message)
 
+    def request(self, message: Message, timeout: float = None) -> Message:
+        """Sends message to Node and waits for its response.
+
+        The connection is shared by the requests and the ping loop, so the whole
+        exchange is done under a lock. A broken or timed out exchange leaves the
+        stream out of step, so the connection is closed.
+
+        Args:
+            message (Message): Message to send.
+            timeout (float, optional): Time to wait for the response [s].
+                Defaults to TIMEOUT.
+
+        Raises:
+            ConnectionError: Not connected to the Node.
+
+        Returns:
+            Message: Response of the Node.
+        """
+        if not self._running:
+            raise ConnectionError("Not connected to the Node.")
+        with self._lock:
+            if timeout:
+                self.node_socket.settimeout(timeout)
+            try:
+                self.send(message)
+                return self.receive()
+            except OSError:
+                self._running = False
+                self._stopped.set()
+                self.node_socket.close()
+                raise
+            finally:
+                if timeout and self._running:
+                    self.node_socket.settimeout(NodeConnectionClient.TIMEOUT)
 
     def _send_data(self, data: bytes) -> None:
         """Sends data to Node.
@@ -227,6 +283,7 @@ class NodeConnectionClient():
             if self._aes_key:
                 logger.info(f"Shared AES key established with the Node")
                 self._running = True
+                self._handshake_done.set()
             else:
                 logger.fatal("No aes key. Exiting...")
                 self.exit()
@@ -234,38 +291,45 @@ class NodeConnectionClient():
 
             self.node_socket.settimeout(NodeConnectionClient.TIMEOUT)
 
-            next_ping_time = time.time()
-
             try:
                 while self._running:
                     # Ping the Node
-                    current_time = time.time()
-                    if current_time >= next_ping_time:
-                        self.send(Message(Type.PING))
-                        t = time.time_ns()
-                        next_ping_time = current_time + NodeConnectionClient.PING_INTERVAL
-
-                        try:
-                            response = self.receive()
-
-                            if response.get_type() == Type.PING:
-                                logger.info(f"Ping {(time.time_ns() - t) * 10e-6}ms")
-                            else:
-                                logger.error(f"Wrong response type {response.get_type()}")
-                                break
-                        except ValueError as ex:
-                            logger.error(f"Checksum error: {ex}")
-                        except socket.timeout:
-                            logger.error("Socket timeout.")
+                    t = time.time_ns()
+                    try:
+                        response = self.request(Message(Type.PING))
+
+                        if response.get_type() == Type.PING:
+                            logger.info(f"Ping {(time.time_ns() - t) * 10e-6}ms")
+                        else:
+                            logger.error(f"Wrong response type {response.get_type()}")
                             break
+                    except ValueError as ex:
+                        logger.error(f"Checksum error: {ex}")
+                    except socket.timeout:
+                        logger.error("Socket timeout.")
+                        break
+
+                    # Sleep until the next ping, exit() wakes the thread up
+                    self._stopped.wait(NodeConnectionClient.PING_INTERVAL)
             except Exception as ex:
                 logger.error(f"Unexpected error: {ex}")
             finally:
                 self.exit()
 
     def exit(self) -> None:
-        """Sends message to the Node to gracefully close connection and closes socket."""
-        if self._running:
-            self.send(Message(Type.EXIT))
-            self._running = False
-        self.node_socket.close()
+        """Sends message to the Node to gracefully close connection and closes socket.
+
+        Both the pool and the ping loop exit the connection, so this is done
+        under the lock, and a Node which is already gone is not an error.
+        """
+        self._stopped.set()
+        self._handshake_done.set()
+        with self._lock:
+            if self._running:
+                self._running = False
+                try:
+                    self.send(Message(Type.EXIT))
+                except OSError:
+                    pass
+            if self.node_socket:
+                self.node_socket.close()
@@ -0,0 +1,91 @@
+"""
+Pool of connections with the Node.
+"""
+import asyncio
+import threading
+
+from .node_connection_client import Message
+from .node_connection_client import NodeConnectionClient
+
+
+class NodeConnectionPool():
+    """Several connections of a worker with the Node.
+
+    The Node answers the messages of a connection one after the other, so a
+    single connection lets a slow call hold up every other one. The pool keeps
+    *size* connections, each with its own encryption key and ping loop; a
+    request takes an idle connection and waits only when all of them are busy.
+    A connection still in the handshake is waited for, and one that gave up
+    connecting or was lost is replaced by a new one.
+
+    Args:
+        size (int, optional): Number of connections. Defaults to SIZE.
+    """
+    SIZE: int = 4
+    CONNECT_TIMEOUT: float = 30 #[s] DH parameters are generated per connection
+
+    def __init__(self, size: int = SIZE) -> None:
+        self.connections: list[NodeConnectionClient] = [NodeConnectionClient() for _ in range(size or self.SIZE)]
+        self._idle: asyncio.Queue[NodeConnectionClient] = asyncio.Queue()
+        for connection in self.connections:
+            self._idle.put_nowait(connection)
+        self._threads: list[threading.Thread] = []
+        self._running: bool = False
+
+    def start(self) -> None:
+        """Connects to the Node in background threads, one per connection."""
+        self._running = True
+        for connection in self.connections:
+            self._start(connection)
+
+    def _start(self, connection: NodeConnectionClient) -> None:
+        # Thread for creating and maintaining connection with Node
+        thread = threading.Thread(target=connection.connection_manager, daemon=True)
+        thread.start()
+        self._threads = [thread for thread in self._threads if thread.is_alive()] + [thread]
+
+    def _replace(self, connection: NodeConnectionClient) -> NodeConnectionClient:
+        replacement = NodeConnectionClient()
+        self.connections[self.connections.index(connection)] = replacement
+        self._start(replacement)
+        return replacement
+
+    def exit(self) -> None:
+        """Gracefully closes all connections and waits for their threads."""
+        self._running = False
+        for connection in self.connections:
+            connection.exit()
+        for thread in self._threads:
+            thread.join()
+        self._threads.clear()
+
+    async def request_async(self, message: Message, timeout: float = None) -> Message:
+        """Sends message to Node over an idle connection and awaits its response.
+
+        Args:
+            message (Message): Message to send.
+            timeout (float, optional): Time to wait for the response [s].
+                Defaults to TIMEOUT.
+
+        Raises:
+            ConnectionError: No connection with the Node within CONNECT_TIMEOUT.
+
+        Returns:
+            Message: Response of the Node.
+        """
+        connection = await self._idle.get()
+        try:
+            if self._running and not connection.is_connected():
+                if connection.is_closed():
+                    connection = self._replace(connection)
+                await asyncio.to_thread(connection.wait_connected, self.CONNECT_TIMEOUT)
+            return await asyncio.to_thread(connection.request, message, timeout)
+        finally:
+            self._idle.put_nowait(connection)
+
+    def stats(self) -> dict:
+        """Returns the number of connections and of idle ones."""
+        return {
+            "size": len(self.connections),
+            "idle": self._idle.qsize(),
+        }
@@ -0,0 +1,152 @@
+"""
+Cursor pagination and NDJSON streaming of the list endpoints.
+"""
+import base64
+import json
+
+from sanic.exceptions import ServerError
+
+from .node_connection import get_items
+from .node_connection import get_open_expert_cases
+
+NDJSON: str = "application/x-ndjson"
+# Largest pages the Node answers
+ITEMS_PAGE_SIZE: int = 500
+CASES_PAGE_SIZE: int = 100
+
+
+class StaleCursor(ValueError):
+    """The open cases changed since the cursor was issued."""
+
+
+def encode_cursor(position: dict) -> str:
+    """Encodes a position in a list as an opaque cursor."""
+    return base64.urlsafe_b64encode(json.dumps(position, separators=(',', ':')).encode()).decode()
+
+def decode_cursor(cursor: str) -> dict:
+    """Decodes a cursor created by encode_cursor.
+
+    Raises:
+        ValueError: Not a valid cursor.
+    """
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError) as ex:
+        raise ValueError("Invalid cursor.") from ex
+    if not isinstance(position, dict):
+        raise ValueError("Invalid cursor.")
+    return position
+
+def next_items_cursor(from_id: int, page: dict) -> str | None:
+    """Cursor of the items after the page, *None* after the last item."""
+    next_id = from_id + len(page["items"])
+    if not page["items"] or next_id > page["total"]:
+        return None
+    return encode_cursor({"from": next_id})
+
+def next_cases_cursor(field: int | None, offset: int, page: dict) -> str | None:
+    """Cursor of the open cases after the page, *None* after the last case.
+
+    Open cases are paged by their position in the Node's index of open
+    cases. Closing a case moves the last one into its place, so a position
+    is only valid for the *version* of the open cases it was read at; the
+    cursor carries it and check_cases_version rejects it once it changed.
+    """
+    next_offset = offset + len(page["cases"])
+    if not page["cases"] or next_offset >= page["total"]:
+        return None
+    return encode_cursor({"offset": next_offset, "field": field, "version": page["version"]})
+
+def check_cases_version(page: dict, version: int | None) -> None:
+    """Checks that a page of open cases is of the version of the cursor.
+
+    Args:
+        page (dict): Page of open cases returned by the Node.
+        version (int | None): Version of the cursor, *None* accepts any page.
+
+    Raises:
+        StaleCursor: A case was opened or closed since the cursor was issued.
+    """
+    if version is not None and page["version"] != version:
+        raise StaleCursor("Open cases changed, start again from the first page.")
+
+def wants_ndjson(request) -> bool:
+    return NDJSON in request.headers.get("Accept", "")
+
+
+async def item_pages(node_connection_client, from_id: int):
+    """Yields the items from *from_id* on page by page, *None* if the Node fails."""
+    while True:
+        page = await get_items(node_connection_client, from_id, ITEMS_PAGE_SIZE)
+        if page is None:
+            yield None
+            return
+        if not page["items"]:
+            return
+        yield page["items"]
+        from_id += len(page["items"])
+        if from_id > page["total"]:
+            return
+
+async def case_pages(node_connection_client, user_id, field: int | None, offset: int, version: int = None):
+    """Yields the open cases from *offset* on page by page, *None* if the Node fails.
+
+    All pages must be of one version of the open cases, the version of the
+    cursor if given, otherwise that of the first page. A change after the
+    first page ends the pages with *None*.
+
+    Raises:
+        StaleCursor: The first page is not of the version of the cursor.
+    """
+    first = True
+    while True:
+        page = await get_open_expert_cases(node_connection_client, user_id, field, offset, CASES_PAGE_SIZE)
+        if page is None:
+            yield None
+            return
+        try:
+            check_cases_version(page, version)
+        except StaleCursor:
+            if first:
+                raise
+            yield None
+            return
+        first, version = False, page["version"]
+        if not page["cases"]:
+            return
+        yield page["cases"]
+        offset += len(page["cases"])
+        if offset >= page["total"]:
+            return
+
+async def stream_ndjson(request, pages, error: str):
+    """Streams the records of the pages as newline delimited JSON.
+
+    Only one page is held in memory, the first records go out as soon as the
+    first page is read. A failure after the first page ends the stream with
+    an {"error": ...} record.
+
+    Args:
+        request (Request): The request to respond to.
+        pages: Async iterator of lists of records, *None* on failure.
+        error (str): Message of the failure.
+
+    Raises:
+        ServerError: The first page could not be read.
+    """
+    page = await anext(pages, [])
+    if page is None:
+        raise ServerError(error)
+
+    resp = await request.respond(content_type=NDJSON, headers={"Cache-Control": "no-cache"})
+    if page:
+        await resp.send(_lines(page))
+    async for page in pages:
+        if page is None:
+            await resp.send(_lines([{"error": error}]))
+            break
+        await resp.send(_lines(page))
+    await resp.eof()
+
+def _lines(records: list) -> str:
+    return "".join(json.dumps(record) + "\n" for record in records)
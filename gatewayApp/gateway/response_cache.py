@@ -0,0 +1,139 @@
+"""
+Cache of list responses with ETag support.
+"""
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from sanic import response
+
+# Resources whose lists are cached, each has a version number. Items are
+# added through the gateway, which bumps "items" once they are mined; cases
+# open and close on chain without passing through it, so "cases" follows the
+# version of the open cases the Node reports with every list.
+RESOURCES: tuple[str, ...] = ("items", "cases")
+
+
+@dataclass
+class CachedResponse:
+    version: int
+    expires: float
+    etag: str
+    body: bytes
+
+
+class ResponseCache():
+    """LRU cache of JSON list responses keyed by resource and parameters.
+
+    Every resource has a version number which the gateway bumps when it
+    changes the resource, e.g. once an added item is mined, or moves to a
+    newer version the Node reports. Cached responses of older versions are
+    not used. Changes nobody has seen yet are picked up after MAX_AGE at the
+    latest.
+
+    Responses carry an ETag, a request with a matching If-None-Match gets
+    304 Not Modified. As long as the response is cached this needs no Node
+    call at all.
+
+    Args:
+        versions (optional): Mutable sequence with a version per resource in
+            RESOURCES, e.g. a shared *multiprocessing.Array* so that all workers
+            see the bumps. Defaults to a local list.
+        max_size (int, optional): Maximum number of cached responses.
+            Defaults to MAX_SIZE.
+    """
+    MAX_SIZE: int = 1000
+    MAX_AGE: float = 5 #[s]
+
+    def __init__(self, versions=None, max_size: int = MAX_SIZE) -> None:
+        self._versions = versions if versions is not None else [0] * len(RESOURCES)
+        self._max_size: int = max_size
+        self._responses: OrderedDict[tuple, CachedResponse] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.not_modified: int = 0
+
+    def version(self, resource: str) -> int:
+        return self._versions[RESOURCES.index(resource)]
+
+    def bump(self, resource: str) -> None:
+        """Invalidates the cached responses of the resource."""
+        self._change_version(resource, lambda current: current + 1)
+
+    def observe(self, resource: str, version: int) -> None:
+        """Moves the resource to a version reported by the Node.
+
+        Cached responses of older versions are no longer used; a version
+        older than the current one is ignored.
+        """
+        self._change_version(resource, lambda current: max(current, version))
+
+    def _change_version(self, resource: str, change) -> None:
+        index = RESOURCES.index(resource)
+        lock = getattr(self._versions, 'get_lock', None)
+        if lock:
+            with lock():
+                self._versions[index] = change(self._versions[index])
+        else:
+            self._versions[index] = change(self._versions[index])
+
+    def _get(self, key: tuple, version: int) -> CachedResponse | None:
+        cached = self._responses.get(key)
+        if cached is None or cached.version != version or cached.expires <= time.time():
+            return None
+        self._responses.move_to_end(key)
+        return cached
+
+    def _put(self, key: tuple, version: int, data) -> CachedResponse:
+        body = json.dumps(data).encode()
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        cached = CachedResponse(version, time.time() + self.MAX_AGE, etag, body)
+        self._responses[key] = cached
+        self._responses.move_to_end(key)
+        if len(self._responses) > self._max_size:
+            self._responses.popitem(last=False)
+        return cached
+
+    async def respond(self, request, resource: str, params: tuple, fetch):
+        """Answers a list request from the cache or with *fetch*.
+
+        Args:
+            request (Request): The request, its If-None-Match header is honoured.
+            resource (str): One of RESOURCES.
+            params (tuple): Parameters of the list.
+            fetch: Coroutine function returning the JSON data, or *None* on failure.
+
+        Returns:
+            HTTPResponse | None: The response, *None* if *fetch* failed.
+        """
+        key = (resource, *params)
+        version = self.version(resource)
+        cached = self._get(key, version)
+        if cached is None:
+            self.misses += 1
+            data = await fetch()
+            if data is None:
+                return None
+            cached = self._put(key, version, data)
+        else:
+            self.hits += 1
+
+        headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+        if_none_match = request.headers.get("If-None-Match", "")
+        if cached.etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+            self.not_modified += 1
+            return response.empty(status=304, headers=headers)
+        return response.raw(cached.body, content_type="application/json", headers=headers)
+
+    def stats(self) -> dict:
+        """Returns the size and hit rate of the cache."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._responses),
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
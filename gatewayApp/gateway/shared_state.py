@@ -0,0 +1,45 @@
+"""
+State shared by the gateway worker processes.
+
+The main process starts a manager process which owns the shared objects,
+workers use them through proxies over a local socket.
+"""
+from multiprocessing import Array
+from multiprocessing.managers import SyncManager
+
+from .challenge import ReplayFilter
+from .key_store import KeyStore
+from .response_cache import RESOURCES
+
+
+class StateManager(SyncManager):
+    """Manager serving the objects shared by the workers."""
+
+
+# A nonce used on one worker must be rejected on all of them
+StateManager.register('ReplayFilter', ReplayFilter)
+# A user registered through one worker logs in through another
+StateManager.register('KeyStore', KeyStore)
+
+
+def start_shared_state(app) -> None:
+    """Starts the manager and publishes the shared objects in *app.shared_ctx*.
+
+    Must be called in the main process before the workers start.
+
+    Args:
+        app (Sanic): The gateway app.
+    """
+    manager = StateManager()
+    manager.start()
+    app.ctx.state_manager = manager
+    app.shared_ctx.replay_filter = manager.ReplayFilter()
+    app.shared_ctx.key_store = manager.KeyStore()
+    # Read on every cached list request, so kept in shared memory
+    app.shared_ctx.cache_versions = Array('q', len(RESOURCES))
+
+def stop_shared_state(app) -> None:
+    """Stops the manager started by start_shared_state."""
+    manager = getattr(app.ctx, 'state_manager', None)
+    if manager:
+        manager.shutdown()
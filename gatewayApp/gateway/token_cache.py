@@ -0,0 +1,96 @@
+"""
+Cache of recently verified JWT tokens.
+"""
+import hashlib
+import time
+from collections import OrderedDict
+
+
+class TokenCache():
+    """Bounded LRU cache of JWT tokens that passed verification.
+
+    Clients reuse the same bearer token for many requests, a hit replaces
+    decoding and checking the HMAC of the token with a dictionary lookup.
+    Tokens are stored by their SHA-256 digest together with the time they
+    stop being valid: the *exp* claim, but at most MAX_AGE from verification.
+    The cache is cleared when the signing secret changes.
+
+    Args:
+        max_size (int, optional): Maximum number of cached tokens.
+            Defaults to MAX_SIZE.
+    """
+    MAX_SIZE: int = 10_000
+    MAX_AGE: float = 300 #[s]
+
+    def __init__(self, max_size: int = MAX_SIZE) -> None:
+        self._max_size: int = max_size
+        self._tokens: OrderedDict[bytes, float] = OrderedDict()
+        self._secret: str = None
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def _check_secret(self, secret: str) -> None:
+        if secret != self._secret:
+            self._tokens.clear()
+            self._secret = secret
+
+    def check(self, token: str, secret: str) -> bool:
+        """Checks if the token was verified with the secret and is still valid.
+
+        Args:
+            token (str): Encoded JWT token.
+            secret (str): Current signing secret.
+
+        Returns:
+            bool: *True* on a cache hit.
+        """
+        self._check_secret(secret)
+        key = self._key(token)
+        valid_until = self._tokens.get(key)
+        if valid_until is None:
+            self.misses += 1
+            return False
+        if valid_until <= time.time():
+            del self._tokens[key]
+            self.misses += 1
+            return False
+
+        self._tokens.move_to_end(key)
+        self.hits += 1
+        return True
+
+    def add(self, token: str, secret: str, exp: float = None) -> None:
+        """Stores a token that passed verification.
+
+        Args:
+            token (str): Encoded JWT token.
+            secret (str): Secret the token was verified with.
+            exp (float, optional): The *exp* claim of the token. Defaults to *None*.
+        """
+        self._check_secret(secret)
+        valid_until = time.time() + self.MAX_AGE
+        if exp is not None:
+            valid_until = min(valid_until, exp)
+
+        key = self._key(token)
+        self._tokens[key] = valid_until
+        self._tokens.move_to_end(key)
+        if len(self._tokens) > self._max_size:
+            self._tokens.popitem(last=False)
+
+    def clear(self) -> None:
+        self._tokens.clear()
+
+    def stats(self) -> dict:
+        """Returns the size and hit rate of the cache."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._tokens),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
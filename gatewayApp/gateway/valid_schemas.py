@@ -20,3 +20,4 @@ class ValidAuthRequest:
     """ Schema for the authentication request."""
     user_id: str
     signed_challenge: str
+    challenge: str | None = None # Decrypted challenge, required with stateless challenges
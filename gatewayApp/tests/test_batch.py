@@ -0,0 +1,54 @@
+"""
+Tests of batched operations.
+"""
+import asyncio
+import json
+
+from gateway.batch import run_batch
+from gateway.node_connection_client import Message, Type
+
+
+class FakeNodeConnectionClient():
+    """Answers every message of a BATCH like a Node without items and cases."""
+    def __init__(self):
+        self.requests = []
+
+    async def request_async(self, message, timeout=None):
+        self.requests.append(message.get_type())
+        responses = []
+        for m in json.loads(message.get_payload()):
+            m = Message.from_json(m)
+            if m.get_type() == Type.TX_STATUS:
+                responses.append(Message(type=Type.ERROR, status=404, payload="Ticket not found."))
+            elif m.get_type() == Type.CURRENT_LEADER:
+                responses.append(Message(type=Type.RETURN, status=200, payload=json.dumps(
+                    {"case_id": json.loads(m.get_payload())["case_id"], "option": 1, "votes": 2, "voters_count": 3})))
+            else:
+                responses.append(Message(type=Type.RETURN, status=200, payload=json.dumps(
+                    {"items": [], "cases": [], "total": 0})))
+        return Message(type=Type.RETURN, status=200, payload=json.dumps([r.to_json() for r in responses]))
+
+
+def test_batch_results_in_order_with_one_node_request():
+    client = FakeNodeConnectionClient()
+    results = asyncio.run(run_batch(client, [
+        {"op": "expert/check", "args": {"user_id": "alice", "field": 1}},
+        {"op": "items/all", "args": {"from": 1, "count": 10}},
+        {"op": "expert/case/all", "args": {"field": 2}},
+        {"op": "tx", "args": {"ticket": "t"}},
+        {"op": "unknown"},
+        {"op": "items/all", "args": {"count": "many"}},
+        {"op": "expert/case/leader", "args": {"case_id": 7}},
+    ]))
+
+    assert client.requests == [Type.BATCH]
+    assert [result["status"] for result in results] == [200, 200, 200, 404, 400, 400, 200]
+    assert results[0]["body"] == {"is_expert": True}
+    assert results[1]["body"] == {"items": [], "total": 0}
+    assert results[2]["body"] == {"open_cases": [], "total": 0}
+    assert results[6]["body"] == {"case_id": 7, "option": 1, "votes": 2, "voters_count": 3}
+
+def test_batch_without_node_operations_needs_no_node_request():
+    client = FakeNodeConnectionClient()
+    asyncio.run(run_batch(client, [{"op": "expert/check", "args": {"user_id": "alice", "field": 1}}]))
+    assert client.requests == []
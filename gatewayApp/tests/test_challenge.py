@@ -0,0 +1,33 @@
+"""
+Tests of the stateless login challenges.
+"""
+import time
+
+from gateway.challenge import ReplayFilter, issue_challenge, verify_challenge
+
+
+def test_challenge_is_bound_to_user_and_secret():
+    challenge = issue_challenge("secret", "alice")
+    nonce, expires = verify_challenge("secret", "alice", challenge)
+    assert nonce in challenge and expires > time.time()
+    assert verify_challenge("secret", "bob", challenge) is None
+    assert verify_challenge("other secret", "alice", challenge) is None
+    assert verify_challenge("secret", "alice", challenge.replace(str(expires), str(expires + 60))) is None
+
+def test_expired_challenge_is_rejected():
+    assert verify_challenge("secret", "alice", issue_challenge("secret", "alice", ttl=-1)) is None
+    assert verify_challenge("secret", "alice", "garbage") is None
+
+def test_replay_filter():
+    replay_filter = ReplayFilter(max_size=2)
+    assert replay_filter.use("a", time.time() + 60)
+    assert not replay_filter.use("a", time.time() + 60)
+    assert replay_filter.use("b", time.time() + 60)
+    # Full of unexpired nonces
+    assert not replay_filter.use("c", time.time() + 60)
+
+def test_replay_filter_forgets_expired_nonces():
+    replay_filter = ReplayFilter(max_size=1)
+    assert replay_filter.use("a", time.time() - 1)
+    assert replay_filter.use("b", time.time() + 60)
+    assert len(replay_filter) == 1
@@ -0,0 +1,36 @@
+"""
+Tests of the thread pool for crypto operations.
+"""
+import asyncio
+import threading
+
+import pytest
+
+from gateway.crypto_pool import CryptoPool, CryptoPoolFull
+
+
+def test_run_returns_result_and_records_stats():
+    pool = CryptoPool(workers=2)
+    assert asyncio.run(pool.run(pow, 2, 10)) == 1024
+    stats = pool.stats()
+    assert stats["completed"] == 1
+    assert stats["queued"] == 0 and stats["running"] == 0
+    pool.shutdown()
+
+def test_full_queue_is_rejected():
+    pool = CryptoPool(workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def burst():
+        busy = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0.05)
+        queued = asyncio.ensure_future(pool.run(pow, 2, 2))
+        await asyncio.sleep(0)
+        with pytest.raises(CryptoPoolFull):
+            await pool.run(pow, 2, 3)
+        release.set()
+        return await busy, await queued
+
+    assert asyncio.run(burst()) == (True, 4)
+    assert pool.stats()["rejected"] == 1
+    pool.shutdown()
@@ -0,0 +1,73 @@
+"""
+Tests of the cache of parsed public keys.
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+
+from gateway.auth import authenticate
+from gateway.crypto_pool import CryptoPool
+from gateway.key_cache import PublicKeyCache
+from gateway.key_store import KeyStore
+from gateway.node_connection_client import Message, Type
+from gateway.valid_schemas import ValidAuthRequest
+
+
+def _public_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=1024).public_key()
+
+def test_get_put_invalidate():
+    cache = PublicKeyCache()
+    public_key = _public_key()
+    assert cache.get("user") is None
+    cache.put("user", public_key)
+    assert cache.get("user") is public_key
+    cache.invalidate("user")
+    assert cache.get("user") is None
+    assert cache.stats()["hits"] == 1
+
+def test_least_recently_used_key_is_evicted():
+    cache = PublicKeyCache(max_size=1)
+    cache.put("a", _public_key())
+    cache.put("b", _public_key())
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+
+
+class UnknownUserNodeConnectionClient():
+    """A Node without the user, keys come from the key store."""
+    async def request_async(self, message, timeout=None):
+        return Message(type=Type.ERROR, status=404, payload="User not found.")
+
+def test_stale_key_is_evicted_after_one_failed_login():
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=1024)
+    key_store = KeyStore()
+    key_store.add("alice", private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode())
+    app = SimpleNamespace(
+        ctx=SimpleNamespace(public_key_cache=PublicKeyCache(), key_store=key_store,
+                            crypto_pool=CryptoPool(1), challenges={}),
+        config=SimpleNamespace(STATELESS_CHALLENGES=False, SECRET="secret"),
+    )
+    app.ctx.public_key_cache.put("alice", _public_key())
+    request = SimpleNamespace(app=app)
+
+    def login():
+        app.ctx.challenges["alice"] = b"challenge"
+        signature = private_key.sign(
+            b"challenge",
+            padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH),
+            hashes.SHA256()
+        )
+        body = ValidAuthRequest(user_id="alice", signed_challenge=signature.hex())
+        return json.loads(asyncio.run(authenticate(UnknownUserNodeConnectionClient(), request, body)).body)
+
+    assert "access_token" not in login()
+    assert app.ctx.public_key_cache.get("alice") is None
+    assert "access_token" in login()
+    app.ctx.crypto_pool.shutdown()
@@ -0,0 +1,61 @@
+"""
+Tests of the store of registered public keys.
+"""
+import asyncio
+
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from gateway.key_store import KeyStore
+from gateway.node_connection import add_public_key
+from gateway.node_connection import get_public_key
+from gateway.node_connection_client import Message, Type
+from gateway.shared_state import StateManager
+
+
+class FakeNodeConnectionClient():
+    """Answers REGISTER with *status*, knows no public keys."""
+    def __init__(self, status):
+        self.status = status
+
+    async def request_async(self, message, timeout=None):
+        if message.get_type() == Type.REGISTER and self.status == 202:
+            return Message(type=Type.RETURN, status=202, payload='{"ticket": "t"}')
+        return Message(type=Type.ERROR, status=self.status, payload="Rejected.")
+
+
+def _public_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=1024).public_key()
+
+def test_add_once():
+    key_store = KeyStore()
+    assert key_store.add("user", "PEM")
+    assert not key_store.add("user", "other PEM")
+    assert key_store.exists("user")
+    assert key_store.get("user") == "PEM"
+    assert key_store.get("other") is None
+
+def test_key_stored_only_when_node_accepts():
+    key_store = KeyStore()
+    public_key = _public_key()
+
+    assert asyncio.run(add_public_key(FakeNodeConnectionClient(500), key_store, "user", public_key)) is None
+    assert not key_store.exists("user")
+
+    assert asyncio.run(add_public_key(FakeNodeConnectionClient(202), key_store, "user", public_key)) == "t"
+    stored = asyncio.run(get_public_key(FakeNodeConnectionClient(404), key_store, "user"))
+    assert stored.public_numbers() == public_key.public_numbers()
+    with pytest.raises(ValueError):
+        asyncio.run(add_public_key(FakeNodeConnectionClient(202), key_store, "user", public_key))
+
+def test_shared_between_processes():
+    manager = StateManager()
+    manager.start()
+    try:
+        key_store = manager.KeyStore()
+        assert key_store.add("user", "PEM")
+        assert not key_store.add("user", "PEM")
+        assert key_store.exists("user")
+        assert key_store.get("user") == "PEM"
+    finally:
+        manager.shutdown()
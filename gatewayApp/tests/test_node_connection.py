@@ -0,0 +1,98 @@
+"""
+Tests of the coalescing of NODE lookups, of transaction status polling and
+of queued item additions.
+"""
+import asyncio
+import json
+
+import pytest
+
+from gateway import node_connection
+from gateway.node_connection import add_item
+from gateway.node_connection import add_items
+from gateway.node_connection import get_items
+from gateway.node_connection import get_transaction_status
+from gateway.node_connection_client import Message, Type
+
+
+class FakeNodeConnectionClient():
+    def __init__(self, status=200):
+        self.status = status
+        self.requests = []
+
+    async def request_async(self, message, timeout=None):
+        self.requests.append(message.get_payload())
+        await asyncio.sleep(0.01)
+        if self.status is None:
+            raise ConnectionError("Node unavailable")
+        return Message(type=Type.RETURN, status=self.status, payload=json.dumps({"items": [], "total": 0}))
+
+
+def test_concurrent_identical_lookups_share_one_request():
+    client = FakeNodeConnectionClient()
+
+    async def burst():
+        return await asyncio.gather(*[get_items(client, 1, 10) for _ in range(20)], get_items(client, 11, 10))
+
+    results = asyncio.run(burst())
+    assert all(result == {"items": [], "total": 0} for result in results)
+    assert len(client.requests) == 2
+
+    # Nothing is cached after completion
+    asyncio.run(get_items(client, 1, 10))
+    assert len(client.requests) == 3
+
+def test_error_is_propagated_to_all_callers():
+    client = FakeNodeConnectionClient(status=None)
+
+    async def burst():
+        return await asyncio.gather(*[get_items(client, 1, 10) for _ in range(5)], return_exceptions=True)
+
+    assert all(isinstance(result, ConnectionError) for result in asyncio.run(burst()))
+    assert len(client.requests) == 1
+    with pytest.raises(ConnectionError):
+        asyncio.run(get_items(client, 1, 10))
+
+
+class TicketNodeConnectionClient():
+    """Answers TX_STATUS right away, the ticket is mined on poll *mined_on*."""
+    def __init__(self, mined_on=None):
+        self.mined_on = mined_on
+        self.polls = 0
+
+    async def request_async(self, message, timeout=None):
+        self.polls += 1
+        status = "mined" if self.mined_on and self.polls >= self.mined_on else "pending"
+        return Message(type=Type.RETURN, status=200, payload=json.dumps({"ticket": "t", "status": status}))
+
+
+def test_transaction_status_wait_polls_until_done(monkeypatch):
+    monkeypatch.setattr(node_connection, "TX_POLL_INTERVAL", 0.01)
+    client = TicketNodeConnectionClient(mined_on=3)
+
+    assert asyncio.run(get_transaction_status(client, "t", wait=5))["status"] == "mined"
+    assert client.polls == 3
+
+def test_transaction_status_wait_times_out(monkeypatch):
+    monkeypatch.setattr(node_connection, "TX_POLL_INTERVAL", 0.01)
+    client = TicketNodeConnectionClient()
+
+    assert asyncio.run(get_transaction_status(client, "t"))["status"] == "pending"
+    assert client.polls == 1
+    assert asyncio.run(get_transaction_status(client, "t", wait=0.05))["status"] == "pending"
+    assert client.polls > 2
+
+
+class ItemsNodeConnectionClient():
+    """Queues every ADD_ITEMS request in one transaction."""
+    async def request_async(self, message, timeout=None):
+        ticket = {"ticket": f"ticket-{len(json.loads(message.get_payload())['items'])}", "status": "queued"}
+        return Message(type=Type.RETURN, status=202, payload=json.dumps({"tickets": [ticket]}))
+
+def test_added_items_return_ticket_ids():
+    client = ItemsNodeConnectionClient()
+    item = {"category": "Books", "item_info": "Inception", "owner_public_key": "key"}
+
+    # The same ids as /register returns, ready for /tx/<ticket>
+    assert asyncio.run(add_item(client, "Books", "Inception", "key")) == "ticket-1"
+    assert asyncio.run(add_items(client, [item, item])) == ["ticket-2"]
@@ -0,0 +1,118 @@
+"""
+Tests of the pool of connections with the Node.
+"""
+import asyncio
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+from gateway.node_connection_client import Message, NodeConnectionClient, Type
+from gateway.node_connection_pool import NodeConnectionPool
+
+
+@pytest.fixture
+def slow_node(monkeypatch):
+    """Every connection answers after 0.1 s, one message at a time."""
+    in_use = set()
+
+    def request(self, message, timeout=None):
+        assert self not in in_use, "connection used concurrently"
+        in_use.add(self)
+        time.sleep(0.1)
+        in_use.discard(self)
+        return Message(type=Type.RETURN, status=200, payload=threading.current_thread().name)
+
+    monkeypatch.setattr(NodeConnectionClient, "request", request)
+
+def _burst(pool, requests):
+    async def burst():
+        start = time.monotonic()
+        await asyncio.gather(*[pool.request_async(Message(Type.PING)) for _ in range(requests)])
+        return time.monotonic() - start
+    return asyncio.run(burst())
+
+def test_requests_use_connections_concurrently(slow_node):
+    pool = NodeConnectionPool(size=4)
+    assert _burst(pool, 4) < 0.2
+    assert pool.stats() == {"size": 4, "idle": 4}
+
+def test_requests_wait_for_an_idle_connection(slow_node):
+    pool = NodeConnectionPool(size=2)
+    assert 0.3 <= _burst(pool, 5) < 0.4
+    assert pool.stats()["idle"] == 2
+
+def test_unconnected_request_fails():
+    with pytest.raises(ConnectionError):
+        NodeConnectionClient().request(Message(Type.PING))
+
+@pytest.fixture
+def handshakes(monkeypatch):
+    """Connections connect after *delay*; the attempts numbered in *give_up* fail."""
+    attempts = []
+    settings = {"delay": 0, "give_up": ()}
+
+    def connection_manager(self):
+        attempts.append(self)
+        time.sleep(settings["delay"])
+        if len(attempts) in settings["give_up"]:
+            self.exit()
+        else:
+            self._running = True
+            self._handshake_done.set()
+
+    def request(self, message, timeout=None):
+        if not self.is_connected():
+            raise ConnectionError("Not connected to the Node.")
+        return Message(type=Type.RETURN, status=200)
+
+    monkeypatch.setattr(NodeConnectionClient, "connection_manager", connection_manager)
+    monkeypatch.setattr(NodeConnectionClient, "request", request)
+    return attempts, settings
+
+def test_request_waits_for_the_handshake(handshakes):
+    _, settings = handshakes
+    settings["delay"] = 0.2
+    pool = NodeConnectionPool(size=1)
+    pool.start()
+
+    assert 0.2 <= _burst(pool, 1) < 0.3
+
+def test_closed_connection_is_replaced(handshakes):
+    attempts, settings = handshakes
+    settings["give_up"] = (1,)
+    pool = NodeConnectionPool(size=1)
+    pool.start()
+    assert not pool.connections[0].wait_connected(1)
+
+    response = asyncio.run(pool.request_async(Message(Type.PING)))
+    assert response.get_status() == 200
+    assert len(attempts) == 2
+    assert pool.connections == [attempts[1]]
+    assert pool.stats() == {"size": 1, "idle": 1}
+
+def test_timed_out_exchange_closes_the_connection():
+    connection = NodeConnectionClient()
+    connection.node_socket, node_end = socket.socketpair()
+    connection._aes_key = os.urandom(32)
+    connection._running = True
+
+    with pytest.raises(TimeoutError):
+        connection.request(Message(Type.PING), timeout=0.05)
+    assert connection.is_closed()
+    assert not connection.is_connected()
+    node_end.close()
+
+def test_exit_after_the_node_is_gone():
+    connection = NodeConnectionClient()
+    connection.node_socket, node_end = socket.socketpair()
+    connection._aes_key = os.urandom(32)
+    connection._running = True
+    node_end.close()
+    connection.node_socket.close()
+
+    connection.exit()
+    connection.exit()
+    assert connection.is_closed()
@@ -0,0 +1,91 @@
+"""
+Tests of cursor pagination.
+"""
+import asyncio
+import json
+
+import pytest
+
+from gateway.node_connection_client import Message, Type
+from gateway.pagination import StaleCursor
+from gateway.pagination import case_pages, check_cases_version
+from gateway.pagination import decode_cursor, encode_cursor, item_pages, next_cases_cursor, next_items_cursor
+
+
+class FakeNodeConnectionClient():
+    """Node with items 1..total, failing after *fail_after* requests."""
+    def __init__(self, total, fail_after=None):
+        self.total = total
+        self.fail_after = fail_after
+        self.requests = 0
+
+    async def request_async(self, message, timeout=None):
+        self.requests += 1
+        if self.fail_after is not None and self.requests > self.fail_after:
+            return Message(type=Type.ERROR, status=503, payload="Blockchain unavailable.")
+        request = json.loads(message.get_payload())
+        ids = range(request["from_id"], min(request["from_id"] + request["count"], self.total + 1))
+        return Message(type=Type.RETURN, status=200, payload=json.dumps(
+            {"items": [{"item_id": i} for i in ids], "total": self.total}))
+
+
+class FakeCasesNodeConnectionClient():
+    """Node with open cases 1..total, a case opens after *open_after* requests."""
+    def __init__(self, total, version=7, open_after=None):
+        self.total = total
+        self.version = version
+        self.open_after = open_after
+        self.requests = 0
+
+    async def request_async(self, message, timeout=None):
+        self.requests += 1
+        if self.open_after is not None and self.requests > self.open_after:
+            self.total, self.version, self.open_after = self.total + 1, self.version + 1, None
+        request = json.loads(message.get_payload())
+        ids = range(request["offset"] + 1, min(request["offset"] + request["limit"], self.total) + 1)
+        return Message(type=Type.RETURN, status=200, payload=json.dumps(
+            {"cases": [{"case_id": i} for i in ids], "total": self.total, "version": self.version}))
+
+
+async def _collect(pages):
+    return [page async for page in pages]
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor({"from": 42})) == {"from": 42}
+    with pytest.raises(ValueError):
+        decode_cursor("not a cursor")
+
+def test_next_cursors():
+    assert decode_cursor(next_items_cursor(1, {"items": [1, 2], "total": 3})) == {"from": 3}
+    assert next_items_cursor(2, {"items": [2, 3], "total": 3}) is None
+    assert next_items_cursor(9, {"items": [], "total": 3}) is None
+    assert decode_cursor(next_cases_cursor(5, 0, {"cases": [1], "total": 2, "version": 3})) == {
+        "offset": 1, "field": 5, "version": 3}
+    assert next_cases_cursor(None, 1, {"cases": [1], "total": 2, "version": 3}) is None
+
+def test_cursor_rejected_after_cases_change():
+    check_cases_version({"version": 3}, None)
+    check_cases_version({"version": 3}, 3)
+    with pytest.raises(StaleCursor):
+        check_cases_version({"version": 4}, 3)
+
+def test_item_pages_walk_all_items():
+    pages = asyncio.run(_collect(item_pages(FakeNodeConnectionClient(1203), 1)))
+    assert [len(page) for page in pages] == [500, 500, 203]
+    assert pages[-1][-1] == {"item_id": 1203}
+    assert asyncio.run(_collect(item_pages(FakeNodeConnectionClient(0), 1))) == []
+
+def test_item_pages_report_failure():
+    pages = asyncio.run(_collect(item_pages(FakeNodeConnectionClient(1203, fail_after=1), 1)))
+    assert len(pages) == 2 and pages[-1] is None
+
+def test_case_pages_of_one_version():
+    pages = asyncio.run(_collect(case_pages(FakeCasesNodeConnectionClient(250), "user", None, 0)))
+    assert [len(page) for page in pages] == [100, 100, 50]
+
+    with pytest.raises(StaleCursor):
+        asyncio.run(_collect(case_pages(FakeCasesNodeConnectionClient(250), "user", None, 100, version=6)))
+
+def test_case_pages_end_when_cases_change():
+    pages = asyncio.run(_collect(case_pages(FakeCasesNodeConnectionClient(250, open_after=1), "user", None, 0)))
+    assert len(pages) == 2 and pages[-1] is None
@@ -0,0 +1,61 @@
+"""
+Tests of the cache of list responses.
+"""
+import asyncio
+from types import SimpleNamespace
+
+from gateway.response_cache import ResponseCache
+
+
+def _request(etag=None):
+    return SimpleNamespace(headers={"If-None-Match": etag} if etag else {})
+
+def _respond(cache, fetched, etag=None, params=(1, 500)):
+    async def fetch():
+        fetched.append(params)
+        return {"items": [len(fetched)]}
+    return asyncio.run(cache.respond(_request(etag), "items", params, fetch))
+
+def test_cached_response_and_not_modified():
+    cache, fetched = ResponseCache(), []
+    first = _respond(cache, fetched)
+    assert first.status == 200
+    etag = first.headers["ETag"]
+
+    assert _respond(cache, fetched).body == first.body
+    assert _respond(cache, fetched, etag=etag).status == 304
+    assert _respond(cache, fetched, etag=f"W/{etag}").status == 304
+    assert len(fetched) == 1
+
+    _respond(cache, fetched, params=(1, 10))
+    assert len(fetched) == 2
+
+def test_bump_invalidates_resource():
+    cache, fetched = ResponseCache(), []
+    etag = _respond(cache, fetched).headers["ETag"]
+    cache.bump("cases")
+    assert _respond(cache, fetched, etag=etag).status == 304
+    cache.bump("items")
+    assert _respond(cache, fetched, etag=etag).status == 200
+    assert len(fetched) == 2
+
+def test_failed_fetch_is_not_cached():
+    async def fetch():
+        return None
+    cache = ResponseCache()
+    assert asyncio.run(cache.respond(_request(), "items", (), fetch)) is None
+    assert cache.stats()["size"] == 0
+
+def test_observed_node_version_invalidates_older_responses():
+    cache, fetched = ResponseCache(), []
+    etag = _respond(cache, fetched).headers["ETag"]
+    cache.observe("items", 7)
+    assert cache.version("items") == 7
+    assert _respond(cache, fetched, etag=etag).status == 200
+
+    # Older or equal versions, e.g. reported by a slower page, change nothing
+    cache.observe("items", 5)
+    cache.observe("items", 7)
+    assert cache.version("items") == 7
+    assert _respond(cache, fetched).status == 200
+    assert len(fetched) == 2
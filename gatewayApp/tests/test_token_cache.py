@@ -0,0 +1,35 @@
+"""
+Tests of the cache of verified JWT tokens.
+"""
+import time
+
+from gateway.token_cache import TokenCache
+
+
+def test_hit_after_add():
+    cache = TokenCache()
+    assert not cache.check("token", "secret")
+    cache.add("token", "secret")
+    assert cache.check("token", "secret")
+    assert cache.stats()["hit_rate"] == 0.5
+
+def test_expired_token_is_a_miss():
+    cache = TokenCache()
+    cache.add("token", "secret", exp=time.time() - 1)
+    assert not cache.check("token", "secret")
+    assert cache.stats()["size"] == 0
+
+def test_secret_rotation_clears_cache():
+    cache = TokenCache()
+    cache.add("token", "secret")
+    assert not cache.check("token", "new secret")
+    assert not cache.check("token", "secret")
+
+def test_least_recently_used_token_is_evicted():
+    cache = TokenCache(max_size=2)
+    cache.add("a", "secret")
+    cache.add("b", "secret")
+    assert cache.check("a", "secret")
+    cache.add("c", "secret")
+    assert cache.check("a", "secret")
+    assert not cache.check("b", "secret")
@@ -2,17 +2,22 @@
 pragma solidity ^0.8.0;
 
 interface IReputationManager {
-    function updateReputation(string memory _user, uint256 _fieldId, int8 _score) external;
-    function getReputation(string memory _user, uint256 _fieldId) external view returns (uint256);
+    function updateReputation(bytes32 _user, uint256 _fieldId, int8 _score) external;
+    function updateReputations(bytes32[] memory _users, uint256 _fieldId, int8[] memory _scores) external;
+    function getReputation(bytes32 _user, uint256 _fieldId) external view returns (uint256);
 }
 
 interface IUserRegistry {
-    function getNickByAddress(string memory _address) external view returns (string memory);
-    function getUserInfo(string memory _nick)
+    function getNickByAddress(bytes32 _userId) external view returns (string memory);
+    function getVoterEligibility(bytes32 _userId, uint256 _fieldId)
+        external
+        view
+        returns (bool registered, bool isBot, bool isExpert);
+    function getUserInfo(bytes32 _userId)
         external
         view
         returns (
-            string memory public_key,
+            string memory nick,
             uint256[] memory expertFields,
             string memory additional_data,
             bool is_bot
@@ -20,31 +25,50 @@ interface IUserRegistry {
 }
 
 contract ExpertCaseManager {
+    // Fixed size fields are packed into two slots, keep their order
     struct ExpertCase {
-        uint256 ECId;
-        uint256 itemId;
-        uint256 fieldId;
-        uint256 minReputation;
+        // Slot 0
+        uint64 ECId;
+        uint64 itemId;
+        uint64 fieldId;
+        // Kept up to date by castVote. On a tie the option that reached the
+        // count first stays in the lead.
+        uint8 leadingOption;
+        // Frozen by closeExpertCase, consumed by settleExpertCase
+        int8 reputationIncrement;
         bool botAllowed;
-        string ECInfo;
-        mapping(string => bool) hasVoted;
-        mapping(string => uint8) voterChoices;
-        string[] voters;
-        mapping(uint8 => uint256) votes;
-        uint8[] optionsVoted; // Added to track voted options
         bool isOpen;
         bool exists;
+        bool isSettled;
+        // Slot 1
+        uint128 minReputation;
+        uint64 leadingVotes;
+        uint64 settledCount;
+
+        string ECInfo;
+        // Voters are identified by keccak256 of their public key;
+        // a choice is stored as option + 1, so 0 means not voted
+        mapping(bytes32 => uint16) voterChoices;
+        bytes32[] voters;
+        mapping(uint8 => uint256) votes;
     }
 
     mapping(uint256 => ExpertCase) private expertCases;
-    uint256 private ECIdCounter;
+    uint64 private ECIdCounter;
+
+    // Open cases, overall and per field; positions are stored + 1 so 0 means absent
+    uint256[] private openCaseIds;
+    mapping(uint256 => uint256) private openCasePosition;
+    mapping(uint256 => uint256[]) private openCaseIdsByField;
+    mapping(uint256 => uint256) private openCaseFieldPosition;
 
     IReputationManager private reputationManager;
     IUserRegistry private userRegistry;
 
-    event ExpertCaseOpened(uint256 ECId, uint256 itemId, string openedBy);
-    event VoteCast(uint256 ECId, string voter, uint8 option);
+    event ExpertCaseOpened(uint256 ECId, uint256 itemId, bytes32 openedBy);
+    event VoteCast(uint256 ECId, bytes32 voter, uint8 option);
     event ExpertCaseClosed(uint256 ECId, uint8 winningOption);
+    event ExpertCaseSettled(uint256 ECId);
 
     constructor(address _reputationManagerAddress, address _userRegistryAddress) {
         reputationManager = IReputationManager(_reputationManagerAddress);
@@ -55,24 +79,30 @@ contract ExpertCaseManager {
         uint256 _itemId,
         uint256 _fieldId,
         uint256 _minReputation,
-        string memory _publicKey,
+        bytes32 _openerId,
         bool _botAllowed,
         string memory _ECInfo
     ) public returns (uint256) {
+        require(_itemId <= type(uint64).max && _fieldId <= type(uint64).max, "uint64_overflow");
+        require(_minReputation <= type(uint128).max, "uint128_overflow");
+
         ECIdCounter++;
-        uint256 newECId = ECIdCounter;
+        uint64 newECId = ECIdCounter;
 
         ExpertCase storage ec = expertCases[newECId];
         ec.ECId = newECId;
-        ec.itemId = _itemId;
-        ec.fieldId = _fieldId;
-        ec.minReputation = _minReputation;
+        ec.itemId = uint64(_itemId);
+        ec.fieldId = uint64(_fieldId);
+        ec.minReputation = uint128(_minReputation);
         ec.botAllowed = _botAllowed;
         ec.ECInfo = _ECInfo;
         ec.isOpen = true;
         ec.exists = true;
 
-        emit ExpertCaseOpened(newECId, _itemId, _publicKey);
+        _addOpenCase(openCaseIds, openCasePosition, newECId);
+        _addOpenCase(openCaseIdsByField[_fieldId], openCaseFieldPosition, newECId);
+
+        emit ExpertCaseOpened(newECId, _itemId, _openerId);
 
         return newECId;
     }
@@ -80,105 +110,132 @@ contract ExpertCaseManager {
     function castVote(
         uint256 _ECId,
         uint8 _option,
-        string memory _publicKey
+        bytes32 _voterId
     ) public {
         require(expertCases[_ECId].exists, "EC_not_exist");
         require(expertCases[_ECId].isOpen, "EC_closed");
 
         ExpertCase storage ec = expertCases[_ECId];
 
-        // Verify voter registration
-        string memory voterNick = userRegistry.getNickByAddress(_publicKey);
-        require(bytes(voterNick).length > 0, "user_not_registered");
-
-        // Get user info
-        (
-            ,
-            uint256[] memory expertFields,
-            ,
-            bool isBot
-        ) = userRegistry.getUserInfo(voterNick);
+        // Verify voter registration, bot status and expertise in one call
+        (bool registered, bool isBot, bool isExpert) = userRegistry.getVoterEligibility(_voterId, ec.fieldId);
+        require(registered, "user_not_registered");
 
         // Check if bots are allowed
         require(ec.botAllowed || !isBot, "bots_not_allowed");
 
         // Check if user is an expert in the required field
-        bool isExpert = false;
-        for (uint256 i = 0; i < expertFields.length; i++) {
-            if (expertFields[i] == ec.fieldId) {
-                isExpert = true;
-                break;
-            }
-        }
         require(isExpert, "not_expert_in_field");
 
         // Check user's reputation
-        uint256 userReputation = reputationManager.getReputation(_publicKey, ec.fieldId);
+        uint256 userReputation = reputationManager.getReputation(_voterId, ec.fieldId);
         require(userReputation >= ec.minReputation, "reputation_too_low");
 
         // Check if user has already voted
-        require(!ec.hasVoted[_publicKey], "already_voted");
+        require(ec.voterChoices[_voterId] == 0, "already_voted");
 
         // Record the vote
-        ec.hasVoted[_publicKey] = true;
-        ec.votes[_option] += 1;
-        ec.voterChoices[_publicKey] = _option;
-        ec.voters.push(_publicKey);
-
-        // Add option to optionsVoted if it's the first vote for that option
-        if (ec.votes[_option] == 1) {
-            ec.optionsVoted.push(_option);
+        uint256 optionVotes = ec.votes[_option] + 1;
+        ec.votes[_option] = optionVotes;
+        ec.voterChoices[_voterId] = uint16(_option) + 1;
+        ec.voters.push(_voterId);
+
+        // A challenger takes the lead only by exceeding the leader
+        if (optionVotes > ec.leadingVotes) {
+            ec.leadingOption = _option;
+            ec.leadingVotes = uint64(optionVotes);
         }
 
-        emit VoteCast(_ECId, _publicKey, _option);
+        emit VoteCast(_ECId, _voterId, _option);
     }
 
+    // Freezes the result; reputations are updated by settleExpertCase
     function closeExpertCase(uint256 _ECId) public {
         require(expertCases[_ECId].exists, "EC_not_exist");
         require(expertCases[_ECId].isOpen, "EC_already_closed");
 
         ExpertCase storage ec = expertCases[_ECId];
         ec.isOpen = false;
+        _removeOpenCase(openCaseIds, openCasePosition, _ECId);
+        _removeOpenCase(openCaseIdsByField[ec.fieldId], openCaseFieldPosition, _ECId);
+
+        // Nobody voted, nothing to settle
+        if (ec.leadingVotes == 0) {
+            ec.isSettled = true;
+            emit ExpertCaseClosed(_ECId, ec.leadingOption);
+            emit ExpertCaseSettled(_ECId);
+            return;
+        }
+
+        int256 reputationIncrementTemp = int256(ec.voters.length / ec.leadingVotes);
+        ec.reputationIncrement = reputationIncrementTemp > 10 ? int8(10) : int8(reputationIncrementTemp);
+
+        emit ExpertCaseClosed(_ECId, ec.leadingOption);
+    }
+
+    // Updates reputations of the next _maxVoters voters of a closed case
+    function settleExpertCase(uint256 _ECId, uint256 _maxVoters) public returns (bool) {
+        require(expertCases[_ECId].exists, "EC_not_exist");
+        require(!expertCases[_ECId].isOpen, "EC_open");
+        require(!expertCases[_ECId].isSettled, "EC_already_settled");
+        require(_maxVoters > 0, "zero_max_voters");
 
-        // Determine the winning option
-        uint8 winningOption;
-        uint256 maxVotes = 0;
-
-        for (uint256 i = 0; i < ec.optionsVoted.length; i++) {
-            uint8 option = ec.optionsVoted[i];
-            uint256 votesForOption = ec.votes[option];
-            if (votesForOption > maxVotes) {
-                maxVotes = votesForOption;
-                winningOption = option;
-            }
+        ExpertCase storage ec = expertCases[_ECId];
+        uint256 start = ec.settledCount;
+        uint16 winningChoice = uint16(ec.leadingOption) + 1;
+        int8 reputationIncrement = ec.reputationIncrement;
+        uint256 end = start + _maxVoters;
+        if (end > ec.voters.length) {
+            end = ec.voters.length;
         }
 
-        uint256 winningVotersCount = 0;
-        for (uint256 i = 0; i < ec.voters.length; i++) {
-            string memory voter = ec.voters[i];
-            if (ec.voterChoices[voter] == winningOption) {
-                winningVotersCount += 1;
-            }
+        // Update reputation for this chunk of voters, all in one call
+        bytes32[] memory voters = new bytes32[](end - start);
+        int8[] memory scores = new int8[](end - start);
+
+        for (uint256 i = start; i < end; i++) {
+            voters[i - start] = ec.voters[i];
+            scores[i - start] = ec.voterChoices[voters[i - start]] == winningChoice ? reputationIncrement : int8(-1);
         }
 
-        int256 reputationIncrementTemp = int256(ec.voters.length / winningVotersCount);
-        int8 reputationIncrement = reputationIncrementTemp > 10 ? int8(10) : int8(reputationIncrementTemp);
-
-        // Update reputation for voters
-        for (uint256 i = 0; i < ec.voters.length; i++) {
-            string memory voter = ec.voters[i];
-            uint8 voterOption = ec.voterChoices[voter];
-            uint256 fieldId = ec.fieldId;
-
-            if (voterOption == winningOption) {
-                reputationManager.updateReputation(voter, fieldId, reputationIncrement);
-            }
-            else {
-                reputationManager.updateReputation(voter, fieldId, -1);
-            }
+        reputationManager.updateReputations(voters, ec.fieldId, scores);
+
+        ec.settledCount = uint64(end);
+        if (end == ec.voters.length) {
+            ec.isSettled = true;
+            emit ExpertCaseSettled(_ECId);
         }
 
-        emit ExpertCaseClosed(_ECId, winningOption);
+        return ec.isSettled;
+    }
+
+    // Leading option so far; the winner once the case is closed
+    function getCurrentLeader(uint256 _ECId)
+        public
+        view
+        returns (
+            uint8 option,
+            uint256 votes,
+            uint256 votersCount
+        )
+    {
+        require(expertCases[_ECId].exists, "EC_not_exist");
+        ExpertCase storage ec = expertCases[_ECId];
+        return (ec.leadingOption, ec.leadingVotes, ec.voters.length);
+    }
+
+    function getSettlementProgress(uint256 _ECId)
+        public
+        view
+        returns (
+            uint256 settledCount,
+            uint256 votersCount,
+            bool isSettled
+        )
+    {
+        require(expertCases[_ECId].exists, "EC_not_exist");
+        ExpertCase storage ec = expertCases[_ECId];
+        return (ec.settledCount, ec.voters.length, ec.isSettled);
     }
 
     function getExpertCase(uint256 _ECId)
@@ -204,4 +261,105 @@ contract ExpertCaseManager {
             ec.isOpen
         );
     }
+
+    function getOpenCases(uint256 _offset, uint256 _limit)
+        public
+        view
+        returns (
+            uint256[] memory ECIds,
+            uint256[] memory itemIds,
+            uint256[] memory fieldIds,
+            uint256[] memory minReputations,
+            string[] memory ECInfos,
+            uint256 total,
+            uint256 version
+        )
+    {
+        (ECIds, itemIds, fieldIds, minReputations, ECInfos, total) = _openCasesPage(openCaseIds, _offset, _limit);
+        version = _openCasesVersion();
+    }
+
+    function getOpenCasesByField(uint256 _fieldId, uint256 _offset, uint256 _limit)
+        public
+        view
+        returns (
+            uint256[] memory ECIds,
+            uint256[] memory itemIds,
+            uint256[] memory fieldIds,
+            uint256[] memory minReputations,
+            string[] memory ECInfos,
+            uint256 total,
+            uint256 version
+        )
+    {
+        (ECIds, itemIds, fieldIds, minReputations, ECInfos, total) = _openCasesPage(openCaseIdsByField[_fieldId], _offset, _limit);
+        version = _openCasesVersion();
+    }
+
+    // Grows with every open and close, pages of the same version fit together:
+    // opened + closed = 2 * opened - still open
+    function _openCasesVersion() private view returns (uint256) {
+        return 2 * uint256(ECIdCounter) - openCaseIds.length;
+    }
+
+    function _addOpenCase(
+        uint256[] storage _ids,
+        mapping(uint256 => uint256) storage _positions,
+        uint256 _ECId
+    ) private {
+        _ids.push(_ECId);
+        _positions[_ECId] = _ids.length;
+    }
+
+    // Swap and pop, the order of open cases is not preserved
+    function _removeOpenCase(
+        uint256[] storage _ids,
+        mapping(uint256 => uint256) storage _positions,
+        uint256 _ECId
+    ) private {
+        uint256 position = _positions[_ECId];
+        if (position == 0) {
+            return;
+        }
+
+        uint256 lastId = _ids[_ids.length - 1];
+        _ids[position - 1] = lastId;
+        _positions[lastId] = position;
+        _ids.pop();
+        delete _positions[_ECId];
+    }
+
+    function _openCasesPage(uint256[] storage _ids, uint256 _offset, uint256 _limit)
+        private
+        view
+        returns (
+            uint256[] memory ECIds,
+            uint256[] memory itemIds,
+            uint256[] memory fieldIds,
+            uint256[] memory minReputations,
+            string[] memory ECInfos,
+            uint256 total
+        )
+    {
+        total = _ids.length;
+        uint256 count = _offset < total ? total - _offset : 0;
+        if (count > _limit) {
+            count = _limit;
+        }
+
+        ECIds = new uint256[](count);
+        itemIds = new uint256[](count);
+        fieldIds = new uint256[](count);
+        minReputations = new uint256[](count);
+        ECInfos = new string[](count);
+
+        for (uint256 i = 0; i < count; i++) {
+            ExpertCase storage ec = expertCases[_ids[_offset + i]];
+            ECIds[i] = ec.ECId;
+            itemIds[i] = ec.itemId;
+            fieldIds[i] = ec.fieldId;
+            minReputations[i] = ec.minReputation;
+            ECInfos[i] = ec.ECInfo;
+        }
+    }
 }
@@ -2,37 +2,63 @@
 pragma solidity ^0.8.0;
 
 contract ItemRegistry {
+    // Ids are consecutive, so an item exists iff 0 < itemId <= itemCounter
+    // and neither the id nor an exists flag needs a slot of its own
     struct Item {
-        uint256 itemId;
+        bytes32 owner; // keccak256 of the owner's public key
         string category;
         string itemInfo;
-        string owner;
-        bool exists;
     }
 
     mapping(uint256 => Item) private items;
     uint256 private itemCounter;
 
-    event ItemAdded(uint256 itemId, string category, string owner);
+    event ItemAdded(uint256 itemId, string category, bytes32 owner);
+    event ItemsAdded(uint256 firstItemId, uint256 count);
 
     function addItem(
         string memory _category,
         string memory _itemInfo,
-        string memory _publicKey
+        bytes32 _ownerId
     ) public returns (uint256) {
+        uint256 newItemId = _addItem(_category, _itemInfo, _ownerId);
+
+        emit ItemAdded(newItemId, _category, _ownerId);
+
+        return newItemId;
+    }
+
+    // Items get consecutive ids, one event for the whole batch
+    function addItems(
+        string[] memory _categories,
+        string[] memory _itemInfos,
+        bytes32[] memory _ownerIds
+    ) public returns (uint256 firstItemId, uint256 count) {
+        count = _categories.length;
+        require(_itemInfos.length == count && _ownerIds.length == count, "length_mismatch");
+
+        firstItemId = itemCounter + 1;
+        for (uint256 i = 0; i < count; i++) {
+            _addItem(_categories[i], _itemInfos[i], _ownerIds[i]);
+        }
+
+        emit ItemsAdded(firstItemId, count);
+    }
+
+    function _addItem(
+        string memory _category,
+        string memory _itemInfo,
+        bytes32 _ownerId
+    ) private returns (uint256) {
         itemCounter++;
         uint256 newItemId = itemCounter;
 
         items[newItemId] = Item({
-            itemId: newItemId,
+            owner: _ownerId,
             category: _category,
-            itemInfo: _itemInfo,
-            owner: _publicKey,
-            exists: true
+            itemInfo: _itemInfo
         });
 
-        emit ItemAdded(newItemId, _category, _publicKey);
-
         return newItemId;
     }
 
@@ -42,11 +68,46 @@ contract ItemRegistry {
         returns (
             string memory category,
             string memory itemInfo,
-            string memory owner
+            bytes32 owner
         )
     {
-        require(items[_itemId].exists, "item_not_exist");
+        require(_itemId > 0 && _itemId <= itemCounter, "item_not_exist");
         Item storage item = items[_itemId];
         return (item.category, item.itemInfo, item.owner);
     }
+
+    // Up to _count items starting at _fromId (ids start at 1)
+    function getItems(uint256 _fromId, uint256 _count)
+        public
+        view
+        returns (
+            uint256[] memory itemIds,
+            string[] memory categories,
+            string[] memory itemInfos,
+            bytes32[] memory owners,
+            uint256 total
+        )
+    {
+        total = itemCounter;
+        if (_fromId == 0) {
+            _fromId = 1;
+        }
+        uint256 count = _fromId <= total ? total - _fromId + 1 : 0;
+        if (count > _count) {
+            count = _count;
+        }
+
+        itemIds = new uint256[](count);
+        categories = new string[](count);
+        itemInfos = new string[](count);
+        owners = new bytes32[](count);
+
+        for (uint256 i = 0; i < count; i++) {
+            Item storage item = items[_fromId + i];
+            itemIds[i] = _fromId + i;
+            categories[i] = item.category;
+            itemInfos[i] = item.itemInfo;
+            owners[i] = item.owner;
+        }
+    }
 }
@@ -2,55 +2,83 @@
 pragma solidity ^0.8.0;
 
 contract ReputationManager {
+    // Counters share one slot, the circular buffer keeps 32 int8 scores per word
     struct Reputation {
-        int256 totalScore;
-        uint256 totalCases;
-        mapping(uint256 => int8) recentScores;
-        uint256 recentIndex;
+        int96 totalScore;
+        uint64 totalCases;
+        uint64 recentIndex;
+        int32 recentSum;       // Running sum of recent scores, read by getReputation
+        uint256[4] recentScores;
     }
 
-    // Use public key (string) to identify users, and fieldId (uint256) for reputation within fields
-    mapping(string => mapping(uint256 => Reputation)) private reputations;
+    // Users are identified by keccak256 of their public key, fieldId (uint256) for reputation within fields
+    mapping(bytes32 => mapping(uint256 => Reputation)) private reputations;
 
     uint256 public constant MAX_RECENT_SCORES = 100;
+    uint256 private constant SCORES_PER_WORD = 32;
 
-    event ReputationUpdated(string user, uint256 indexed fieldId, int8 score);
+    event ReputationUpdated(bytes32 indexed user, uint256 indexed fieldId, int8 score);
+    event ReputationsUpdated(bytes32[] users, uint256 indexed fieldId, int8[] scores);
 
-    // Update the reputation of a user identified by their public key
+    // Update the reputation of a user identified by their user id
     function updateReputation(
-        string memory _user,  // Public key as string
+        bytes32 _user,             // keccak256 of the public key
         uint256 _fieldId,          // Field ID to track reputation in a specific area
         int8 _score                // Score to be added (positive or negative)
     ) external {
+        _updateReputation(_user, _fieldId, _score);
+
+        // Emit the ReputationUpdated event with user id and field ID
+        emit ReputationUpdated(_user, _fieldId, _score);
+    }
+
+    // Update the reputation of several users in one field (e.g. all voters of a case)
+    // with a single call and a single event
+    function updateReputations(
+        bytes32[] memory _users,
+        uint256 _fieldId,
+        int8[] memory _scores
+    ) external {
+        require(_users.length == _scores.length, "length_mismatch");
+
+        for (uint256 i = 0; i < _users.length; i++) {
+            _updateReputation(_users[i], _fieldId, _scores[i]);
+        }
+
+        emit ReputationsUpdated(_users, _fieldId, _scores);
+    }
+
+    function _updateReputation(bytes32 _user, uint256 _fieldId, int8 _score) private {
         Reputation storage rep = reputations[_user][_fieldId];
 
-        // Update the total score and total cases
-        rep.totalScore += _score;
-        rep.totalCases += 1;
+        // Add the score to the recent scores with circular indexing,
+        // once the window is full the overwritten score leaves the running sum
+        uint256 index = rep.recentIndex;
+        uint256 position = index % MAX_RECENT_SCORES;
+        uint256 word = position / SCORES_PER_WORD;
+        uint256 shift = (position % SCORES_PER_WORD) * 8;
 
-        // Add the score to the recent scores array with circular indexing
-        rep.recentScores[rep.recentIndex % MAX_RECENT_SCORES] = _score;
-        rep.recentIndex += 1;
+        uint256 packed = rep.recentScores[word];
+        int256 recentSum = rep.recentSum;
+        if (index >= MAX_RECENT_SCORES) {
+            recentSum -= int8(uint8(packed >> shift));
+        }
+        recentSum += _score;
+        rep.recentScores[word] = (packed & ~(uint256(0xff) << shift)) | (uint256(uint8(_score)) << shift);
 
-        // Emit the ReputationUpdated event with public key and field ID
-        emit ReputationUpdated(_user, _fieldId, _score);
+        // Update the total score and total cases, all in the first slot
+        rep.totalScore += _score;
+        rep.totalCases += 1;
+        rep.recentIndex = uint64(index + 1);
+        rep.recentSum = int32(recentSum);
     }
 
     // Get the sum of recent reputation scores for a user in a specific field
-    function getReputation(string memory _user, uint256 _fieldId)
+    function getReputation(bytes32 _user, uint256 _fieldId)
         external
         view
         returns (int256 sumRecentScores)
     {
-        Reputation storage rep = reputations[_user][_fieldId];
-
-        // Determine the number of recent scores to sum (based on totalCases vs. MAX_RECENT_SCORES)
-        uint256 scoresCount = rep.totalCases > MAX_RECENT_SCORES ? MAX_RECENT_SCORES : rep.totalCases;
-        sumRecentScores = 0;
-
-        // Sum up the recent scores
-        for (uint256 i = 0; i < scoresCount; i++) {
-            sumRecentScores += rep.recentScores[i];
-        }
+        return reputations[_user][_fieldId].recentSum;
     }
 }
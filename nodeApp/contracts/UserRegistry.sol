@@ -1,10 +1,11 @@
 // SPDX-License-Identifier: MIT
 pragma solidity ^0.8.0;
 
+// Users are identified by userId = keccak256(public key). The public key
+// itself is only published in the UserRegistered event.
 contract UserRegistry {
     struct User {
         string nick;
-        string public_key;
         uint256[] expertFields;
         mapping(uint256 => bool) hasExpertField; // For checking duplicates
         string additional_data;
@@ -12,11 +13,11 @@ contract UserRegistry {
         bool exists;
     }
 
-    mapping(string => User) private users;
-    mapping(string => string) private addressToNick;
+    mapping(bytes32 => User) private users;
+    mapping(bytes32 => bytes32) private nickToUserId; // keccak256(nick) -> userId
 
-    event UserRegistered(string nick, string public_key);
-    event ExpertFieldAdded(string nick, uint256 fieldId);
+    event UserRegistered(bytes32 indexed userId, string nick, string public_key);
+    event ExpertFieldAdded(bytes32 indexed userId, uint256 fieldId);
 
     function registerUser(
         string memory _nick,
@@ -24,56 +25,79 @@ contract UserRegistry {
         string memory _additionalData,
         bool _isBot
     ) public returns (string memory) {
-        require(!users[_nick].exists, "nick_already_taken");
-        require(bytes(addressToNick[_publicKey]).length == 0, "address_already_registered");
+        bytes32 userId = keccak256(bytes(_publicKey));
+        bytes32 nickHash = keccak256(bytes(_nick));
+        require(nickToUserId[nickHash] == bytes32(0), "nick_already_taken");
+        require(!users[userId].exists, "address_already_registered");
 
-        User storage user = users[_nick];
+        User storage user = users[userId];
         user.nick = _nick;
-        user.public_key = _publicKey;
         user.additional_data = _additionalData;
         user.is_bot = _isBot;
         user.exists = true;
 
-        addressToNick[_publicKey] = _nick;
+        nickToUserId[nickHash] = userId;
 
-        emit UserRegistered(_nick, _publicKey);
+        emit UserRegistered(userId, _nick, _publicKey);
 
         return "register_success";
     }
 
-    function addExpertField(string memory _nick, uint256 _fieldId) external {
-        require(users[_nick].exists, "user_not_exist");
-        User storage user = users[_nick];
+    function addExpertField(bytes32 _userId, uint256 _fieldId) external {
+        require(users[_userId].exists, "user_not_exist");
+        User storage user = users[_userId];
 
         require(!user.hasExpertField[_fieldId], "field_already_added");
 
         user.expertFields.push(_fieldId);
         user.hasExpertField[_fieldId] = true;
 
-        emit ExpertFieldAdded(_nick, _fieldId);
+        emit ExpertFieldAdded(_userId, _fieldId);
     }
 
-    function getUserInfo(string memory _nick)
+    function getUserInfo(bytes32 _userId)
         public
         view
         returns (
-            string memory public_key,
+            string memory nick,
             uint256[] memory expertFields,
             string memory additional_data,
             bool is_bot
         )
     {
-        require(users[_nick].exists, "user_not_exist");
-        User storage user = users[_nick];
+        require(users[_userId].exists, "user_not_exist");
+        User storage user = users[_userId];
         return (
-            user.public_key,
+            user.nick,
             user.expertFields,
             user.additional_data,
             user.is_bot
         );
     }
 
-    function getNickByAddress(string memory _address) external view returns (string memory) {
-        return addressToNick[_address];
+    function getNickByAddress(bytes32 _userId) external view returns (string memory) {
+        return users[_userId].nick;
+    }
+
+    function getUserIdByNick(string memory _nick) external view returns (bytes32) {
+        return nickToUserId[keccak256(bytes(_nick))];
+    }
+
+    // Everything needed to check a voter, without copying the user record
+    function getVoterEligibility(bytes32 _userId, uint256 _fieldId)
+        external
+        view
+        returns (
+            bool registered,
+            bool isBot,
+            bool isExpert
+        )
+    {
+        User storage user = users[_userId];
+        if (!user.exists) {
+            return (false, false, false);
+        }
+
+        return (true, user.is_bot, user.hasExpertField[_fieldId]);
     }
 }
@@ -2,8 +2,8 @@
 pragma solidity ^0.8.0;
 
 interface IUserRegistry {
-    event UserRegistered(string indexed nick, string public_key);
-    event ExpertFieldAdded(string indexed nick, uint256 fieldId);
+    event UserRegistered(bytes32 indexed userId, string nick, string public_key);
+    event ExpertFieldAdded(bytes32 indexed userId, uint256 fieldId);
 
     function registerUser(
         string memory _nick,
@@ -13,26 +13,45 @@ interface IUserRegistry {
     ) external returns (string memory);
 
     function addExpertField(
-        string memory _nick,
+        bytes32 _userId,
         uint256 _fieldId
     ) external;
 
     function getUserInfo(
-        string memory _nick
+        bytes32 _userId
     )
         external
         view
         returns (
-            string memory public_key,
+            string memory nick,
             uint256[] memory expertFields,
             string memory additional_data,
             bool is_bot
         );
 
     function getNickByAddress(
-        string memory _address
+        bytes32 _userId
     )
         external
         view
         returns (string memory);
+
+    function getUserIdByNick(
+        string memory _nick
+    )
+        external
+        view
+        returns (bytes32);
+
+    function getVoterEligibility(
+        bytes32 _userId,
+        uint256 _fieldId
+    )
+        external
+        view
+        returns (
+            bool registered,
+            bool isBot,
+            bool isExpert
+        );
 }
@@ -1,8 +1,13 @@
+import argparse
 import socket
 import threading
 
+from .case_settler import CaseSettler
+from .fake_chain import FakeChain
 from .gateway_connection_server import GatewayConnectionServer
 from .logger import logger
+from .node_context import NodeContext
+from .transaction_queue import TransactionQueue
 from .user_regitry_interface import *
 
 __version__ = "1.0.0"
@@ -17,7 +22,20 @@ RUNNING: bool = False
 client_handlers: list[GatewayConnectionServer] = []
 client_threads: list[threading.Thread] = []
 
-def node() -> None:
+def get_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    argument_parser = argparse.ArgumentParser(description='Lifesum Node')
+    argument_parser.add_argument('--fake-chain', action='store_true',
+                                 help='use the in-process fake chain instead of Ethereum')
+    argument_parser.add_argument('--latency', type=float, default=0,
+                                 help='simulated RPC latency of the fake chain [s]')
+    argument_parser.add_argument('--block-time', type=float, default=0,
+                                 help='simulated block time of the fake chain [s]')
+    argument_parser.add_argument('--version', action='version', version=f'node {__version__}')
+
+    return argument_parser.parse_args()
+
+def node(arguments: argparse.Namespace) -> None:
     print(rf"""{'\033[95m'}
            __ _  __
           / /(_)/ _| ___  ___ _   _ _ __ ___
@@ -27,8 +45,19 @@ def node() -> None:
         {'\033[32m'}Welcome to the Node. {'\033[93m'}{__version__}{'\033[0m'}
     """)
 
+    context = NodeContext()
     try:
-        blockchain_interface = UserRegistryInterface()
+        if arguments.fake_chain:
+            context.blockchain = FakeChain(latency=arguments.latency, block_time=arguments.block_time)
+        else:
+            context.blockchain = UserRegistryInterface()
+        context.transaction_queue = TransactionQueue(context.blockchain)
+        context.transaction_queue.start()
+        context.case_settler = CaseSettler(context.blockchain, context.transaction_queue)
+        context.case_settler.start()
+
+        # Chain setup is slow, connect in the background and start listening right away
+        threading.Thread(target=context.blockchain.connect, name="blockchain-setup", daemon=True).start()
     except Exception as ex:
         # TODO : handle exceptions
         logger.error(ex)
@@ -46,8 +75,7 @@ def node() -> None:
                 gateway_socket, client_address = server_socket.accept()
                 logger.connection(f"Connection from {client_address}.")
 
-                gateway_handler: GatewayConnectionServer = GatewayConnectionServer(gateway_socket)
-                # gateway_handler: GatewayConnectionServer = GatewayConnectionServer(gateway_socket, blockchain_interface)
+                gateway_handler: GatewayConnectionServer = GatewayConnectionServer(gateway_socket, context)
                 client_handlers.append(gateway_handler)
 
                 # Create a new thread to handle the client
@@ -77,8 +105,13 @@ def node() -> None:
             if thread.is_alive():
                 thread.join(timeout=1)
 
+        if context.case_settler:
+            context.case_settler.stop()
+        if context.transaction_queue:
+            context.transaction_queue.stop()
+
         logger.info("Server stopped.")
 
 
 if __name__ == "__main__":
-    node()
+    node(get_args())
@@ -0,0 +1,100 @@
+
+import queue
+import threading
+
+from .logger import logger
+from .transaction_queue import TransactionQueue, TxStatus
+
+
+class CaseSettler():
+    """Closes expert cases and settles their reputations in the background.
+
+    Settling a case with many voters does not fit into one transaction, so
+    *settleExpertCase* handles at most VOTERS_PER_TX voters and keeps a cursor
+    on chain. The settler closes the case, submits all remaining chunks to the
+    transaction queue at once (nonces keep them in order), waits for them and
+    repeats with the progress read back from the chain until the case is
+    settled. A failed chunk is simply retried in the next round.
+
+    Args:
+        blockchain: Provides *call*.
+        transaction_queue (TransactionQueue): Queue for the close and settle transactions.
+    """
+    VOTERS_PER_TX: int = 100
+    TX_TIMEOUT: float = 600 #[s]
+    MAX_ROUNDS: int = 5
+    POLL_INTERVAL: float = 2 #[s]
+
+    def __init__(self, blockchain, transaction_queue: TransactionQueue) -> None:
+        self._blockchain = blockchain
+        self._transaction_queue: TransactionQueue = transaction_queue
+        self._queue: queue.Queue[int] = queue.Queue()
+        self._scheduled: set[int] = set()
+        self._lock = threading.Lock()
+        self._running: bool = False
+        self._thread: threading.Thread = None
+
+    def start(self) -> None:
+        self._running = True
+        self._thread = threading.Thread(target=self._settler, name="case-settler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=self.POLL_INTERVAL + 1)
+
+    def settle(self, case_id: int) -> bool:
+        """Schedules closing and settling of an expert case.
+
+        Args:
+            case_id (int): Id of the expert case.
+
+        Returns:
+            bool: *False* if the case is already being settled.
+        """
+        with self._lock:
+            if case_id in self._scheduled:
+                return False
+            self._scheduled.add(case_id)
+        self._queue.put(case_id)
+        return True
+
+    def _settler(self) -> None:
+        while self._running:
+            try:
+                case_id = self._queue.get(timeout=self.POLL_INTERVAL)
+            except queue.Empty:
+                continue
+
+            try:
+                self._settle(case_id)
+            except Exception as ex:
+                logger.error(f"Expert case {case_id}: settling failed: {ex}")
+            finally:
+                with self._lock:
+                    self._scheduled.discard(case_id)
+
+    def _settle(self, case_id: int) -> None:
+        *_, is_open = self._blockchain.call('ExpertCaseManager', 'getExpertCase', case_id)
+        if is_open:
+            self._transact([('closeExpertCase', case_id)])
+
+        for _ in range(self.MAX_ROUNDS):
+            settled_count, voters_count, is_settled = self._blockchain.call(
+                'ExpertCaseManager', 'getSettlementProgress', case_id)
+            if is_settled:
+                logger.info(f"Expert case {case_id}: settled {voters_count} voters.")
+                return
+
+            chunks = -(-(voters_count - settled_count) // self.VOTERS_PER_TX)
+            self._transact([('settleExpertCase', case_id, self.VOTERS_PER_TX)] * max(chunks, 1))
+
+        logger.error(f"Expert case {case_id}: not settled after {self.MAX_ROUNDS} rounds.")
+
+    def _transact(self, calls: list[tuple]) -> None:
+        tickets = [self._transaction_queue.submit('ExpertCaseManager', *call) for call in calls]
+        for ticket in tickets:
+            ticket = self._transaction_queue.wait(ticket.ticket_id, self.TX_TIMEOUT)
+            if ticket and ticket.status == TxStatus.FAILED:
+                logger.error(f"Ticket {ticket.ticket_id}: {ticket.function} failed: {ticket.error}")
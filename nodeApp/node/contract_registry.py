@@ -0,0 +1,174 @@
+
+import glob
+import hashlib
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Callable
+
+from eth_abi.decoding import ContextFramesBytesIO
+from eth_abi.registry import registry as abi_registry
+from eth_utils import keccak, to_checksum_address
+
+BUILD_DIR: str = os.path.abspath(os.path.join(os.path.dirname(__file__), '../build'))
+
+
+def _abi_type(param: dict) -> str:
+    """Canonical ABI type of a function parameter, expanding tuples."""
+    if param['type'].startswith('tuple'):
+        components = ','.join(_abi_type(component) for component in param['components'])
+        return f"({components}){param['type'][len('tuple'):]}"
+    return param['type']
+
+
+@dataclass
+class ContractFunction:
+    """Precomputed calldata encoder and result decoder of a contract function."""
+    name: str
+    signature: str
+    selector: bytes
+    output_types: list[str]
+    encoder: Callable = field(repr=False)
+    decoder: Callable = field(repr=False)
+
+    def encode(self, args: tuple) -> bytes:
+        """Encodes a call: selector followed by the ABI encoded arguments."""
+        if not self.encoder:
+            return self.selector
+        return self.selector + self.encoder(tuple(args))
+
+    def decode(self, data: bytes) -> tuple:
+        """Decodes the ABI encoded return data."""
+        if not self.decoder:
+            return ()
+        return self.decoder(ContextFramesBytesIO(data))
+
+    @classmethod
+    def from_abi(cls, entry: dict) -> "ContractFunction":
+        input_types = [_abi_type(param) for param in entry['inputs']]
+        output_types = [_abi_type(param) for param in entry['outputs']]
+        signature = f"{entry['name']}({','.join(input_types)})"
+        return cls(
+            name=entry['name'],
+            signature=signature,
+            selector=keccak(text=signature)[:4],
+            output_types=output_types,
+            # eth_abi has no codec for the empty tuple
+            encoder=abi_registry.get_encoder(f"({','.join(input_types)})") if input_types else None,
+            decoder=abi_registry.get_decoder(f"({','.join(output_types)})") if output_types else None,
+        )
+
+
+@dataclass
+class ContractSpec:
+    """ABI of a compiled contract and its precomputed functions."""
+    name: str
+    abi: list = field(repr=False)
+    functions: dict[str, ContractFunction] = field(repr=False)
+
+    def function(self, name: str) -> ContractFunction:
+        try:
+            return self.functions[name]
+        except KeyError:
+            raise AttributeError(f"{self.name} has no function {name}.") from None
+
+
+class ContractRegistry():
+    """Contracts compiled into *build/contracts*.
+
+    The artifacts are not committed, they are built with `brownie compile`
+    (the node image does this at build time). Artifacts compiled from an
+    older version of a contract source are rejected, a stale ABI would
+    encode calls the deployed contract does not know.
+
+    ABIs are loaded once, selectors and codecs are prepared up front, so building
+    a transaction or a call needs no ABI lookups. Contracts are bound to their
+    addresses lazily, on first use.
+
+    The address of a contract is taken from the environment
+    (UserRegistry -> USER_REGISTRY_ADDRESS) or from the brownie deployment map
+    of the current chain.
+
+    Args:
+        build_dir (str, optional): Brownie build directory. Defaults to BUILD_DIR.
+
+    Raises:
+        FileNotFoundError: No compiled contracts in *build_dir*.
+        ValueError: An artifact is older than its contract source.
+    """
+
+    def __init__(self, build_dir: str = BUILD_DIR) -> None:
+        self._build_dir: str = build_dir
+        self._specs: dict[str, ContractSpec] = {}
+        self._addresses: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+        paths = sorted(glob.glob(os.path.join(build_dir, 'contracts', '*.json')))
+        if not paths:
+            raise FileNotFoundError(f"No compiled contracts in {build_dir}, run `brownie compile` first.")
+        for path in paths:
+            with open(path) as f:
+                artifact = json.load(f)
+            self._check_source(artifact)
+            functions = {
+                entry['name']: ContractFunction.from_abi(entry)
+                for entry in artifact['abi'] if entry['type'] == 'function'
+            }
+            name = artifact.get('contractName', os.path.splitext(os.path.basename(path))[0])
+            self._specs[name] = ContractSpec(name=name, abi=artifact['abi'], functions=functions)
+
+    def _check_source(self, artifact: dict) -> None:
+        """Rejects an artifact whose contract source changed since it was compiled."""
+        source_path = artifact.get('sourcePath')
+        if not source_path or 'sha1' not in artifact:
+            return
+        path = os.path.join(os.path.dirname(self._build_dir), source_path)
+        if not os.path.isfile(path):
+            return
+        with open(path, 'rb') as f:
+            sha1 = hashlib.sha1(f.read()).hexdigest()
+        if sha1 != artifact['sha1']:
+            raise ValueError(f"{artifact.get('contractName', path)} artifact is stale, run `brownie compile`.")
+
+    def names(self) -> list[str]:
+        return list(self._specs)
+
+    def spec(self, contract: str) -> ContractSpec:
+        try:
+            return self._specs[contract]
+        except KeyError:
+            raise ValueError(f"Unknown contract: {contract}") from None
+
+    def function(self, contract: str, function: str) -> ContractFunction:
+        return self.spec(contract).function(function)
+
+    @staticmethod
+    def address_variable(contract: str) -> str:
+        """Environment variable holding the contract address."""
+        return re.sub(r'(?<!^)(?=[A-Z])', '_', contract).upper() + '_ADDRESS'
+
+    def _deployed_address(self, contract: str, chain_id: int) -> str | None:
+        for path in glob.glob(os.path.join(self._build_dir, 'deployments', str(chain_id), '*.json')):
+            with open(path) as f:
+                if json.load(f).get('contractName') == contract:
+                    return os.path.splitext(os.path.basename(path))[0]
+        return None
+
+    def address(self, contract: str, chain_id: int = None) -> str:
+        """Resolves the address of a contract.
+
+        Raises:
+            ValueError: Contract is not deployed.
+        """
+        with self._lock:
+            if contract not in self._addresses:
+                self.spec(contract)
+                address = os.getenv(self.address_variable(contract))
+                if not address and chain_id is not None:
+                    address = self._deployed_address(contract, chain_id)
+                if not address:
+                    raise ValueError(f"{self.address_variable(contract)} not found in environment variables")
+                self._addresses[contract] = to_checksum_address(address)
+            return self._addresses[contract]
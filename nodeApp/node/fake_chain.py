@@ -0,0 +1,390 @@
+
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+from web3.exceptions import ContractLogicError
+
+from .fee_cache import size_in_words
+from .logger import logger
+from .user_regitry_interface import UserRegistryInterface, user_id
+
+
+def _revert(reason: str) -> None:
+    raise ContractLogicError(f"execution reverted: {reason}")
+
+
+def _require(condition: bool, reason: str) -> None:
+    if not condition:
+        _revert(reason)
+
+
+class FakeUserRegistry():
+    """In-memory UserRegistry.sol, users are keyed by user id."""
+    def __init__(self) -> None:
+        self.users: dict[bytes, dict] = {}
+        self.nick_to_user_id: dict[str, bytes] = {}
+
+    def registerUser(self, nick: str, public_key: str, additional_data: str, is_bot: bool) -> str:
+        new_user_id = user_id(public_key)
+        _require(nick not in self.nick_to_user_id, "nick_already_taken")
+        _require(new_user_id not in self.users, "address_already_registered")
+
+        self.users[new_user_id] = {
+            'nick': nick,
+            'expert_fields': [],
+            'additional_data': additional_data,
+            'is_bot': is_bot,
+        }
+        self.nick_to_user_id[nick] = new_user_id
+        return "register_success"
+
+    def addExpertField(self, user: bytes, field_id: int) -> None:
+        _require(user in self.users, "user_not_exist")
+        user = self.users[user]
+        _require(field_id not in user['expert_fields'], "field_already_added")
+        user['expert_fields'].append(field_id)
+
+    def getUserInfo(self, user: bytes) -> tuple:
+        _require(user in self.users, "user_not_exist")
+        user = self.users[user]
+        return (user['nick'], tuple(user['expert_fields']), user['additional_data'], user['is_bot'])
+
+    def getNickByAddress(self, user: bytes) -> str:
+        return self.users[user]['nick'] if user in self.users else ""
+
+    def getUserIdByNick(self, nick: str) -> bytes:
+        return self.nick_to_user_id.get(nick, bytes(32))
+
+    def getVoterEligibility(self, user: bytes, field_id: int) -> tuple:
+        if user not in self.users:
+            return (False, False, False)
+        user = self.users[user]
+        return (True, user['is_bot'], field_id in user['expert_fields'])
+
+
+class FakeItemRegistry():
+    """In-memory ItemRegistry.sol."""
+    def __init__(self) -> None:
+        self.items: dict[int, tuple] = {}
+
+    def addItem(self, category: str, item_info: str, owner: bytes) -> int:
+        item_id = len(self.items) + 1
+        self.items[item_id] = (category, item_info, owner)
+        return item_id
+
+    def addItems(self, categories: list[str], item_infos: list[str], owners: list[bytes]) -> tuple:
+        _require(len(item_infos) == len(categories) and len(owners) == len(categories), "length_mismatch")
+        first_item_id = len(self.items) + 1
+        for item in zip(categories, item_infos, owners):
+            self.addItem(*item)
+        return (first_item_id, len(categories))
+
+    def getItem(self, item_id: int) -> tuple:
+        _require(item_id in self.items, "item_not_exist")
+        return self.items[item_id]
+
+    def getItems(self, from_id: int, count: int) -> tuple:
+        item_ids = tuple(range(max(from_id, 1), len(self.items) + 1))[:count]
+        return (
+            item_ids,
+            tuple(self.items[item_id][0] for item_id in item_ids),
+            tuple(self.items[item_id][1] for item_id in item_ids),
+            tuple(self.items[item_id][2] for item_id in item_ids),
+            len(self.items),
+        )
+
+
+class FakeReputationManager():
+    """In-memory ReputationManager.sol."""
+    MAX_RECENT_SCORES: int = 100
+
+    def __init__(self) -> None:
+        # (user, field) -> scores, newest last
+        self.recent_scores: dict[tuple, list[int]] = defaultdict(list)
+
+    def updateReputation(self, user: bytes, field_id: int, score: int) -> None:
+        _require(-128 <= score <= 127, "int8_overflow")
+        scores = self.recent_scores[(user, field_id)]
+        scores.append(score)
+        if len(scores) > self.MAX_RECENT_SCORES:
+            del scores[0]
+
+    def updateReputations(self, users: list[bytes], field_id: int, scores: list[int]) -> None:
+        _require(len(users) == len(scores), "length_mismatch")
+        _require(all(-128 <= score <= 127 for score in scores), "int8_overflow")
+        for user, score in zip(users, scores):
+            self.updateReputation(user, field_id, score)
+
+    def getReputation(self, user: bytes, field_id: int) -> int:
+        return sum(self.recent_scores.get((user, field_id), ()))
+
+
+class FakeExpertCaseManager():
+    """In-memory ExpertCaseManager.sol."""
+    MAX_REPUTATION_INCREMENT: int = 10
+
+    def __init__(self, reputation_manager: FakeReputationManager, user_registry: FakeUserRegistry) -> None:
+        self.reputation_manager = reputation_manager
+        self.user_registry = user_registry
+        self.cases: dict[int, dict] = {}
+        self.open_case_ids: list[int] = []
+        self.open_case_ids_by_field: dict[int, list[int]] = defaultdict(list)
+
+    def openExpertCase(self, item_id: int, field_id: int, min_reputation: int,
+                       opener: bytes, bot_allowed: bool, info: str) -> int:
+        _require(item_id < 2**64 and field_id < 2**64, "uint64_overflow")
+        _require(min_reputation < 2**128, "uint128_overflow")
+        case_id = len(self.cases) + 1
+        self.cases[case_id] = {
+            'item_id': item_id,
+            'field_id': field_id,
+            'min_reputation': min_reputation,
+            'bot_allowed': bot_allowed,
+            'info': info,
+            'voter_choices': {}, # voter -> option, in voting order
+            'votes': defaultdict(int),
+            'leading_option': 0, # a tie keeps the option that reached the count first
+            'leading_votes': 0,
+            'is_open': True,
+            'reputation_increment': 0,
+            'settled_count': 0,
+            'is_settled': False,
+        }
+        self.open_case_ids.append(case_id)
+        self.open_case_ids_by_field[field_id].append(case_id)
+        return case_id
+
+    def castVote(self, case_id: int, option: int, voter: bytes) -> None:
+        _require(case_id in self.cases, "EC_not_exist")
+        case = self.cases[case_id]
+        _require(case['is_open'], "EC_closed")
+        _require(0 <= option <= 255, "uint8_overflow")
+
+        registered, is_bot, is_expert = self.user_registry.getVoterEligibility(voter, case['field_id'])
+        _require(registered, "user_not_registered")
+        _require(case['bot_allowed'] or not is_bot, "bots_not_allowed")
+        _require(is_expert, "not_expert_in_field")
+
+        # IReputationManager declares the reputation as uint256
+        reputation = self.reputation_manager.getReputation(voter, case['field_id']) % 2**256
+        _require(reputation >= case['min_reputation'], "reputation_too_low")
+        _require(voter not in case['voter_choices'], "already_voted")
+
+        case['voter_choices'][voter] = option
+        case['votes'][option] += 1
+        if case['votes'][option] > case['leading_votes']:
+            case['leading_option'], case['leading_votes'] = option, case['votes'][option]
+
+    def closeExpertCase(self, case_id: int) -> None:
+        _require(case_id in self.cases, "EC_not_exist")
+        case = self.cases[case_id]
+        _require(case['is_open'], "EC_already_closed")
+
+        case['is_open'] = False
+        self._remove_open_case(self.open_case_ids, case_id)
+        self._remove_open_case(self.open_case_ids_by_field[case['field_id']], case_id)
+        if case['leading_votes'] == 0:
+            case['is_settled'] = True
+            return
+        case['reputation_increment'] = min(len(case['voter_choices']) // case['leading_votes'],
+                                           self.MAX_REPUTATION_INCREMENT)
+
+    def settleExpertCase(self, case_id: int, max_voters: int) -> bool:
+        _require(case_id in self.cases, "EC_not_exist")
+        case = self.cases[case_id]
+        _require(not case['is_open'], "EC_open")
+        _require(not case['is_settled'], "EC_already_settled")
+        _require(max_voters > 0, "zero_max_voters")
+
+        start = case['settled_count']
+        voters = list(case['voter_choices'].items())[start:start + max_voters]
+        scores = [case['reputation_increment'] if choice == case['leading_option'] else -1 for _, choice in voters]
+        self.reputation_manager.updateReputations([voter for voter, _ in voters], case['field_id'], scores)
+
+        case['settled_count'] = start + len(voters)
+        case['is_settled'] = case['settled_count'] == len(case['voter_choices'])
+        return case['is_settled']
+
+    def getCurrentLeader(self, case_id: int) -> tuple:
+        _require(case_id in self.cases, "EC_not_exist")
+        case = self.cases[case_id]
+        return (case['leading_option'], case['leading_votes'], len(case['voter_choices']))
+
+    def getSettlementProgress(self, case_id: int) -> tuple:
+        _require(case_id in self.cases, "EC_not_exist")
+        case = self.cases[case_id]
+        return (case['settled_count'], len(case['voter_choices']), case['is_settled'])
+
+    @staticmethod
+    def _remove_open_case(ids: list[int], case_id: int) -> None:
+        # Swap and pop like the contract, so pages come out in the same order
+        position = ids.index(case_id)
+        ids[position] = ids[-1]
+        ids.pop()
+
+    def _open_cases_page(self, ids: list[int], offset: int, limit: int) -> tuple:
+        page = [self.cases[case_id] for case_id in ids[offset:offset + limit]]
+        return (
+            tuple(case_id for case_id in ids[offset:offset + limit]),
+            tuple(case['item_id'] for case in page),
+            tuple(case['field_id'] for case in page),
+            tuple(case['min_reputation'] for case in page),
+            tuple(case['info'] for case in page),
+            len(ids),
+            # Opened plus closed cases
+            2 * len(self.cases) - len(self.open_case_ids),
+        )
+
+    def getOpenCases(self, offset: int, limit: int) -> tuple:
+        return self._open_cases_page(self.open_case_ids, offset, limit)
+
+    def getOpenCasesByField(self, field_id: int, offset: int, limit: int) -> tuple:
+        return self._open_cases_page(self.open_case_ids_by_field.get(field_id, []), offset, limit)
+
+    def getExpertCase(self, case_id: int) -> tuple:
+        _require(case_id in self.cases, "EC_not_exist")
+        case = self.cases[case_id]
+        return (case['item_id'], case['field_id'], case['min_reputation'],
+                case['bot_allowed'], case['info'], case['is_open'])
+
+
+class FakeChain(UserRegistryInterface):
+    """In-process chain with the contracts implemented in Python.
+
+    Drop-in replacement of UserRegistryInterface for load testing without
+    network. Transactions execute when sent, their receipts show up after
+    *block_time*; every RPC call sleeps for *latency* (± *jitter*). Gas is a
+    flat cost per call plus a cost per argument word and per settled voter,
+    a transaction with a lower gas limit runs out of gas. Fees are constant.
+
+    Args:
+        latency (float, optional): Simulated RPC round trip [s]. Defaults to 0.
+        block_time (float, optional): Delay before a receipt is available [s]. Defaults to 0.
+        jitter (float, optional): Relative random deviation of latency. Defaults to 0.
+    """
+
+    BASE_GAS: int = 50_000
+    WORD_GAS: int = 20_000
+    VOTER_GAS: int = 30_000
+    BASE_FEE: int = 1_000_000_000 #[wei]
+    PRIORITY_FEE: int = 100_000_000 #[wei]
+
+    def __init__(self, latency: float = 0, block_time: float = 0, jitter: float = 0) -> None:
+        super().__init__()
+        self.latency: float = latency
+        self.block_time: float = block_time
+        self.jitter: float = jitter
+        self.chain_id = 1337
+
+        self._lock = threading.Lock()
+        self._nonce: int = 0
+        self._block_number: int = 0
+        self._receipts: dict[str, tuple[float, dict]] = {}
+
+        user_registry = FakeUserRegistry()
+        reputation_manager = FakeReputationManager()
+        self._contracts: dict = {
+            'UserRegistry': user_registry,
+            'ItemRegistry': FakeItemRegistry(),
+            'ReputationManager': reputation_manager,
+            'ExpertCaseManager': FakeExpertCaseManager(reputation_manager, user_registry),
+        }
+
+    def _rpc(self) -> None:
+        if self.latency:
+            time.sleep(max(0, self.latency * (1 + random.uniform(-self.jitter, self.jitter))))
+
+    def _function(self, contract: str, function: str):
+        try:
+            return getattr(self._contracts[contract], function)
+        except (KeyError, AttributeError):
+            raise ValueError(f"Unknown contract function: {contract}.{function}") from None
+
+    def _gas(self, contract: str, function: str, args: tuple) -> int:
+        gas = self.BASE_GAS + size_in_words(args) * self.WORD_GAS
+        if (contract, function) == ('ExpertCaseManager', 'settleExpertCase'):
+            # Every settled voter gets a reputation update
+            settled_count, voters_count, _ = self._contracts[contract].getSettlementProgress(args[0])
+            gas += min(args[1], voters_count - settled_count) * self.VOTER_GAS
+        return gas
+
+    def connect(self) -> None:
+        logger.info("Using in-process fake chain.")
+        self.fee_cache.start()
+        self._setup_done.set()
+
+    def call(self, contract: str, function: str, *args) -> tuple:
+        self._rpc()
+        with self._lock:
+            result = self._function(contract, function)(*args)
+        return result if isinstance(result, tuple) else (result,)
+
+    def get_transaction_count(self) -> int:
+        self._rpc()
+        with self._lock:
+            return self._nonce
+
+    def fetch_fees(self) -> tuple[int, int]:
+        self._rpc()
+        return self.BASE_FEE, self.PRIORITY_FEE
+
+    def estimate_gas(self, contract: str, function: str, args: tuple) -> int:
+        self._rpc()
+        self._function(contract, function)
+        with self._lock:
+            return self._gas(contract, function, args)
+
+    def build_transaction(self, contract: str, function: str, args: tuple, nonce: int, fees: dict) -> dict:
+        self._function(contract, function)
+        return {
+            'contract': contract,
+            'function': function,
+            'args': tuple(args),
+            'nonce': nonce,
+            'gas': self.fee_cache.gas_limit(contract, function, args),
+            **fees,
+        }
+
+    def build_cancel_transaction(self, nonce: int, fees: dict) -> dict:
+        return {'contract': None, 'nonce': nonce, 'gas': self.TRANSFER_GAS, **fees}
+
+    def send_transaction(self, tx: dict) -> str:
+        self._rpc()
+        with self._lock:
+            if tx['nonce'] < self._nonce:
+                raise ValueError("nonce too low")
+            self._nonce = tx['nonce'] + 1
+            self._block_number += 1
+
+            tx_hash = '0x' + uuid.uuid4().hex * 2
+            receipt = {
+                'transactionHash': tx_hash,
+                'blockNumber': self._block_number,
+                'gasUsed': tx['gas'],
+                'status': 1,
+            }
+            try:
+                # Cancelling transactions are plain transfers
+                if tx['contract'] is not None:
+                    gas = self._gas(tx['contract'], tx['function'], tx['args'])
+                    if gas > tx['gas']:
+                        raise ContractLogicError("out of gas")
+                    receipt['gasUsed'] = gas
+                    receipt['returnValue'] = self._function(tx['contract'], tx['function'])(*tx['args'])
+            except ContractLogicError as ex:
+                receipt['status'] = 0
+                receipt['revertReason'] = str(ex)
+
+            self._receipts[tx_hash] = (time.monotonic() + self.block_time, receipt)
+        return tx_hash
+
+    def get_receipt(self, tx_hash: str) -> dict | None:
+        self._rpc()
+        with self._lock:
+            mined_at, receipt = self._receipts.get(tx_hash, (None, None))
+        if receipt is None or time.monotonic() < mined_at:
+            return None
+        return dict(receipt)
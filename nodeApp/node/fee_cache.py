@@ -0,0 +1,114 @@
+
+import threading
+import time
+
+from .logger import logger
+
+
+def size_in_words(args: tuple) -> int:
+    """Number of 32 byte words taken by the dynamic part of the arguments."""
+    size = 0
+    for arg in args:
+        if isinstance(arg, str):
+            size += len(arg.encode('utf-8'))
+        elif isinstance(arg, (bytes, bytearray)):
+            size += len(arg)
+        elif isinstance(arg, (list, tuple)):
+            size += 32 * len(arg) + 32 * size_in_words(arg)
+    return (size + 31) // 32
+
+
+def size_bucket(words: int) -> int:
+    """Power of two bucket of an argument size: 0, 1, 2, 4, 8, ... words."""
+    return 0 if words == 0 else 1 << (words - 1).bit_length()
+
+
+class FeeCache():
+    """Gas limits and EIP-1559 fees without RPC calls on the hot path.
+
+    Gas of a contract function is estimated once per argument size bucket. The
+    estimate gets headroom for the largest arguments of its bucket (a stored
+    word costs at most WORD_GAS) and a safety margin; unused gas is refunded,
+    so this costs nothing but block space. Functions in STATE_DEPENDENT cost
+    what the chain state makes them cost, they are estimated on every call.
+
+    Base fee and priority fee are refreshed by a background thread.
+
+    Args:
+        blockchain: Provides *estimate_gas* and *fetch_fees*.
+    """
+    REFRESH_INTERVAL: float = 12 #[s], one block
+    GAS_MARGIN: float = 1.2
+    WORD_GAS: int = 22_100 # SSTORE of a fresh slot + calldata of a word
+    BASE_FEE_MULTIPLIER: int = 2 # stays valid through 6 full blocks of base fee growth
+    # settleExpertCase(case, max_voters) settles up to max_voters of the voters left
+    STATE_DEPENDENT: frozenset[tuple[str, str]] = frozenset({
+        ('ExpertCaseManager', 'settleExpertCase'),
+    })
+
+    def __init__(self, blockchain) -> None:
+        self._blockchain = blockchain
+        self._gas_limits: dict[tuple, int] = {}
+        self._base_fee: int = None
+        self._priority_fee: int = None
+        self._lock = threading.Lock()
+        self._running: bool = False
+        self._thread: threading.Thread = None
+
+    def start(self) -> None:
+        """Fetches fees and keeps refreshing them in the background."""
+        self.refresh()
+        self._running = True
+        self._thread = threading.Thread(target=self._refresher, name="fee-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._running = False
+
+    def refresh(self) -> None:
+        base_fee, priority_fee = self._blockchain.fetch_fees()
+        with self._lock:
+            self._base_fee, self._priority_fee = base_fee, priority_fee
+
+    def _refresher(self) -> None:
+        while self._running:
+            time.sleep(self.REFRESH_INTERVAL)
+            try:
+                self.refresh()
+            except Exception as ex:
+                logger.error(f"Fee refresh failed: {ex}")
+
+    def fees(self) -> dict:
+        """EIP-1559 fee fields of a new transaction.
+
+        Raises:
+            ConnectionError: Fees were never fetched.
+        """
+        with self._lock:
+            if self._base_fee is None:
+                raise ConnectionError("Fees not fetched yet.")
+            return {
+                'maxFeePerGas': self.BASE_FEE_MULTIPLIER * self._base_fee + self._priority_fee,
+                'maxPriorityFeePerGas': self._priority_fee,
+            }
+
+    def gas_limit(self, contract: str, function: str, args: tuple) -> int:
+        """Gas limit of a contract call; estimated on the first call of its size bucket.
+
+        Raises:
+            ContractLogicError: The estimated call reverts.
+        """
+        if (contract, function) in self.STATE_DEPENDENT:
+            return int(self._blockchain.estimate_gas(contract, function, args) * self.GAS_MARGIN)
+
+        words = size_in_words(args)
+        key = (contract, function, size_bucket(words))
+        with self._lock:
+            gas_limit = self._gas_limits.get(key)
+        if gas_limit is None:
+            estimate = self._blockchain.estimate_gas(contract, function, args)
+            headroom = (size_bucket(words) - words) * self.WORD_GAS
+            gas_limit = int((estimate + headroom) * self.GAS_MARGIN)
+            with self._lock:
+                self._gas_limits[key] = gas_limit
+        return gas_limit
@@ -9,7 +9,7 @@ import threading
 import sys
 
 from .message_handler.MessageHandler import MessageHandler
-from .user_regitry_interface import UserRegistryInterface
+from .node_context import NodeContext
 from .logger import logger
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../Message')))
@@ -17,14 +17,9 @@ from Message import Message
 
 class GatewayConnectionServer():
     """A class for handling connection between the Node and a Gateway"""
-    # def __init__(self, gateway_socket: socket.socket, blockchain: UserRegistryInterface) -> None:
-    #     self._gateway_socket: socket.socket = gateway_socket
-    #     self._blockchain: UserRegistryInterface = blockchain
-    #     self._aes_key: bytes = None
-    #     self._running: bool = True
-
-    def __init__(self, gateway_socket: socket.socket) -> None:
+    def __init__(self, gateway_socket: socket.socket, context: NodeContext) -> None:
         self._gateway_socket: socket.socket = gateway_socket
+        self._context: NodeContext = context
         self._aes_key: bytes = None
         self._running: bool = True
 
@@ -200,7 +195,7 @@ class GatewayConnectionServer():
 
                 # Handle message
                 try:
-                    return_message = MessageHandler.handle(message)
+                    return_message = MessageHandler.handle(message, self._context)
                     if return_message:
                         self._send(return_message)
                     else:
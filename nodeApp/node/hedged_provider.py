@@ -0,0 +1,200 @@
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+from web3 import Web3
+from web3.providers.base import BaseProvider
+
+from .logger import logger
+
+# Methods without side effects, safe to send to two endpoints at once
+READ_METHODS: frozenset[str] = frozenset({
+    'eth_blockNumber',
+    'eth_call',
+    'eth_chainId',
+    'eth_estimateGas',
+    'eth_gasPrice',
+    'eth_getBalance',
+    'eth_getBlockByNumber',
+    'eth_getCode',
+    'eth_getLogs',
+    'eth_getTransactionCount',
+    'eth_maxPriorityFeePerGas',
+    'net_version',
+})
+
+# Reads about our own transactions; endpoints disagree until a transaction has
+# propagated, so they go to the endpoint the last write went to and are not hedged
+STICKY_METHODS: frozenset[str] = frozenset({
+    'eth_getTransactionByHash',
+    'eth_getTransactionReceipt',
+})
+
+
+class EndpointStats():
+    """Latency and error statistics of an RPC endpoint over its last WINDOW requests."""
+    WINDOW: int = 200
+
+    def __init__(self) -> None:
+        self._latencies: deque[float] = deque(maxlen=self.WINDOW)
+        self._outcomes: deque[bool] = deque(maxlen=self.WINDOW)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float = None) -> None:
+        """Records a request; *latency* is None for a failed one."""
+        with self._lock:
+            self._outcomes.append(latency is not None)
+            if latency is not None:
+                self._latencies.append(latency)
+
+    def samples(self) -> int:
+        return len(self._latencies)
+
+    def percentile(self, percentile: float) -> float | None:
+        with self._lock:
+            if not self._latencies:
+                return None
+            latencies = sorted(self._latencies)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * percentile / 100))]
+
+    def error_rate(self) -> float:
+        with self._lock:
+            if not self._outcomes:
+                return 0
+            return self._outcomes.count(False) / len(self._outcomes)
+
+
+class HedgedProvider(BaseProvider):
+    """web3 provider spreading requests over several RPC endpoints.
+
+    Every request goes to the best endpoint (lowest median latency, penalised
+    by errors; endpoints which only failed so far come last). A read that
+    takes longer than HEDGE_PERCENTILE of that endpoint's latency is
+    duplicated to the second best one; the first answer wins and the other
+    request is cancelled, or its answer is dropped if it is already in flight.
+
+    Writes are never duplicated, they fail over to the next endpoint only when
+    the endpoint could not be reached. Reads of the pending nonce and of our
+    own transactions stay on the endpoint of the last write: another endpoint
+    may not know the transaction yet, answering a reused nonce or no receipt.
+
+    Args:
+        endpoint_uris (list[str]): RPC endpoints, the first one is preferred
+            until statistics are available.
+        request_timeout (float, optional): Timeout of a single HTTP request [s].
+    """
+    HEDGE_PERCENTILE: float = 95
+    DEFAULT_HEDGE_DELAY: float = 0.25 #[s], until MIN_SAMPLES are collected
+    MIN_SAMPLES: int = 10
+    ERROR_PENALTY: float = 10
+
+    def __init__(self, endpoint_uris: list[str], request_timeout: float = 10) -> None:
+        super().__init__()
+        if not endpoint_uris:
+            raise ValueError("At least one RPC endpoint is required.")
+        self.endpoints: list[Web3.HTTPProvider] = [
+            Web3.HTTPProvider(uri, request_kwargs={'timeout': request_timeout}) for uri in endpoint_uris
+        ]
+        self.stats: dict[str, EndpointStats] = {uri: EndpointStats() for uri in endpoint_uris}
+        self._executor = ThreadPoolExecutor(max_workers=8 * len(endpoint_uris), thread_name_prefix="rpc")
+        # Endpoint of the last write
+        self._sticky: Web3.HTTPProvider = None
+
+    def __str__(self) -> str:
+        return f"Hedged connection to {', '.join(self.stats)}"
+
+    def _score(self, index: int) -> tuple:
+        stats = self.stats[self.endpoints[index].endpoint_uri]
+        median = stats.percentile(50)
+        if median is None:
+            # Untried endpoints keep their order, endpoints which never answered go last
+            return (stats.error_rate() > 0, 0, index)
+        return (False, median * (1 + self.ERROR_PENALTY * stats.error_rate()), index)
+
+    def ranked(self) -> list[Web3.HTTPProvider]:
+        """Endpoints from the best to the worst."""
+        return [self.endpoints[index] for index in sorted(range(len(self.endpoints)), key=self._score)]
+
+    def _hedge_delay(self, endpoint: Web3.HTTPProvider) -> float:
+        stats = self.stats[endpoint.endpoint_uri]
+        if stats.samples() < self.MIN_SAMPLES:
+            return self.DEFAULT_HEDGE_DELAY
+        return stats.percentile(self.HEDGE_PERCENTILE)
+
+    def _request(self, endpoint: Web3.HTTPProvider, method: str, params) -> dict:
+        start = time.monotonic()
+        try:
+            response = endpoint.make_request(method, params)
+        except Exception:
+            self.stats[endpoint.endpoint_uri].record(None)
+            raise
+        # A JSON-RPC error (e.g. a revert) is still a valid answer of the endpoint
+        self.stats[endpoint.endpoint_uri].record(time.monotonic() - start)
+        return response
+
+    @staticmethod
+    def _is_sticky(method: str, params) -> bool:
+        if method == 'eth_getTransactionCount':
+            return len(params) > 1 and params[1] == 'pending'
+        return method in STICKY_METHODS
+
+    def _sticky_request(self, method: str, params) -> dict:
+        endpoint = self._sticky or self.ranked()[0]
+        try:
+            return self._request(endpoint, method, params)
+        except Exception:
+            # Do not ask another endpoint this time, but pick a new one next time
+            self._sticky = None
+            raise
+
+    def _write(self, method: str, params) -> dict:
+        error: Exception = None
+        for endpoint in self.ranked():
+            try:
+                response = self._request(endpoint, method, params)
+            except Exception as ex:
+                # Sending the same signed transaction again cannot execute it twice
+                logger.info(f"{method} failed on {endpoint.endpoint_uri}, failing over: {ex}")
+                error = ex
+                continue
+            self._sticky = endpoint
+            return response
+        raise error
+
+    def make_request(self, method: str, params):
+        if self._is_sticky(method, params):
+            return self._sticky_request(method, params)
+        if method not in READ_METHODS:
+            return self._write(method, params)
+
+        ranked = self.ranked()
+        if len(ranked) == 1:
+            return self._request(ranked[0], method, params)
+
+        primary, backups = ranked[0], ranked[1:]
+        pending: set[Future] = {self._executor.submit(self._request, primary, method, params)}
+        done, pending = wait(pending, timeout=self._hedge_delay(primary))
+
+        error: Exception = None
+        while True:
+            for future in done:
+                if future.exception() is None:
+                    for loser in pending:
+                        loser.cancel()
+                    return future.result()
+                error = future.exception()
+
+            # Hedge after the delay, fail over right away on error
+            if backups and (not done or not pending):
+                backup = backups.pop(0)
+                logger.info(f"Hedging {method} to {backup.endpoint_uri}.")
+                pending.add(self._executor.submit(self._request, backup, method, params))
+
+            if not pending:
+                raise error
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+    def is_connected(self, show_traceback: bool = False) -> bool:
+        return any(endpoint.is_connected(show_traceback) for endpoint in self.endpoints)
@@ -6,15 +6,18 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../Message')))
 from Message import Message
 
+from ..node_context import NodeContext
+
 class AbstractHandler(ABC):
     """Abstract message handler."""
     @classmethod
     @abstractmethod
-    def handle(self, message: Message) -> Message | None:
+    def handle(self, message: Message, context: NodeContext) -> Message | None:
         """Handles a message.
 
         Args:
             message (Message): The message to handle.
+            context (NodeContext): State of the Node.
 
         Returns:
             Message|None: Return message; *None* if EXIT message.
@@ -0,0 +1,54 @@
+
+import json
+import os
+import sys
+from .AbstractHandler import AbstractHandler
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../Message')))
+from Message import Message, Type
+
+from ..node_context import NodeContext
+from ..user_regitry_interface import user_id
+
+class AddItemsHandler(AbstractHandler):
+    ITEMS_PER_TX: int = 50
+    MAX_ITEMS: int = 10_000
+
+    @classmethod
+    def handle(self, message: Message, context: NodeContext) -> Message | None:
+        """Handles messages of type ADD_ITEMS.
+
+        Items are registered with *addItems* in chunks of ITEMS_PER_TX, each
+        chunk is one queued transaction. Owners are stored by user id.
+
+        Args:
+            message (Message): The message to handle. Payload is a JSON object
+                with *items*, a list of objects with *category*, *item_info*
+                and *owner_public_key*.
+            context (NodeContext): State of the Node.
+
+        Returns:
+            Message: Tickets of the queued chunks, in item order.
+        """
+        try:
+            items = json.loads(message.get_payload())['items']
+            columns = [
+                (str(item['category']), str(item['item_info']), user_id(str(item['owner_public_key'])))
+                for item in items
+            ]
+        except (TypeError, ValueError, KeyError):
+            return Message(type=Type.ERROR, status=400, payload="Invalid items.")
+
+        if not columns or len(columns) > self.MAX_ITEMS:
+            return Message(type=Type.ERROR, status=400, payload=f"Between 1 and {self.MAX_ITEMS} items required.")
+
+        if not context.transaction_queue:
+            return Message(type=Type.ERROR, status=503, payload="Blockchain unavailable.")
+
+        tickets = []
+        for start in range(0, len(columns), self.ITEMS_PER_TX):
+            categories, item_infos, owners = zip(*columns[start:start + self.ITEMS_PER_TX])
+            ticket = context.transaction_queue.submit('ItemRegistry', 'addItems', list(categories), list(item_infos), list(owners))
+            tickets.append(ticket.to_dict())
+
+        return Message(type=Type.RETURN, status=202, payload=json.dumps({'tickets': tickets}))
@@ -0,0 +1,51 @@
+
+import json
+import os
+import sys
+from .AbstractHandler import AbstractHandler
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../Message')))
+from Message import Message, Type
+
+from ..node_context import NodeContext
+
+class BatchHandler(AbstractHandler):
+    MAX_MESSAGES: int = 100
+    # Reads only, a batch must not change state
+    BATCHABLE: frozenset[Type] = frozenset({Type.GET_ITEMS, Type.OPEN_CASES, Type.TX_STATUS, Type.CURRENT_LEADER})
+
+    @classmethod
+    def handle(self, message: Message, context: NodeContext) -> Message | None:
+        """Handles messages of type BATCH.
+
+        Several read requests answered in one round trip, in order.
+
+        Args:
+            message (Message): The message to handle. Payload is a JSON list of
+                at most MAX_MESSAGES serialized messages of the BATCHABLE types.
+            context (NodeContext): State of the Node.
+
+        Returns:
+            Message: JSON list of the serialized responses, a message that is not
+                allowed in a batch gets an ERROR with status 400.
+        """
+        # MessageHandler dispatches BATCH to this handler
+        from .MessageHandler import MessageHandler
+
+        try:
+            messages = json.loads(message.get_payload())
+            if not isinstance(messages, list) or len(messages) > self.MAX_MESSAGES:
+                raise ValueError
+            messages = [Message.from_json(m) for m in messages]
+        except (TypeError, ValueError, KeyError):
+            return Message(type=Type.ERROR, status=400, payload="Invalid batch.")
+
+        responses = []
+        for m in messages:
+            if m.get_type() in self.BATCHABLE:
+                response = MessageHandler.handle(m, context)
+            else:
+                response = Message(type=Type.ERROR, status=400, payload=f"Not allowed in a batch: {m.get_type()}")
+            responses.append(response.to_json())
+
+        return Message(type=Type.RETURN, status=200, payload=json.dumps(responses))
@@ -0,0 +1,39 @@
+
+import json
+import os
+import sys
+from .AbstractHandler import AbstractHandler
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../Message')))
+from Message import Message, Type
+
+from ..node_context import NodeContext
+
+class CloseCaseHandler(AbstractHandler):
+
+    @classmethod
+    def handle(self, message: Message, context: NodeContext) -> Message | None:
+        """Handles messages of type CLOSE_CASE.
+
+        Closing and settling run in the background, large cases take several
+        transactions.
+
+        Args:
+            message (Message): The message to handle. Payload is a JSON object
+                with *case_id*.
+            context (NodeContext): State of the Node.
+
+        Returns:
+            Message: Confirmation that the case is scheduled.
+        """
+        try:
+            case_id = int(json.loads(message.get_payload())['case_id'])
+        except (TypeError, ValueError, KeyError):
+            return Message(type=Type.ERROR, status=400, payload="Invalid expert case id.")
+
+        if not context.case_settler:
+            return Message(type=Type.ERROR, status=503, payload="Blockchain unavailable.")
+
+        scheduled = context.case_settler.settle(case_id)
+
+        return Message(type=Type.RETURN, status=202, payload=json.dumps({'case_id': case_id, 'scheduled': scheduled}))
@@ -0,0 +1,39 @@
+import json
+import os
+import sys
+from .AbstractHandler import AbstractHandler
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../Message')))
+from Message import Message, Type
+
+from ..node_context import NodeContext
+
+
+class CurrentLeaderHandler(AbstractHandler):
+
+    @classmethod
+    def handle(self, message: Message, context: NodeContext) -> Message | None:
+        """Handles messages of type CURRENT_LEADER.
+
+        Args:
+            message (Message): The message to handle. Payload is a JSON object
+                with *case_id*.
+            context (NodeContext): State of the Node.
+
+        Returns:
+            Message: JSON object with the leading *option*, its *votes* and the
+                *voters_count* of the case.
+        """
+        try:
+            case_id = int(json.loads(message.get_payload())['case_id'])
+        except (TypeError, ValueError, KeyError):
+            return Message(type=Type.ERROR, status=400, payload="Invalid expert case id.")
+
+        if not context.blockchain:
+            return Message(type=Type.ERROR, status=503, payload="Blockchain unavailable.")
+
+        leader = context.blockchain.get_current_leader(case_id)
+        if leader is None:
+            return Message(type=Type.ERROR, status=404, payload=f"Expert case {case_id} not found or blockchain unavailable.")
+
+        return Message(type=Type.RETURN, status=200, payload=json.dumps(leader))
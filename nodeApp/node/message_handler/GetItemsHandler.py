@@ -0,0 +1,42 @@
+
+import json
+import os
+import sys
+from .AbstractHandler import AbstractHandler
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../Message')))
+from Message import Message, Type
+
+from ..node_context import NodeContext
+
+class GetItemsHandler(AbstractHandler):
+    MAX_COUNT: int = 500
+
+    @classmethod
+    def handle(self, message: Message, context: NodeContext) -> Message | None:
+        """Handles messages of type GET_ITEMS.
+
+        A range of items costs a single contract call.
+
+        Args:
+            message (Message): The message to handle. Payload is a JSON object
+                with optional *from_id* (first item id, default 1) and *count*
+                (at most MAX_COUNT).
+            context (NodeContext): State of the Node.
+
+        Returns:
+            Message: JSON object with the *items* of the range and the *total*
+                number of items.
+        """
+        try:
+            request = json.loads(message.get_payload() or '{}')
+            from_id = max(int(request.get('from_id', 1)), 1)
+            count = min(max(int(request.get('count', self.MAX_COUNT)), 0), self.MAX_COUNT)
+        except (TypeError, ValueError, AttributeError):
+            return Message(type=Type.ERROR, status=400, payload="Invalid item range.")
+
+        page = context.blockchain.get_items(from_id, count) if context.blockchain else None
+        if page is None:
+            return Message(type=Type.ERROR, status=503, payload="Blockchain unavailable.")
+
+        return Message(type=Type.RETURN, status=200, payload=json.dumps(page))
@@ -5,11 +5,20 @@ from .ExitHandler import ExitHandler
 from .PingHandler import PingHandler
 from .ErrorHandler import ErrorHandler
 from .UserRegisterHandler import UserRegisterHandler
+from .TransactionStatusHandler import TransactionStatusHandler
+from .CloseCaseHandler import CloseCaseHandler
+from .OpenCasesHandler import OpenCasesHandler
+from .AddItemsHandler import AddItemsHandler
+from .GetItemsHandler import GetItemsHandler
+from .BatchHandler import BatchHandler
+from .CurrentLeaderHandler import CurrentLeaderHandler
 from .AbstractHandler import AbstractHandler
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../Message')))
 from Message import Message, Type
 
+from ..node_context import NodeContext
+
 
 class MessageHandler:
 
@@ -17,16 +26,24 @@ class MessageHandler:
         Type.PING: PingHandler,
         Type.EXIT: ExitHandler,
         Type.REGISTER: UserRegisterHandler,
+        Type.TX_STATUS: TransactionStatusHandler,
+        Type.CLOSE_CASE: CloseCaseHandler,
+        Type.OPEN_CASES: OpenCasesHandler,
+        Type.ADD_ITEMS: AddItemsHandler,
+        Type.GET_ITEMS: GetItemsHandler,
+        Type.BATCH: BatchHandler,
+        Type.CURRENT_LEADER: CurrentLeaderHandler,
     }
 
     @classmethod
-    def handle(self, message: Message) -> Message:
+    def handle(self, message: Message, context: NodeContext) -> Message:
         """Handles a message.
 
         Args:
             message (Message): The message to handle.
+            context (NodeContext): State of the Node.
 
         Returns:
             Message: Return message.
         """
-        return self.handlers.get(message.get_type(), ErrorHandler).handle(message)
+        return self.handlers.get(message.get_type(), ErrorHandler).handle(message, context)
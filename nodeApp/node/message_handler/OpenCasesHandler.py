@@ -0,0 +1,44 @@
+
+import json
+import os
+import sys
+from .AbstractHandler import AbstractHandler
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../Message')))
+from Message import Message, Type
+
+from ..node_context import NodeContext
+
+class OpenCasesHandler(AbstractHandler):
+    MAX_LIMIT: int = 100
+
+    @classmethod
+    def handle(self, message: Message, context: NodeContext) -> Message | None:
+        """Handles messages of type OPEN_CASES.
+
+        One page of open expert cases costs a single contract call.
+
+        Args:
+            message (Message): The message to handle. Payload is a JSON object
+                with optional *offset*, *limit* (at most MAX_LIMIT) and *field_id*.
+            context (NodeContext): State of the Node.
+
+        Returns:
+            Message: JSON object with the *cases* of the page, the *total*
+                number of open cases and the *version* of the open cases, which
+                changes whenever a case opens or closes.
+        """
+        try:
+            request = json.loads(message.get_payload() or '{}')
+            offset = max(int(request.get('offset', 0)), 0)
+            limit = min(max(int(request.get('limit', self.MAX_LIMIT)), 0), self.MAX_LIMIT)
+            field_id = request.get('field_id')
+            field_id = None if field_id is None else int(field_id)
+        except (TypeError, ValueError, AttributeError):
+            return Message(type=Type.ERROR, status=400, payload="Invalid page request.")
+
+        page = context.blockchain.get_open_cases(offset, limit, field_id) if context.blockchain else None
+        if page is None:
+            return Message(type=Type.ERROR, status=503, payload="Blockchain unavailable.")
+
+        return Message(type=Type.RETURN, status=200, payload=json.dumps(page))
@@ -6,15 +6,18 @@ from .AbstractHandler import AbstractHandler
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../Message')))
 from Message import Message, Type
 
+from ..node_context import NodeContext
+
 
 class PingHandler(AbstractHandler):
 
     @classmethod
-    def handle(self, message: Message) -> Message | None:
+    def handle(self, message: Message, context: NodeContext) -> Message | None:
         """Handles messages of type PING.
 
         Args:
             message (Message): The message to handle.
+            context (NodeContext): State of the Node.
 
         Returns:
             Message: Ping message.
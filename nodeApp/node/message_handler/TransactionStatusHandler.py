@@ -0,0 +1,41 @@
+
+import json
+import os
+import sys
+from .AbstractHandler import AbstractHandler
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../Message')))
+from Message import Message, Type
+
+from ..node_context import NodeContext
+
+
+class TransactionStatusHandler(AbstractHandler):
+    @classmethod
+    def handle(self, message: Message, context: NodeContext) -> Message | None:
+        """Handles messages of type TX_STATUS.
+
+        Args:
+            message (Message): The message to handle. Payload is a JSON object
+                with *ticket*. The answer is never held back: a connection
+                is served one message at a time, so the gateway polls instead.
+            context (NodeContext): State of the Node.
+
+        Returns:
+            Message: Status of the ticket.
+        """
+        try:
+            request = json.loads(message.get_payload())
+            ticket_id = str(request['ticket'])
+        except (TypeError, ValueError, KeyError):
+            return Message(type=Type.ERROR, status=400, payload="Invalid ticket request.")
+
+        if not context.transaction_queue:
+            return Message(type=Type.ERROR, status=503, payload="Blockchain unavailable.")
+
+        ticket = context.transaction_queue.get(ticket_id)
+
+        if not ticket:
+            return Message(type=Type.ERROR, status=404, payload=f"Unknown ticket: {ticket_id}")
+
+        return Message(type=Type.RETURN, status=200, payload=json.dumps(ticket.to_dict()))
@@ -1,4 +1,5 @@
 
+import json
 import os
 import sys
 from .AbstractHandler import AbstractHandler
@@ -6,22 +7,33 @@ from .AbstractHandler import AbstractHandler
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../Message')))
 from Message import Message, Type
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../scripts')))
-
-from user_register import register_user # type: ignore
+from ..node_context import NodeContext
 
 class UserRegisterHandler(AbstractHandler):
 
     @classmethod
-    def handle(self, message: Message) -> Message | None:
-        """Handles messages of type PING.
+    def handle(self, message: Message, context: NodeContext) -> Message | None:
+        """Handles messages of type REGISTER.
+
+        The registration is queued, the transaction is sent in the background.
 
         Args:
-            message (Message): The message to handle.
+            message (Message): The message to handle. Payload is a JSON object
+                with *nick*, *public_key*, *additional_data* and *is_bot*.
+            context (NodeContext): State of the Node.
 
         Returns:
-            Message: Ping message.
+            Message: Ticket of the queued registration.
         """
-        register_user()
+        try:
+            user = json.loads(message.get_payload())
+            args = (user['nick'], user['public_key'], user.get('additional_data', ''), bool(user.get('is_bot', False)))
+        except (TypeError, ValueError, KeyError):
+            return Message(type=Type.ERROR, status=400, payload="Invalid registration data.")
+
+        if not context.transaction_queue:
+            return Message(type=Type.ERROR, status=503, payload="Blockchain unavailable.")
+
+        ticket = context.transaction_queue.submit('UserRegistry', 'registerUser', *args)
 
-        return Message(type=Type.RETURN, status=200, payload="User registered succesfully.")
\ No newline at end of file
+        return Message(type=Type.RETURN, status=202, payload=json.dumps(ticket.to_dict()))
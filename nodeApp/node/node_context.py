@@ -0,0 +1,20 @@
+
+from dataclasses import dataclass
+
+from .case_settler import CaseSettler
+from .transaction_queue import TransactionQueue
+from .user_regitry_interface import UserRegistryInterface
+
+@dataclass
+class NodeContext:
+    """State of the Node shared by all message handlers.
+
+    Args:
+        blockchain (UserRegistryInterface): Interface for reading from the chain.
+            *None* if the chain is unavailable.
+        transaction_queue (TransactionQueue): Queue for writing to the chain.
+        case_settler (CaseSettler): Closes and settles expert cases.
+    """
+    blockchain: UserRegistryInterface = None
+    transaction_queue: TransactionQueue = None
+    case_settler: CaseSettler = None
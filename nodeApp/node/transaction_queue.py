@@ -0,0 +1,253 @@
+
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from enum import Enum
+
+from .logger import logger
+
+
+class TxStatus(Enum):
+    """Lifecycle of a queued transaction."""
+
+    QUEUED = 'queued'
+    PENDING = 'pending'
+    MINED = 'mined'
+    FAILED = 'failed'
+
+
+@dataclass
+class Ticket:
+    """A contract call waiting to be (or already) put on chain."""
+    contract: str
+    function: str
+    args: tuple
+    ticket_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: TxStatus = TxStatus.QUEUED
+    tx_hash: str = None
+    replaced_hashes: list[str] = field(default_factory=list)
+    nonce: int = None
+    fees: dict = None
+    attempts: int = 0
+    sent_at: float = None
+    block_number: int = None
+    error: str = None
+
+    def is_done(self) -> bool:
+        return self.status in (TxStatus.MINED, TxStatus.FAILED)
+
+    def to_dict(self) -> dict:
+        return {
+            'ticket': self.ticket_id,
+            'contract': self.contract,
+            'function': self.function,
+            'status': self.status.value,
+            'tx_hash': self.tx_hash,
+            'attempts': self.attempts,
+            'block_number': self.block_number,
+            'error': self.error,
+        }
+
+
+class TransactionQueue():
+    """Sends contract transactions in the background.
+
+    Handlers *submit* a call and immediately get a ticket back. The sender thread
+    assigns nonces, signs and broadcasts; the tracker thread polls receipts and
+    re-broadcasts stuck transactions under the same nonce with bumped fees. A
+    ticket given up on after MAX_ATTEMPTS gets its nonce cancelled, so that
+    later transactions do not stall behind it.
+    """
+    POLL_INTERVAL: float = 2 #[s]
+    RESUBMIT_AFTER: float = 60 #[s]
+    MAX_ATTEMPTS: int = 5
+    FEE_BUMP: float = 1.125 # nodes reject replacements bumped by less than 10%
+    MAX_FINISHED_TICKETS: int = 10_000
+
+    def __init__(self, blockchain) -> None:
+        self._blockchain = blockchain
+        self._queue: queue.Queue[Ticket] = queue.Queue()
+        self._tickets: OrderedDict[str, Ticket] = OrderedDict()
+        self._in_flight: dict[int, Ticket] = {}
+        self._next_nonce: int = None
+        self._condition = threading.Condition()
+        self._running: bool = False
+        self._threads: list[threading.Thread] = []
+
+    def start(self) -> None:
+        """Starts the sender and tracker threads."""
+        self._running = True
+        for target, name in ((self._sender, "tx-sender"), (self._tracker, "tx-tracker")):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def stop(self) -> None:
+        """Stops background threads. Transactions already sent stay on chain."""
+        self._running = False
+        for thread in self._threads:
+            thread.join(timeout=self.POLL_INTERVAL + 1)
+        self._threads.clear()
+
+    def submit(self, contract: str, function: str, *args) -> Ticket:
+        """Queues a contract call.
+
+        Args:
+            contract (str): Name of the contract.
+            function (str): Name of the contract function.
+            *args: Arguments of the contract function.
+
+        Returns:
+            Ticket: Ticket for polling the status.
+        """
+        ticket = Ticket(contract=contract, function=function, args=args)
+        with self._condition:
+            self._tickets[ticket.ticket_id] = ticket
+        self._queue.put(ticket)
+        return ticket
+
+    def get(self, ticket_id: str) -> Ticket | None:
+        with self._condition:
+            return self._tickets.get(ticket_id)
+
+    def wait(self, ticket_id: str, timeout: float) -> Ticket | None:
+        """Blocks until the ticket is mined/failed or the timeout expires.
+
+        Args:
+            ticket_id (str): Ticket to wait for.
+            timeout (float): Maximal waiting time [s].
+
+        Returns:
+            Ticket|None: The ticket in its latest state; *None* if unknown.
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            ticket = self._tickets.get(ticket_id)
+            while ticket and not ticket.is_done():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            return ticket
+
+    def _update(self, ticket: Ticket, **changes) -> None:
+        with self._condition:
+            for key, value in changes.items():
+                setattr(ticket, key, value)
+            if ticket.is_done():
+                self._in_flight.pop(ticket.nonce, None)
+                self._forget_finished()
+            self._condition.notify_all()
+
+    def _forget_finished(self) -> None:
+        """Keeps memory bounded by dropping the oldest finished tickets."""
+        excess = len(self._tickets) - self.MAX_FINISHED_TICKETS
+        for ticket_id in list(self._tickets):
+            if excess <= 0:
+                break
+            if self._tickets[ticket_id].is_done():
+                del self._tickets[ticket_id]
+                excess -= 1
+
+    def _broadcast(self, ticket: Ticket, nonce: int, fees: dict) -> None:
+        tx = self._blockchain.build_transaction(ticket.contract, ticket.function, ticket.args, nonce, fees)
+        tx_hash = self._blockchain.send_transaction(tx)
+        logger.info(f"Ticket {ticket.ticket_id}: sent {ticket.function} as {tx_hash} (nonce {nonce}).")
+        replaced_hashes = (ticket.replaced_hashes + [ticket.tx_hash]) if ticket.tx_hash else []
+        self._update(
+            ticket,
+            status=TxStatus.PENDING,
+            replaced_hashes=replaced_hashes,
+            tx_hash=tx_hash,
+            nonce=nonce,
+            fees=fees,
+            attempts=ticket.attempts + 1,
+            sent_at=time.monotonic(),
+        )
+
+    def _bumped_fees(self, ticket: Ticket) -> dict:
+        """Fees replacing the latest broadcast of the ticket, at least the current market fees."""
+        current = self._blockchain.fees()
+        return {field: max(int(fee * self.FEE_BUMP) + 1, current[field]) for field, fee in ticket.fees.items()}
+
+    def _cancel(self, ticket: Ticket) -> None:
+        """Takes the nonce of a ticket given up on with an empty transaction.
+
+        The stuck transaction may have been dropped from the mempool, and every
+        later nonce would stall behind the gap.
+        """
+        try:
+            tx = self._blockchain.build_cancel_transaction(ticket.nonce, self._bumped_fees(ticket))
+            tx_hash = self._blockchain.send_transaction(tx)
+            logger.info(f"Ticket {ticket.ticket_id}: cancelled nonce {ticket.nonce} with {tx_hash}.")
+        except Exception as ex:
+            logger.error(f"Ticket {ticket.ticket_id}: cancelling nonce {ticket.nonce} failed: {ex}")
+
+    def _sender(self) -> None:
+        while self._running:
+            try:
+                ticket = self._queue.get(timeout=self.POLL_INTERVAL)
+            except queue.Empty:
+                continue
+
+            try:
+                if self._next_nonce is None:
+                    self._next_nonce = self._blockchain.get_transaction_count()
+                nonce = self._next_nonce
+                self._broadcast(ticket, nonce, self._blockchain.fees())
+                with self._condition:
+                    self._in_flight[nonce] = ticket
+                self._next_nonce += 1
+            except Exception as ex:
+                logger.error(f"Ticket {ticket.ticket_id}: sending {ticket.function} failed: {ex}")
+                # The nonce may not have been consumed, resynchronise on next send
+                self._next_nonce = None
+                self._update(ticket, status=TxStatus.FAILED, error=str(ex))
+
+    def _tracker(self) -> None:
+        while self._running:
+            time.sleep(self.POLL_INTERVAL)
+
+            with self._condition:
+                in_flight = list(self._in_flight.values())
+
+            for ticket in in_flight:
+                try:
+                    self._track(ticket)
+                except Exception as ex:
+                    logger.error(f"Ticket {ticket.ticket_id}: tracking failed: {ex}")
+
+    def _track(self, ticket: Ticket) -> None:
+        # Any of the broadcasts sharing the nonce may be the one that gets mined
+        for tx_hash in [ticket.tx_hash] + ticket.replaced_hashes[::-1]:
+            receipt = self._blockchain.get_receipt(tx_hash)
+            if receipt:
+                break
+
+        if receipt:
+            if receipt.get('status', 1) == 1:
+                self._update(ticket, status=TxStatus.MINED, block_number=receipt.get('blockNumber'))
+            else:
+                self._update(ticket, status=TxStatus.FAILED, block_number=receipt.get('blockNumber'),
+                             error="Transaction reverted.")
+            return
+
+        if time.monotonic() - ticket.sent_at < self.RESUBMIT_AFTER:
+            return
+
+        if ticket.attempts >= self.MAX_ATTEMPTS:
+            self._cancel(ticket)
+            self._update(ticket, status=TxStatus.FAILED, error="Transaction not mined.")
+            return
+
+        # Replace the stuck transaction, keeping its nonce
+        try:
+            self._broadcast(ticket, ticket.nonce, self._bumped_fees(ticket))
+        except Exception as ex:
+            # An earlier broadcast may have been mined in the meantime, so only
+            # give up once we are out of attempts
+            logger.error(f"Ticket {ticket.ticket_id}: fee bump failed: {ex}")
+            self._update(ticket, attempts=ticket.attempts + 1, sent_at=time.monotonic(), error=str(ex))
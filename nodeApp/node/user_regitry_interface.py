@@ -1,104 +1,300 @@
 
 import os
+import threading
 from dotenv import load_dotenv
 from web3 import Web3
+from web3.exceptions import TransactionNotFound
 from eth_account import Account
-import json
+from eth_utils import keccak
+
+from .contract_registry import ContractRegistry
+from .fee_cache import FeeCache
+from .hedged_provider import HedgedProvider
+from .logger import logger
+
+def user_id(public_key: str) -> bytes:
+    """On-chain identity of a user: keccak256 of the public key."""
+    return keccak(text=public_key)
 
 class UserRegistryInterface:
+    """Interface of the Node to the deployed contracts.
+
+    Construction is cheap; connecting to the network and loading the contracts
+    is done by *connect*, which the Node runs in the background. Calls made
+    before the setup is finished wait for it.
+    """
+    SETUP_TIMEOUT: int = 30 #[s]
+    TRANSFER_GAS: int = 21_000
+
     def __init__(self):
-        load_dotenv()
+        self.web3: Web3 = None
+        self.account: Account = None
+        self.chain_id: int = None
+        self.contracts: ContractRegistry = None
+        self.fee_cache: FeeCache = FeeCache(self)
+        self._setup_done: threading.Event = threading.Event()
+        self._setup_error: Exception = None
+
+    def connect(self) -> None:
+        """Connects to the Ethereum network and loads the contracts."""
+        try:
+            load_dotenv()
+
+            # Several comma separated endpoints enable hedged reads
+            provider_urls = [url.strip() for url in os.getenv('WEB3_PROVIDER_URLS', '').split(',') if url.strip()]
+            if not provider_urls:
+                infura_project_id = os.getenv('WEB3_INFURA_PROJECT_ID')
+                provider_urls = [f'https://mainnet.infura.io/v3/{infura_project_id}']
+
+            if len(provider_urls) > 1:
+                self.web3 = Web3(HedgedProvider(provider_urls))
+            else:
+                self.web3 = Web3(Web3.HTTPProvider(provider_urls[0]))
+
+            if not self.web3.is_connected():
+                raise ConnectionError("Failed to connect to Ethereum network")
+
+            private_key = os.getenv('PRIVATE_KEY')
+            if not private_key:
+                raise ValueError("Private key not found in environment variables")
+            self.account = Account.from_key(private_key)
+            self.web3.eth.default_account = self.account.address
+
+            self.chain_id = self.web3.eth.chain_id
+            self.contracts = ContractRegistry()
+            self.fee_cache.start()
+            logger.info(f"Blockchain ready, contracts: {', '.join(self.contracts.names())}.")
+        except Exception as ex:
+            self._setup_error = ex
+            logger.error(f"Blockchain setup failed: {ex}")
+        finally:
+            self._setup_done.set()
+
+    def _ready(self) -> None:
+        """Waits for *connect*.
+
+        Raises:
+            ConnectionError: Setup failed or did not finish in time.
+        """
+        if not self._setup_done.wait(self.SETUP_TIMEOUT):
+            raise ConnectionError("Blockchain setup not finished.")
+        if self._setup_error:
+            raise ConnectionError(f"Blockchain unavailable: {self._setup_error}")
+
+    def call(self, contract: str, function: str, *args) -> tuple:
+        """Calls a view function.
+
+        Args:
+            contract (str): Name of the contract.
+            function (str): Name of the contract function.
+            *args: Arguments of the contract function.
+
+        Returns:
+            tuple: Decoded return values.
+        """
+        self._ready()
+        contract_function = self.contracts.function(contract, function)
+        result = self.web3.eth.call({
+            'to': self.contracts.address(contract, self.chain_id),
+            'data': contract_function.encode(args),
+        })
+        return contract_function.decode(result)
+
+    def get_transaction_count(self) -> int:
+        """Returns the next nonce of the node account, including pending transactions."""
+        self._ready()
+        return self.web3.eth.get_transaction_count(self.account.address, 'pending')
+
+    def fetch_fees(self) -> tuple[int, int]:
+        """Fetches the current base fee and priority fee [wei]."""
+        base_fee = self.web3.eth.get_block('latest')['baseFeePerGas']
+        return base_fee, self.web3.eth.max_priority_fee
+
+    def estimate_gas(self, contract: str, function: str, args: tuple) -> int:
+        """Estimates gas used by a contract call."""
+        return self.web3.eth.estimate_gas({
+            'from': self.account.address,
+            'to': self.contracts.address(contract, self.chain_id),
+            'data': self.contracts.function(contract, function).encode(args),
+        })
+
+    def fees(self) -> dict:
+        """Returns the EIP-1559 fee fields for a new transaction."""
+        self._ready()
+        return self.fee_cache.fees()
+
+    def build_transaction(self, contract: str, function: str, args: tuple, nonce: int, fees: dict) -> dict:
+        """Builds an unsigned contract transaction.
+
+        Calldata is encoded with the precomputed codec of the function and gas
+        comes from the fee cache, so usually no RPC call is needed.
 
-        infura_project_id = os.getenv('WEB3_INFURA_PROJECT_ID')
-        infura_url = f'https://mainnet.infura.io/v3/{infura_project_id}'
-        self.web3 = Web3(Web3.HTTPProvider(infura_url))
+        Args:
+            contract (str): Name of the contract.
+            function (str): Name of the contract function.
+            args (tuple): Arguments of the contract function.
+            nonce (int): Nonce of the transaction.
+            fees (dict): *maxFeePerGas* and *maxPriorityFeePerGas* [wei].
 
-        if not self.web3.is_connected():
-            raise ConnectionError("Failed to connect to Ethereum network")
+        Returns:
+            dict: Transaction ready to be signed.
+        """
+        self._ready()
+        return {
+            'type': 2,
+            'chainId': self.chain_id,
+            'from': self.account.address,
+            'to': self.contracts.address(contract, self.chain_id),
+            'data': self.contracts.function(contract, function).encode(args),
+            'value': 0,
+            'nonce': nonce,
+            'gas': self.fee_cache.gas_limit(contract, function, args),
+            **fees,
+        }
 
-        private_key = os.getenv('PRIVATE_KEY')
-        if not private_key:
-            raise ValueError("Private key not found in environment variables")
-        self.account = Account.from_key(private_key)
-        self.web3.eth.default_account = self.account.address
+    def build_cancel_transaction(self, nonce: int, fees: dict) -> dict:
+        """Builds an empty transfer to the node account, replacing a stuck transaction.
 
-        contract_address = os.getenv('USER_REGISTRY_ADDRESS')
-        if not contract_address:
-            raise ValueError("Contract address not found in environment variables")
-        self.contract_address = self.web3.toChecksumAddress(contract_address)
+        Args:
+            nonce (int): Nonce to take.
+            fees (dict): *maxFeePerGas* and *maxPriorityFeePerGas* [wei].
 
-        with open('UserRegistry.json') as f:
-            contract_abi = json.load(f)
+        Returns:
+            dict: Transaction ready to be signed.
+        """
+        self._ready()
+        return {
+            'type': 2,
+            'chainId': self.chain_id,
+            'from': self.account.address,
+            'to': self.account.address,
+            'value': 0,
+            'nonce': nonce,
+            'gas': self.TRANSFER_GAS,
+            **fees,
+        }
 
-        self.contract = self.web3.eth.contract(
-            address=self.contract_address,
-            abi=contract_abi['abi']
-        )
+    def send_transaction(self, tx: dict) -> str:
+        """Signs and broadcasts a transaction.
+
+        Args:
+            tx (dict): Transaction built by *build_transaction*.
+
+        Returns:
+            str: Transaction hash.
+        """
+        self._ready()
+        signed_tx = self.web3.eth.account.sign_transaction(tx, private_key=self.account.key)
+        tx_hash = self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        return tx_hash.hex()
+
+    def get_receipt(self, tx_hash: str) -> dict | None:
+        """Returns the receipt of a transaction.
+
+        Args:
+            tx_hash (str): Transaction hash.
+
+        Returns:
+            dict|None: Receipt; *None* if the transaction is not mined yet.
+        """
+        self._ready()
+        try:
+            return dict(self.web3.eth.get_transaction_receipt(tx_hash))
+        except TransactionNotFound:
+            return None
+
+    def _transact(self, contract: str, function: str, *args) -> str:
+        tx = self.build_transaction(contract, function, args, self.get_transaction_count(), self.fees())
+        tx_hash = self.send_transaction(tx)
+        logger.info(f"Transaction hash: {tx_hash}")
+        return tx_hash
 
     def register_user(self, nick, public_key, additional_data, is_bot):
         try:
-            tx = self.contract.functions.registerUser(
-                nick,
-                public_key,
-                additional_data,
-                is_bot
-            ).buildTransaction({
-                'from': self.account.address,
-                'nonce': self.web3.eth.getTransactionCount(self.account.address),
-                'gas': 300000,
-                'gasPrice': self.web3.toWei('10', 'gwei'),
-            })
-
-            signed_tx = self.web3.eth.account.signTransaction(tx, private_key=self.account.key)
-            tx_hash = self.web3.eth.sendRawTransaction(signed_tx.rawTransaction)
-            print(f"Transaction hash: {tx_hash.hex()}")
-
-
-            return tx_hash.hex()
+            return self._transact('UserRegistry', 'registerUser', nick, public_key, additional_data, is_bot)
         except Exception as e:
-            print(f"An error occurred during register_user: {e}")
+            logger.error(f"An error occurred during register_user: {e}")
             return None
 
-    def add_expert_field(self, nick, field_id):
+    def add_expert_field(self, public_key, field_id):
         try:
-            tx = self.contract.functions.addExpertField(
-                nick,
-                field_id
-            ).buildTransaction({
-                'from': self.account.address,
-                'nonce': self.web3.eth.getTransactionCount(self.account.address),
-                'gas': 200000,
-                'gasPrice': self.web3.toWei('10', 'gwei'),
-            })
-
-            signed_tx = self.web3.eth.account.signTransaction(tx, private_key=self.account.key)
-            tx_hash = self.web3.eth.sendRawTransaction(signed_tx.rawTransaction)
-            print(f"Transaction hash: {tx_hash.hex()}")
-
-            return tx_hash.hex()
+            return self._transact('UserRegistry', 'addExpertField', user_id(public_key), field_id)
         except Exception as e:
-            print(f"An error occurred during add_expert_field: {e}")
+            logger.error(f"An error occurred during add_expert_field: {e}")
             return None
 
-    def get_user_info(self, nick):
+    def get_user_info(self, public_key):
         try:
-            public_key, expert_fields, additional_data, is_bot = self.contract.functions.getUserInfo(nick).call()
+            nick, expert_fields, additional_data, is_bot = self.call('UserRegistry', 'getUserInfo', user_id(public_key))
             user_info = {
                 'nick': nick,
                 'public_key': public_key,
-                'expert_fields': expert_fields,
+                'expert_fields': list(expert_fields),
                 'additional_data': additional_data,
                 'is_bot': is_bot
             }
             return user_info
         except Exception as e:
-            print(f"An error occurred during get_user_info: {e}")
+            logger.error(f"An error occurred during get_user_info: {e}")
             return None
 
     def get_nick_by_address(self, address):
         try:
-            nick = self.contract.functions.getNickByAddress(address).call()
+            nick, = self.call('UserRegistry', 'getNickByAddress', user_id(address))
             return nick
         except Exception as e:
-            print(f"An error occurred during get_nick_by_address: {e}")
+            logger.error(f"An error occurred during get_nick_by_address: {e}")
+            return None
+
+    def get_current_leader(self, case_id):
+        try:
+            option, votes, voters_count = self.call('ExpertCaseManager', 'getCurrentLeader', case_id)
+            return {
+                'case_id': case_id,
+                'option': option,
+                'votes': votes,
+                'voters_count': voters_count
+            }
+        except Exception as e:
+            logger.error(f"An error occurred during get_current_leader: {e}")
+            return None
+
+    def get_open_cases(self, offset, limit, field_id=None):
+        try:
+            if field_id is None:
+                page = self.call('ExpertCaseManager', 'getOpenCases', offset, limit)
+            else:
+                page = self.call('ExpertCaseManager', 'getOpenCasesByField', field_id, offset, limit)
+            case_ids, item_ids, field_ids, min_reputations, infos, total, version = page
+            cases = [
+                {
+                    'case_id': case_id,
+                    'item_id': item_id,
+                    'field_id': case_field_id,
+                    'min_reputation': min_reputation,
+                    'info': info
+                }
+                for case_id, item_id, case_field_id, min_reputation, info
+                in zip(case_ids, item_ids, field_ids, min_reputations, infos)
+            ]
+            return {'cases': cases, 'total': total, 'version': version}
+        except Exception as e:
+            logger.error(f"An error occurred during get_open_cases: {e}")
+            return None
+
+    def get_items(self, from_id, count):
+        try:
+            item_ids, categories, item_infos, owners, total = self.call('ItemRegistry', 'getItems', from_id, count)
+            items = [
+                {
+                    'item_id': item_id,
+                    'category': category,
+                    'item_info': item_info,
+                    'owner_id': '0x' + owner.hex()
+                }
+                for item_id, category, item_info, owner in zip(item_ids, categories, item_infos, owners)
+            ]
+            return {'items': items, 'total': total}
+        except Exception as e:
+            logger.error(f"An error occurred during get_items: {e}")
             return None
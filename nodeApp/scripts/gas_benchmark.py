@@ -0,0 +1,160 @@
+"""
+Gas benchmark of the contracts on the local development chain.
+
+    python scripts/gas_benchmark.py [--update]
+
+Writes the measurements to reports/gas_benchmark.json and fails if any of
+them exceeds its limit in gas_thresholds.json, or if that file is missing.
+The thresholds are the measurements plus THRESHOLD_HEADROOM; they are only
+written by a run with --update, after an intended change. Never edit them
+by hand.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from brownie import accounts, network, project, web3
+
+ROOT: str = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+REPORT_PATH: str = os.path.join(ROOT, 'reports', 'gas_benchmark.json')
+THRESHOLDS_PATH: str = os.path.join(ROOT, 'gas_thresholds.json')
+THRESHOLD_HEADROOM: float = 1.1
+
+VOTER_SCALES: tuple = (10, 100, 500)
+FIELD_SCALES: tuple = (1, 10, 50)
+HISTORY_SCALES: tuple = (1, 100, 200)
+ITEM_BATCH: int = 50
+
+# A 2048 bit RSA key in PEM format
+PEM_KEY: str = "-----BEGIN PUBLIC KEY-----\n" + "A" * 392 + "\n-----END PUBLIC KEY-----\n"
+
+
+def user_id(public_key):
+    return web3.keccak(text=public_key)
+
+
+class Benchmark():
+    """Fresh contracts and the gas used by the measured calls."""
+
+    def __init__(self, contracts):
+        self.sender = {'from': accounts[0]}
+        self.user_registry = contracts.UserRegistry.deploy(self.sender)
+        self.item_registry = contracts.ItemRegistry.deploy(self.sender)
+        self.reputation_manager = contracts.ReputationManager.deploy(self.sender)
+        self.expert_case_manager = contracts.ExpertCaseManager.deploy(
+            self.reputation_manager.address,
+            self.user_registry.address,
+            self.sender
+        )
+        self.results: dict[str, int] = {}
+        self._users = 0
+
+    def record(self, name, tx, calls=1):
+        self.results[name] = tx.gas_used // calls
+        print(f"{name:<40} {tx.gas_used // calls:>12,}")
+
+    def new_user(self, fields=1, public_key=None):
+        """Registers a user who is an expert in fields 1..*fields*."""
+        self._users += 1
+        public_key = public_key or f"benchmark_public_key_{self._users}"
+        tx = self.user_registry.registerUser(f"User{self._users}", public_key, "Data", False, self.sender)
+        for field_id in range(1, fields + 1):
+            self.user_registry.addExpertField(user_id(public_key), field_id, self.sender)
+        return public_key, tx
+
+    def open_case(self):
+        tx = self.expert_case_manager.openExpertCase(1, 1, 0, user_id("opener"), False, "EC Info", self.sender)
+        return tx.return_value, tx
+
+    def run(self):
+        _, tx = self.new_user(fields=0)
+        self.record("registerUser", tx)
+        _, tx = self.new_user(fields=0, public_key=PEM_KEY)
+        self.record("registerUser[pem_key]", tx)
+
+        public_key, _ = self.new_user(fields=0)
+        for field_id in range(1, max(FIELD_SCALES) + 1):
+            tx = self.user_registry.addExpertField(user_id(public_key), field_id, self.sender)
+            if field_id in FIELD_SCALES:
+                self.record(f"addExpertField[fields={field_id}]", tx)
+
+        self.record("addItem", self.item_registry.addItem("Category", "Item info", user_id("owner"), self.sender))
+        tx = self.item_registry.addItems(
+            ["Category"] * ITEM_BATCH, ["Item info"] * ITEM_BATCH, [user_id("owner")] * ITEM_BATCH, self.sender)
+        self.record("addItems[per_item]", tx, calls=ITEM_BATCH)
+
+        self.open_case()
+        self.record("openExpertCase", self.open_case()[1])
+
+        # Vote gas must not depend on the number of fields of the voter
+        for fields in FIELD_SCALES:
+            ECId, _ = self.open_case()
+            public_key, _ = self.new_user(fields=fields)
+            self.record(f"castVote[fields={fields}]", self.expert_case_manager.castVote(ECId, 1, user_id(public_key), self.sender))
+
+        for history in HISTORY_SCALES:
+            public_key, _ = self.new_user()
+            for _ in range(history - 1):
+                self.reputation_manager.updateReputation(user_id(public_key), 1, 1, self.sender)
+            tx = self.reputation_manager.updateReputation(user_id(public_key), 1, 1, self.sender)
+            self.record(f"updateReputation[history={history}]", tx)
+
+        for voters in VOTER_SCALES:
+            ECId, _ = self.open_case()
+            for i in range(voters):
+                public_key, _ = self.new_user()
+                tx = self.expert_case_manager.castVote(ECId, i % 3, user_id(public_key), self.sender)
+            self.record(f"castVote[voters={voters}]", tx)
+            self.record(f"closeExpertCase[voters={voters}]", self.expert_case_manager.closeExpertCase(ECId, self.sender))
+            tx = self.expert_case_manager.settleExpertCase(ECId, voters, self.sender)
+            self.record(f"settleExpertCase[voters={voters}]", tx)
+
+        return self.results
+
+
+def check(results, thresholds):
+    """Returns descriptions of the measurements above their threshold."""
+    violations = []
+    for name, gas in results.items():
+        if name not in thresholds:
+            violations.append(f"{name}: no threshold, rerun with --update")
+        elif gas > thresholds[name]:
+            violations.append(f"{name}: {gas:,} gas > {thresholds[name]:,}")
+    return violations
+
+
+def main(update=False):
+    if not update and not os.path.exists(THRESHOLDS_PATH):
+        sys.exit(f"{THRESHOLDS_PATH} not found, create it with --update and commit it.")
+
+    contracts = project.load(ROOT)
+    network.connect('development')
+    results = Benchmark(contracts).run()
+
+    os.makedirs(os.path.dirname(REPORT_PATH), exist_ok=True)
+    with open(REPORT_PATH, 'w') as f:
+        json.dump({'timestamp': int(time.time()), 'network': network.show_active(), 'gas': results}, f, indent=2)
+    print(f"Report written to {REPORT_PATH}.")
+
+    if update:
+        with open(THRESHOLDS_PATH, 'w') as f:
+            json.dump({name: int(gas * THRESHOLD_HEADROOM) for name, gas in results.items()}, f, indent=2)
+            f.write('\n')
+        print(f"Thresholds written to {THRESHOLDS_PATH}, commit them.")
+        return
+
+    with open(THRESHOLDS_PATH) as f:
+        violations = check(results, json.load(f))
+    if violations:
+        sys.exit("Gas thresholds exceeded:\n  " + "\n  ".join(violations))
+    print("All gas measurements within thresholds.")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Gas benchmark of the contracts.")
+    parser.add_argument('--update', action='store_true',
+                        help="write gas_thresholds.json from this run instead of checking it")
+    main(parser.parse_args().update)
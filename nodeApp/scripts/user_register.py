@@ -1,4 +1,5 @@
 from ape import project, accounts, networks
+from eth_utils import keccak
 
 def register_user():
     with networks.ethereum.sepolia.use_provider("infura"):
@@ -8,8 +9,9 @@ def register_user():
         # tx = user_registry.registerUser("Alice", "2345g2524523f6j58k38q673456", "Test user", False, sender=deployer)
         # print(f"User registration tx: {tx.txn_hash}")
 
-        # public_key, expert_fields, additional_data, is_bot = user_registry.getUserInfo("Alice")
-        # print("User info:", public_key, expert_fields, additional_data, is_bot)
+        # nick, expert_fields, additional_data, is_bot = user_registry.getUserInfo(keccak(text="2345g2524523f6j58k38q673456"))
+        # print("User info:", nick, expert_fields, additional_data, is_bot)
 
-        nick = user_registry.getNickByAddress("2345g2524523f6j58k38q673456")
+        # Users are identified by keccak256 of their public key
+        nick = user_registry.getNickByAddress(keccak(text="2345g2524523f6j58k38q673456"))
         print("Nick from address:", nick)
@@ -31,21 +31,25 @@ def register_user(nick, public_key, additional_data, is_bot):
     except Exception as e:
         print(f"Error while registering user: {str(e)}")
 
+# Users are identified on chain by keccak256 of their public key
+def user_id(public_key):
+    return web3.keccak(text=public_key)
+
 # 2. Add an expert field to an existing user
-def add_expert_field(nick, field_id):
+def add_expert_field(public_key, field_id):
     try:
-        tx = user_registry.addExpertField(nick, field_id, {"from": deployer})
+        tx = user_registry.addExpertField(user_id(public_key), field_id, {"from": deployer})
         tx.wait(1)  # Wait for the transaction to be mined
-        print(f"Expert field {field_id} added to {nick}.")
+        print(f"Expert field {field_id} added to {public_key}.")
     except Exception as e:
         print(f"Error while adding expert field: {str(e)}")
 
-# 3. Get user information by nick
-def get_user_info(nick):
+# 3. Get user information by public key
+def get_user_info(public_key):
     try:
-        public_key, expert_fields, additional_data, is_bot = user_registry.getUserInfo(nick)
-        print(f"User Info for {nick}:")
-        print(f"  Public Key: {public_key}")
+        nick, expert_fields, additional_data, is_bot = user_registry.getUserInfo(user_id(public_key))
+        print(f"User Info for {public_key}:")
+        print(f"  Nick: {nick}")
         print(f"  Expert Fields: {expert_fields}")
         print(f"  Additional Data: {additional_data}")
         print(f"  Is Bot: {is_bot}")
@@ -55,7 +59,7 @@ def get_user_info(nick):
 # 4. Get user nickname by address
 def get_nick_by_address(address):
     try:
-        nick = user_registry.getNickByAddress(address)
+        nick = user_registry.getNickByAddress(user_id(address))
         print(f"Nick for address {address}: {nick}")
     except Exception as e:
         print(f"Error while getting nickname by address: {str(e)}")
@@ -66,10 +70,10 @@ def main():
     register_user("Alice", "0xYourPublicKeyHere", "Some additional data", False)
 
     # Add expert field for Alice
-    add_expert_field("Alice", 1)
+    add_expert_field("0xYourPublicKeyHere", 1)
 
     # Get user info for Alice
-    get_user_info("Alice")
+    get_user_info("0xYourPublicKeyHere")
 
     # Get nickname by address (replace with actual address)
     get_nick_by_address("0xYourPublicKeyHere")
@@ -0,0 +1,35 @@
+import json
+import os
+import sys
+
+from node.fake_chain import FakeChain
+from node.message_handler.MessageHandler import MessageHandler
+from node.node_context import NodeContext
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../Message')))
+from Message import Message, Type
+
+def batch(context, *messages):
+    payload = json.dumps([m.to_json() for m in messages])
+    return MessageHandler.handle(Message(type=Type.BATCH, payload=payload), context)
+
+def test_batch_answers_in_order():
+    chain = FakeChain()
+    chain.connect()
+    context = NodeContext(blockchain=chain)
+
+    response = batch(
+        context,
+        Message(type=Type.GET_ITEMS, payload=json.dumps({"from_id": 1, "count": 10})),
+        Message(type=Type.REGISTER, payload=json.dumps({"nick": "Alice", "public_key": "key"})),
+        Message(type=Type.OPEN_CASES, payload=json.dumps({"offset": 0, "limit": 10})),
+    )
+    assert response.get_status() == 200
+    items, register, cases = [Message.from_json(m) for m in json.loads(response.get_payload())]
+    assert items.get_status() == 200 and json.loads(items.get_payload())["total"] == 0
+    assert register.get_status() == 400
+    assert cases.get_status() == 200
+
+def test_invalid_batch():
+    response = MessageHandler.handle(Message(type=Type.BATCH, payload="not json"), NodeContext())
+    assert response.get_status() == 400
@@ -0,0 +1,73 @@
+import time
+
+import pytest
+
+from node.case_settler import CaseSettler
+from node.fake_chain import FakeChain
+from node.transaction_queue import TransactionQueue
+from node.user_regitry_interface import user_id
+
+@pytest.fixture
+def chain():
+    chain = FakeChain()
+    chain.connect()
+    return chain
+
+@pytest.fixture
+def settler(chain, monkeypatch):
+    monkeypatch.setattr(TransactionQueue, 'POLL_INTERVAL', 0.01)
+    monkeypatch.setattr(CaseSettler, 'POLL_INTERVAL', 0.01)
+    monkeypatch.setattr(CaseSettler, 'VOTERS_PER_TX', 4)
+    transaction_queue = TransactionQueue(chain)
+    transaction_queue.start()
+    settler = CaseSettler(chain, transaction_queue)
+    settler.start()
+    yield settler
+    settler.stop()
+    transaction_queue.stop()
+
+def wait_until_settled(chain, case_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if chain.call('ExpertCaseManager', 'getSettlementProgress', case_id)[2]:
+            return True
+        time.sleep(0.01)
+    return False
+
+def open_case_with_voters(chain, voters, first_voter=0):
+    case_id = chain._contracts['ExpertCaseManager'].openExpertCase(1, 1, 0, user_id("opener"), False, "EC Info")
+    for i in range(first_voter, first_voter + voters):
+        chain._contracts['UserRegistry'].registerUser(f"Voter{i}", f"voter_{i}", "Data", False)
+        chain._contracts['UserRegistry'].addExpertField(user_id(f"voter_{i}"), 1)
+        chain._contracts['ExpertCaseManager'].castVote(case_id, 0 if i - first_voter < 7 else 1, user_id(f"voter_{i}"))
+    return case_id
+
+def test_settle_in_chunks(chain, settler):
+    case_id = open_case_with_voters(chain, 10)
+
+    assert settler.settle(case_id)
+    assert not settler.settle(case_id)
+
+    assert wait_until_settled(chain, case_id)
+    assert chain.call('ExpertCaseManager', 'getSettlementProgress', case_id) == (10, 10, True)
+    assert chain.call('ReputationManager', 'getReputation', user_id("voter_0"), 1) == (1,)
+    assert chain.call('ReputationManager', 'getReputation', user_id("voter_9"), 1) == (-1,)
+
+def test_settle_case_without_voters(chain, settler):
+    case_id = chain._contracts['ExpertCaseManager'].openExpertCase(1, 1, 0, user_id("opener"), False, "EC Info")
+
+    settler.settle(case_id)
+
+    assert wait_until_settled(chain, case_id)
+    assert chain.call('ExpertCaseManager', 'getExpertCase', case_id)[-1] is False
+
+def test_settle_small_case_then_large_case(chain, settler):
+    # Gas of a chunk depends on the voters left, not on the arguments
+    small_case_id = open_case_with_voters(chain, 1)
+    large_case_id = open_case_with_voters(chain, 10, first_voter=1)
+
+    settler.settle(small_case_id)
+    assert wait_until_settled(chain, small_case_id)
+    settler.settle(large_case_id)
+    assert wait_until_settled(chain, large_case_id)
+    assert chain.call('ExpertCaseManager', 'getSettlementProgress', large_case_id) == (10, 10, True)
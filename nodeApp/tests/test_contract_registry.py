@@ -0,0 +1,91 @@
+import hashlib
+import json
+
+import pytest
+from eth_abi import encode
+from eth_utils import keccak, to_checksum_address
+
+from node.contract_registry import ContractRegistry
+
+SOURCE = b"contract ItemRegistry {}"
+ADDRESS = "0x" + "ab" * 20
+
+ABI = [
+    {
+        'type': 'function',
+        'name': 'addItem',
+        'inputs': [{'name': 'category', 'type': 'string'}, {'name': 'owner', 'type': 'bytes32'}],
+        'outputs': [{'name': '', 'type': 'uint256'}],
+    },
+    {
+        'type': 'function',
+        'name': 'getItems',
+        'inputs': [{'name': 'fromId', 'type': 'uint256'}],
+        'outputs': [{'name': '', 'type': 'tuple[]', 'components': [
+            {'name': 'id', 'type': 'uint256'}, {'name': 'category', 'type': 'string'}]}],
+    },
+    {'type': 'event', 'name': 'ItemAdded', 'inputs': []},
+]
+
+@pytest.fixture
+def build_dir(tmp_path):
+    """Brownie project with one compiled contract, deployed on chain 1337."""
+    (tmp_path / 'contracts').mkdir()
+    (tmp_path / 'contracts' / 'ItemRegistry.sol').write_bytes(SOURCE)
+    build = tmp_path / 'build'
+    (build / 'contracts').mkdir(parents=True)
+    (build / 'contracts' / 'ItemRegistry.json').write_text(json.dumps({
+        'contractName': 'ItemRegistry',
+        'abi': ABI,
+        'sourcePath': 'contracts/ItemRegistry.sol',
+        'sha1': hashlib.sha1(SOURCE).hexdigest(),
+    }))
+    (build / 'deployments' / '1337').mkdir(parents=True)
+    (build / 'deployments' / '1337' / f'{ADDRESS}.json').write_text(json.dumps({'contractName': 'ItemRegistry'}))
+    return build
+
+def test_codecs_prepared_once(build_dir):
+    registry = ContractRegistry(str(build_dir))
+    assert registry.names() == ['ItemRegistry']
+
+    add_item = registry.function('ItemRegistry', 'addItem')
+    assert registry.function('ItemRegistry', 'addItem') is add_item
+    assert add_item.encode(("Books", b"\x01" * 32)) == (
+        keccak(text="addItem(string,bytes32)")[:4] + encode(['string', 'bytes32'], ["Books", b"\x01" * 32]))
+    assert add_item.decode(encode(['uint256'], [7])) == (7,)
+
+    # Structs are expanded into tuples
+    get_items = registry.function('ItemRegistry', 'getItems')
+    assert get_items.output_types == ['(uint256,string)[]']
+    assert get_items.decode(encode(['(uint256,string)[]'], [[(1, "Books")]])) == (((1, "Books"),),)
+
+    with pytest.raises(AttributeError):
+        registry.function('ItemRegistry', 'ItemAdded')
+    with pytest.raises(ValueError):
+        registry.function('UserRegistry', 'registerUser')
+
+def test_stale_artifact_is_rejected(build_dir):
+    (build_dir.parent / 'contracts' / 'ItemRegistry.sol').write_bytes(SOURCE + b"\n// changed")
+    with pytest.raises(ValueError, match="stale"):
+        ContractRegistry(str(build_dir))
+
+def test_missing_artifacts(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ContractRegistry(str(tmp_path))
+
+def test_address_resolved_once(build_dir, monkeypatch):
+    monkeypatch.delenv('ITEM_REGISTRY_ADDRESS', raising=False)
+    registry = ContractRegistry(str(build_dir))
+    with pytest.raises(ValueError):
+        registry.address('ItemRegistry', 1)
+
+    assert registry.address('ItemRegistry', 1337) == to_checksum_address(ADDRESS)
+    # Later calls neither read the deployment map nor the environment again
+    (build_dir / 'deployments' / '1337' / f'{ADDRESS}.json').unlink()
+    monkeypatch.setenv('ITEM_REGISTRY_ADDRESS', "0x" + "cd" * 20)
+    assert registry.address('ItemRegistry', 1337) == to_checksum_address(ADDRESS)
+
+def test_address_from_environment(build_dir, monkeypatch):
+    monkeypatch.setenv('ITEM_REGISTRY_ADDRESS', "0x" + "cd" * 20)
+    assert ContractRegistry.address_variable('ItemRegistry') == 'ITEM_REGISTRY_ADDRESS'
+    assert ContractRegistry(str(build_dir)).address('ItemRegistry', 1337) == to_checksum_address("0x" + "cd" * 20)
@@ -0,0 +1,32 @@
+import json
+import os
+import sys
+
+from node.fake_chain import FakeChain
+from node.message_handler.MessageHandler import MessageHandler
+from node.node_context import NodeContext
+from node.user_regitry_interface import user_id
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../Message')))
+from Message import Message, Type
+
+def current_leader(context, payload):
+    return MessageHandler.handle(Message(type=Type.CURRENT_LEADER, payload=payload), context)
+
+def test_current_leader():
+    chain = FakeChain()
+    chain.connect()
+    case_id = chain._contracts['ExpertCaseManager'].openExpertCase(1, 1, 0, user_id("opener"), False, "EC Info")
+    for i, choice in enumerate((2, 2, 1)):
+        chain._contracts['UserRegistry'].registerUser(f"Voter{i}", f"voter_{i}", "Data", False)
+        chain._contracts['UserRegistry'].addExpertField(user_id(f"voter_{i}"), 1)
+        chain._contracts['ExpertCaseManager'].castVote(case_id, choice, user_id(f"voter_{i}"))
+    context = NodeContext(blockchain=chain)
+
+    response = current_leader(context, json.dumps({"case_id": case_id}))
+    assert response.get_status() == 200
+    assert json.loads(response.get_payload()) == {"case_id": case_id, "option": 2, "votes": 2, "voters_count": 3}
+
+    assert current_leader(context, json.dumps({"case_id": case_id + 1})).get_status() == 404
+    assert current_leader(context, "not json").get_status() == 400
+    assert current_leader(NodeContext(), json.dumps({"case_id": case_id})).get_status() == 503
@@ -5,8 +5,12 @@ from brownie import (
     ExpertCaseManager,
     accounts,
     reverts,
+    web3,
 )
 
+def user_id(public_key):
+    return web3.keccak(text=public_key)
+
 @pytest.fixture
 def reputation_manager():
     return ReputationManager.deploy({'from': accounts[0]})
@@ -32,25 +36,25 @@ def test_open_and_vote_expert_case(
     # Use a public key as string to identify users
     public_key = "user_public_key_1"
     user_registry.registerUser("ExpertUser", public_key, "Expert data", False, {'from': accounts[0]})
-    user_registry.addExpertField("ExpertUser", 1, {'from': accounts[0]})
+    user_registry.addExpertField(user_id(public_key), 1, {'from': accounts[0]})
 
-    reputation_manager.updateReputation(public_key, 1, 5, {'from': accounts[0]})
+    reputation_manager.updateReputation(user_id(public_key), 1, 5, {'from': accounts[0]})
 
     tx = expert_case_manager.openExpertCase(
         1,          # itemId
         1,          # fieldId
         3,          # minReputation
-        public_key, # publicKey (as string)
+        user_id(public_key), # openerId
         False,      # botAllowed
         "EC Info",  # ECInfo
         {'from': accounts[0]}
     )
     ECId = tx.return_value
 
-    expert_case_manager.castVote(ECId, 1, public_key, {'from': accounts[0]})
+    expert_case_manager.castVote(ECId, 1, user_id(public_key), {'from': accounts[0]})
 
     with reverts("already_voted"):
-        expert_case_manager.castVote(ECId, 1, public_key, {'from': accounts[0]})
+        expert_case_manager.castVote(ECId, 1, user_id(public_key), {'from': accounts[0]})
 
 def test_vote_with_low_reputation(
     reputation_manager,
@@ -61,14 +65,14 @@ def test_vote_with_low_reputation(
     # Use a public key as string to identify users
     public_key = "user_public_key_2"
     user_registry.registerUser("LowRepUser", public_key, "Data", False, {'from': accounts[0]})
-    user_registry.addExpertField("LowRepUser", 1, {'from': accounts[0]})
-    reputation_manager.updateReputation(public_key, 1, 2, {'from': accounts[0]})
+    user_registry.addExpertField(user_id(public_key), 1, {'from': accounts[0]})
+    reputation_manager.updateReputation(user_id(public_key), 1, 2, {'from': accounts[0]})
 
     tx = expert_case_manager.openExpertCase(
         1,          # itemId
         1,          # fieldId
         3,          # minReputation
-        public_key, # publicKey (as string)
+        user_id(public_key), # openerId
         False,      # botAllowed
         "EC Info",  # ECInfo
         {'from': accounts[0]}
@@ -76,7 +80,7 @@ def test_vote_with_low_reputation(
     ECId = tx.return_value
 
     with reverts("reputation_too_low"):
-        expert_case_manager.castVote(ECId, 1, public_key, {'from': accounts[0]})
+        expert_case_manager.castVote(ECId, 1, user_id(public_key), {'from': accounts[0]})
 
 def test_user_with_multiple_expert_fields(
     reputation_manager,
@@ -87,24 +91,65 @@ def test_user_with_multiple_expert_fields(
     # Use a public key as string to identify users
     public_key = "user_public_key_3"
     user_registry.registerUser("MultiExpert", public_key, "Expert data", False, {'from': accounts[0]})
-    user_registry.addExpertField("MultiExpert", 1, {'from': accounts[0]})
-    user_registry.addExpertField("MultiExpert", 2, {'from': accounts[0]})
+    user_registry.addExpertField(user_id(public_key), 1, {'from': accounts[0]})
+    user_registry.addExpertField(user_id(public_key), 2, {'from': accounts[0]})
 
-    reputation_manager.updateReputation(public_key, 1, 5, {'from': accounts[0]})
-    reputation_manager.updateReputation(public_key, 2, 7, {'from': accounts[0]})
+    reputation_manager.updateReputation(user_id(public_key), 1, 5, {'from': accounts[0]})
+    reputation_manager.updateReputation(user_id(public_key), 2, 7, {'from': accounts[0]})
 
     tx = expert_case_manager.openExpertCase(
         1,          # itemId
         2,          # fieldId
         5,          # minReputation
-        public_key, # publicKey (as string)
+        user_id(public_key), # openerId
         False,      # botAllowed
         "EC Info",  # ECInfo
         {'from': accounts[0]}
     )
     ECId = tx.return_value
 
-    expert_case_manager.castVote(ECId, 1, public_key, {'from': accounts[0]})
+    expert_case_manager.castVote(ECId, 1, user_id(public_key), {'from': accounts[0]})
+
+def test_cast_vote_gas_independent_of_expert_fields(
+    reputation_manager,
+    user_registry,
+    expert_case_manager,
+    accounts
+):
+    user_registry.registerUser("FewFields", "voter_key_a", "Data", False, {'from': accounts[0]})
+    user_registry.registerUser("ManyFields", "voter_key_b", "Data", False, {'from': accounts[0]})
+    user_registry.addExpertField(user_id("voter_key_a"), 1, {'from': accounts[0]})
+    for field_id in range(1, 51):
+        user_registry.addExpertField(user_id("voter_key_b"), field_id, {'from': accounts[0]})
+
+    gas_used = []
+    for public_key in ("voter_key_a", "voter_key_b"):
+        tx = expert_case_manager.openExpertCase(1, 1, 0, user_id(public_key), False, "EC Info", {'from': accounts[0]})
+        tx = expert_case_manager.castVote(tx.return_value, 1, user_id(public_key), {'from': accounts[0]})
+        gas_used.append(tx.gas_used)
+
+    # Same storage writes for both voters, the expert field lookup is a single mapping read
+    assert abs(gas_used[0] - gas_used[1]) < 100
+
+def test_cast_vote_gas_independent_of_public_key_length(
+    user_registry,
+    expert_case_manager,
+    accounts
+):
+    # A 2048 bit RSA key in PEM format is about 450 bytes
+    keys = ("k" * 32, "k" * 480)
+
+    gas_used = []
+    for i, public_key in enumerate(keys):
+        user_registry.registerUser(f"KeyLength{i}", public_key, "Data", False, {'from': accounts[0]})
+        user_registry.addExpertField(user_id(public_key), 1, {'from': accounts[0]})
+        tx = expert_case_manager.openExpertCase(1, 1, 0, user_id(public_key), False, "EC Info", {'from': accounts[0]})
+        tx = expert_case_manager.castVote(tx.return_value, 1, user_id(public_key), {'from': accounts[0]})
+        gas_used.append(tx.gas_used)
+
+    # Voters are stored and looked up by a 32 byte id, never by the key itself
+    assert abs(gas_used[0] - gas_used[1]) < 100
+    assert gas_used[1] < 200000
 
 def test_close_expert_case(
     reputation_manager,
@@ -117,30 +162,167 @@ def test_close_expert_case(
     public_key_2 = "user_public_key_5"
     user_registry.registerUser("Expert1", public_key_1, "Data1", False, {'from': accounts[0]})
     user_registry.registerUser("Expert2", public_key_2, "Data2", False, {'from': accounts[0]})
-    user_registry.addExpertField("Expert1", 1, {'from': accounts[0]})
-    user_registry.addExpertField("Expert2", 1, {'from': accounts[0]})
+    user_registry.addExpertField(user_id(public_key_1), 1, {'from': accounts[0]})
+    user_registry.addExpertField(user_id(public_key_2), 1, {'from': accounts[0]})
 
-    reputation_manager.updateReputation(public_key_1, 1, 5, {'from': accounts[0]})
-    reputation_manager.updateReputation(public_key_2, 1, 5, {'from': accounts[0]})
+    reputation_manager.updateReputation(user_id(public_key_1), 1, 5, {'from': accounts[0]})
+    reputation_manager.updateReputation(user_id(public_key_2), 1, 5, {'from': accounts[0]})
 
     tx = expert_case_manager.openExpertCase(
         1,          # itemId
         1,          # fieldId
         3,          # minReputation
-        public_key_1, # publicKey (as string)
+        user_id(public_key_1), # openerId
         False,      # botAllowed
         "EC Info",  # ECInfo
         {'from': accounts[0]}
     )
     ECId = tx.return_value
 
-    expert_case_manager.castVote(ECId, 1, public_key_1, {'from': accounts[0]})
-    expert_case_manager.castVote(ECId, 2, public_key_2, {'from': accounts[0]})
+    expert_case_manager.castVote(ECId, 1, user_id(public_key_1), {'from': accounts[0]})
+    expert_case_manager.castVote(ECId, 2, user_id(public_key_2), {'from': accounts[0]})
 
     expert_case_manager.closeExpertCase(ECId, {'from': accounts[0]})
 
-    rep1 = reputation_manager.getReputation(public_key_1, 1)
-    rep2 = reputation_manager.getReputation(public_key_2, 1)
+    # Reputations change only once the case is settled
+    assert reputation_manager.getReputation(user_id(public_key_1), 1) == 5
+    assert expert_case_manager.getSettlementProgress(ECId) == (0, 2, False)
+
+    expert_case_manager.settleExpertCase(ECId, 1, {'from': accounts[0]})
+    assert expert_case_manager.getSettlementProgress(ECId) == (1, 2, False)
+    tx = expert_case_manager.settleExpertCase(ECId, 1, {'from': accounts[0]})
+    assert 'ExpertCaseSettled' in tx.events
+
+    with reverts("EC_already_settled"):
+        expert_case_manager.settleExpertCase(ECId, 1, {'from': accounts[0]})
+
+    rep1 = reputation_manager.getReputation(user_id(public_key_1), 1)
+    rep2 = reputation_manager.getReputation(user_id(public_key_2), 1)
 
     assert rep1 == 7
     assert rep2 == 4
+
+@pytest.mark.parametrize("voters_count", [10, 100, 500])
+def test_close_expert_case_gas(
+    reputation_manager,
+    user_registry,
+    expert_case_manager,
+    accounts,
+    voters_count
+):
+    tx = expert_case_manager.openExpertCase(1, 1, 0, user_id("opener_public_key"), False, "EC Info", {'from': accounts[0]})
+    ECId = tx.return_value
+
+    for i in range(voters_count):
+        public_key = f"voter_public_key_{i}"
+        user_registry.registerUser(f"Voter{i}", public_key, "Data", False, {'from': accounts[0]})
+        user_registry.addExpertField(user_id(f"voter_public_key_{i}"), 1, {'from': accounts[0]})
+        expert_case_manager.castVote(ECId, i % 3, user_id(public_key), {'from': accounts[0]})
+
+    # Closing only freezes the result, its cost does not depend on the voters
+    tx = expert_case_manager.closeExpertCase(ECId, {'from': accounts[0]})
+    assert tx.gas_used < 100000
+
+    tx = expert_case_manager.settleExpertCase(ECId, voters_count, {'from': accounts[0]})
+    gas_per_voter = tx.gas_used / voters_count
+
+    # One external call for all voters of the chunk
+    assert len([call for call in tx.subcalls if 'updateReputation' in call.get('function', '')]) == 1
+    assert 'ReputationsUpdated' in tx.events
+
+    # A fresh user's reputation takes two new storage slots (~44k gas), the
+    # rest of the per voter cost must stay small
+    assert gas_per_voter < 70000
+
+    # Option 0 got the most votes
+    assert reputation_manager.getReputation(user_id("voter_public_key_0"), 1) > 0
+    assert reputation_manager.getReputation(user_id("voter_public_key_1"), 1) == -1
+
+def test_settle_expert_case_in_chunks(
+    reputation_manager,
+    user_registry,
+    expert_case_manager,
+    accounts
+):
+    tx = expert_case_manager.openExpertCase(1, 1, 0, user_id("opener_public_key"), False, "EC Info", {'from': accounts[0]})
+    ECId = tx.return_value
+
+    with reverts("EC_open"):
+        expert_case_manager.settleExpertCase(ECId, 10, {'from': accounts[0]})
+
+    for i in range(25):
+        public_key = f"voter_public_key_{i}"
+        user_registry.registerUser(f"Voter{i}", public_key, "Data", False, {'from': accounts[0]})
+        user_registry.addExpertField(user_id(f"voter_public_key_{i}"), 1, {'from': accounts[0]})
+        expert_case_manager.castVote(ECId, 0 if i < 20 else 1, user_id(public_key), {'from': accounts[0]})
+
+    expert_case_manager.closeExpertCase(ECId, {'from': accounts[0]})
+
+    gas_used = []
+    while not expert_case_manager.getSettlementProgress(ECId)[2]:
+        gas_used.append(expert_case_manager.settleExpertCase(ECId, 10, {'from': accounts[0]}).gas_used)
+
+    # Every chunk is bounded, the last one is smaller
+    assert len(gas_used) == 3
+    assert gas_used[2] < gas_used[0]
+    assert reputation_manager.getReputation(user_id("voter_public_key_0"), 1) == 1
+    assert reputation_manager.getReputation(user_id("voter_public_key_24"), 1) == -1
+
+def test_close_expert_case_without_voters(expert_case_manager, accounts):
+    tx = expert_case_manager.openExpertCase(1, 1, 0, user_id("opener_public_key"), False, "EC Info", {'from': accounts[0]})
+    ECId = tx.return_value
+
+    tx = expert_case_manager.closeExpertCase(ECId, {'from': accounts[0]})
+    assert 'ExpertCaseSettled' in tx.events
+    assert expert_case_manager.getSettlementProgress(ECId) == (0, 0, True)
+
+def test_current_leader_tie_break(user_registry, expert_case_manager, accounts):
+    tx = expert_case_manager.openExpertCase(1, 1, 0, user_id("opener_public_key"), False, "EC Info", {'from': accounts[0]})
+    ECId = tx.return_value
+    assert expert_case_manager.getCurrentLeader(ECId) == (0, 0, 0)
+
+    for i in range(4):
+        user_registry.registerUser(f"Voter{i}", f"voter_public_key_{i}", "Data", False, {'from': accounts[0]})
+        user_registry.addExpertField(user_id(f"voter_public_key_{i}"), 1, {'from': accounts[0]})
+
+    # Option 2 reaches two votes first and keeps the lead on the tie
+    for i, option in enumerate((1, 2, 2, 1)):
+        expert_case_manager.castVote(ECId, option, user_id(f"voter_public_key_{i}"), {'from': accounts[0]})
+    assert expert_case_manager.getCurrentLeader(ECId) == (2, 2, 4)
+
+    tx = expert_case_manager.closeExpertCase(ECId, {'from': accounts[0]})
+    assert tx.events['ExpertCaseClosed']['winningOption'] == 2
+
+def test_open_cases_index(expert_case_manager, accounts):
+    for field_id in (1, 2, 1, 1):
+        expert_case_manager.openExpertCase(1, field_id, 0, user_id("opener_public_key"), False, "EC Info", {'from': accounts[0]})
+
+    ECIds, itemIds, fieldIds, minReputations, ECInfos, total, version = expert_case_manager.getOpenCases(0, 10)
+    assert list(ECIds) == [1, 2, 3, 4]
+    assert total == 4
+    assert version == 4
+
+    # Closing swaps the last open case into the freed position
+    expert_case_manager.closeExpertCase(1, {'from': accounts[0]})
+    ECIds, *_, total, version = expert_case_manager.getOpenCases(0, 10)
+    assert list(ECIds) == [4, 2, 3]
+    assert total == 3
+    assert version == 5
+
+    ECIds, *_, total, version = expert_case_manager.getOpenCasesByField(1, 0, 10)
+    assert list(ECIds) == [4, 3]
+    assert total == 2
+    assert version == 5
+
+    # Pages past the end are empty
+    ECIds, *_, total, _ = expert_case_manager.getOpenCases(2, 10)
+    assert list(ECIds) == [3]
+    ECIds, *_, total, _ = expert_case_manager.getOpenCases(5, 10)
+    assert list(ECIds) == []
+    assert total == 3
+
+def test_open_expert_case_rejects_oversized_ids(expert_case_manager, accounts):
+    with reverts("uint64_overflow"):
+        expert_case_manager.openExpertCase(2**64, 1, 0, user_id("opener_public_key"), False, "EC Info", {'from': accounts[0]})
+    with reverts("uint128_overflow"):
+        expert_case_manager.openExpertCase(1, 1, 2**128, user_id("opener_public_key"), False, "EC Info", {'from': accounts[0]})
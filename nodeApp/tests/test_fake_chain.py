@@ -0,0 +1,92 @@
+import pytest
+from web3.exceptions import ContractLogicError
+
+from node.fake_chain import FakeChain
+from node.user_regitry_interface import user_id
+
+@pytest.fixture
+def chain():
+    chain = FakeChain()
+    chain.connect()
+    return chain
+
+def transact(chain, contract, function, *args):
+    tx = chain.build_transaction(contract, function, args, chain.get_transaction_count(), chain.fees())
+    return chain.get_receipt(chain.send_transaction(tx))
+
+def test_register_user(chain):
+    receipt = transact(chain, 'UserRegistry', 'registerUser', "Alice", "alice_public_key", "Data", False)
+    assert receipt['status'] == 1
+    assert receipt['returnValue'] == "register_success"
+
+    receipt = transact(chain, 'UserRegistry', 'registerUser', "Alice", "other_key", "Data", False)
+    assert receipt['status'] == 0
+    assert "nick_already_taken" in receipt['revertReason']
+
+    assert chain.get_nick_by_address("alice_public_key") == "Alice"
+    assert chain.get_user_info("alice_public_key")['nick'] == "Alice"
+    assert chain.call('UserRegistry', 'getUserIdByNick', "Alice") == (user_id("alice_public_key"),)
+
+def test_call_reverts(chain):
+    with pytest.raises(ContractLogicError, match="item_not_exist"):
+        chain.call('ItemRegistry', 'getItem', 999)
+
+def test_close_expert_case(chain):
+    for nick, public_key in (("Expert1", "user_public_key_4"), ("Expert2", "user_public_key_5")):
+        transact(chain, 'UserRegistry', 'registerUser', nick, public_key, "Data", False)
+        transact(chain, 'UserRegistry', 'addExpertField', user_id(public_key), 1)
+        transact(chain, 'ReputationManager', 'updateReputation', user_id(public_key), 1, 5)
+
+    case_id = transact(chain, 'ExpertCaseManager', 'openExpertCase', 1, 1, 3, user_id("user_public_key_4"), False, "EC Info")['returnValue']
+    transact(chain, 'ExpertCaseManager', 'castVote', case_id, 1, user_id("user_public_key_4"))
+    transact(chain, 'ExpertCaseManager', 'castVote', case_id, 2, user_id("user_public_key_5"))
+
+    receipt = transact(chain, 'ExpertCaseManager', 'castVote', case_id, 2, user_id("user_public_key_5"))
+    assert "already_voted" in receipt['revertReason']
+
+    # Tie, option 1 got its vote first
+    assert chain.get_current_leader(case_id) == {'case_id': case_id, 'option': 1, 'votes': 1, 'voters_count': 2}
+
+    transact(chain, 'ExpertCaseManager', 'closeExpertCase', case_id)
+    assert chain.call('ExpertCaseManager', 'getSettlementProgress', case_id) == (0, 2, False)
+
+    transact(chain, 'ExpertCaseManager', 'settleExpertCase', case_id, 1)
+    assert chain.call('ExpertCaseManager', 'getSettlementProgress', case_id) == (1, 2, False)
+    transact(chain, 'ExpertCaseManager', 'settleExpertCase', case_id, 10)
+    assert chain.call('ExpertCaseManager', 'getSettlementProgress', case_id) == (2, 2, True)
+
+    receipt = transact(chain, 'ExpertCaseManager', 'settleExpertCase', case_id, 10)
+    assert "EC_already_settled" in receipt['revertReason']
+
+    assert chain.call('ReputationManager', 'getReputation', user_id("user_public_key_4"), 1) == (7,)
+    assert chain.call('ReputationManager', 'getReputation', user_id("user_public_key_5"), 1) == (4,)
+    assert chain.call('ExpertCaseManager', 'getExpertCase', case_id)[-1] is False
+
+def test_receipt_after_block_time():
+    chain = FakeChain(block_time=60)
+    chain.connect()
+    receipt = transact(chain, 'ItemRegistry', 'addItem', "Books", "Inception", user_id("owner"))
+    assert receipt is None
+
+def test_open_cases(chain):
+    for field_id in (1, 2, 1, 1):
+        transact(chain, 'ExpertCaseManager', 'openExpertCase', 1, field_id, 0, user_id("opener"), False, f"Case in {field_id}")
+    transact(chain, 'ExpertCaseManager', 'closeExpertCase', 1)
+
+    page = chain.get_open_cases(0, 2)
+    assert [case['case_id'] for case in page['cases']] == [4, 2]
+    assert page['total'] == 3
+    # Four opens and a close
+    assert page['version'] == 5
+
+    page = chain.get_open_cases(0, 10, field_id=1)
+    assert [case['case_id'] for case in page['cases']] == [4, 3]
+    assert page['cases'][0]['info'] == "Case in 1"
+
+def test_add_and_get_items(chain):
+    owners = [user_id("owner1"), user_id("owner2")]
+    receipt = transact(chain, 'ItemRegistry', 'addItems', ["Books", "Movies"], ["Blockchain Basics", "Inception"], owners)
+    assert receipt['returnValue'] == (1, 2)
+
+    page = chain.get_items(2, 10)
+    assert page == {'items': [{'item_id': 2, 'category': "Movies", 'item_info': "Inception", 'owner_id': '0x' + owners[1].hex()}], 'total': 2}
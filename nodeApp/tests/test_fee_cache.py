@@ -0,0 +1,44 @@
+from node.fee_cache import FeeCache, size_bucket, size_in_words
+
+class CountingChain:
+    def __init__(self):
+        self.estimates = 0
+
+    def estimate_gas(self, contract, function, args):
+        self.estimates += 1
+        return 100_000
+
+    def fetch_fees(self):
+        return 10, 2
+
+def test_size_bucket():
+    assert size_in_words(("", 1, True)) == 0
+    assert size_in_words(("a" * 33,)) == 2
+    assert [size_bucket(words) for words in (0, 1, 2, 3, 4, 5)] == [0, 1, 2, 4, 4, 8]
+
+def test_gas_estimated_once_per_bucket():
+    chain = CountingChain()
+    fee_cache = FeeCache(chain)
+
+    first = fee_cache.gas_limit('UserRegistry', 'registerUser', ("a" * 70,))
+    fee_cache.gas_limit('UserRegistry', 'registerUser', ("b" * 100,))
+    assert chain.estimates == 1
+    # headroom covers the largest arguments of the bucket
+    assert first == int((100_000 + FeeCache.WORD_GAS) * FeeCache.GAS_MARGIN)
+
+    fee_cache.gas_limit('UserRegistry', 'registerUser', ("c" * 200,))
+    assert chain.estimates == 2
+
+def test_state_dependent_gas_estimated_every_call():
+    chain = CountingChain()
+    fee_cache = FeeCache(chain)
+
+    for _ in range(2):
+        gas_limit = fee_cache.gas_limit('ExpertCaseManager', 'settleExpertCase', (1, 100))
+    assert chain.estimates == 2
+    assert gas_limit == int(100_000 * FeeCache.GAS_MARGIN)
+
+def test_fees():
+    fee_cache = FeeCache(CountingChain())
+    fee_cache.refresh()
+    assert fee_cache.fees() == {'maxFeePerGas': 22, 'maxPriorityFeePerGas': 2}
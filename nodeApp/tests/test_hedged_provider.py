@@ -0,0 +1,108 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from node.hedged_provider import HedgedProvider
+
+def stub_rpc_server(name, delay=0, status=200):
+    """Local JSON-RPC endpoint answering every request with its own name."""
+    class Handler(BaseHTTPRequestHandler):
+        calls = 0
+
+        def do_POST(self):
+            Handler.calls += 1
+            request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            time.sleep(delay)
+            body = json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": name}).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.handler = Handler
+    return server
+
+@pytest.fixture
+def servers():
+    started = []
+
+    def start(*args, **kwargs):
+        server = stub_rpc_server(*args, **kwargs)
+        started.append(server)
+        return f"http://127.0.0.1:{server.server_port}", server.handler
+
+    yield start
+    for server in started:
+        server.shutdown()
+
+def test_read_is_hedged_to_fast_endpoint(servers):
+    slow_uri, _ = servers("slow", delay=1)
+    fast_uri, _ = servers("fast")
+    provider = HedgedProvider([slow_uri, fast_uri])
+
+    start = time.monotonic()
+    response = provider.make_request('eth_blockNumber', [])
+    assert response['result'] == "fast"
+    assert time.monotonic() - start < 1
+
+def test_statistics_pick_primary(servers):
+    slow_uri, slow = servers("slow", delay=0.1)
+    fast_uri, _ = servers("fast")
+    provider = HedgedProvider([slow_uri, fast_uri])
+    provider.stats[slow_uri].record(0.1)
+    provider.stats[fast_uri].record(0.001)
+
+    assert provider.make_request('eth_chainId', [])['result'] == "fast"
+    assert slow.calls == 0
+
+def test_failover_on_error(servers):
+    broken_uri, _ = servers("broken", status=500)
+    good_uri, _ = servers("good")
+    provider = HedgedProvider([broken_uri, good_uri])
+
+    assert provider.make_request('eth_call', [])['result'] == "good"
+
+def test_writes_are_not_hedged(servers):
+    slow_uri, _ = servers("slow", delay=0.5)
+    other_uri, other = servers("other")
+    provider = HedgedProvider([slow_uri, other_uri])
+
+    assert provider.make_request('eth_sendRawTransaction', ["0x00"])['result'] == "slow"
+    assert other.calls == 0
+
+def test_failing_endpoint_is_ranked_last(servers):
+    broken_uri, _ = servers("broken", status=500)
+    good_uri, _ = servers("good")
+    provider = HedgedProvider([broken_uri, good_uri])
+    provider.stats[broken_uri].record(None)
+    provider.stats[good_uri].record(0.5)
+
+    assert [endpoint.endpoint_uri for endpoint in provider.ranked()] == [good_uri, broken_uri]
+
+def test_write_fails_over_when_endpoint_unreachable(servers):
+    broken_uri, _ = servers("broken", status=500)
+    good_uri, good = servers("good")
+    provider = HedgedProvider([broken_uri, good_uri])
+
+    assert provider.make_request('eth_sendRawTransaction', ["0x00"])['result'] == "good"
+    assert good.calls == 1
+
+def test_own_transaction_reads_stick_to_write_endpoint(servers):
+    first_uri, _ = servers("first", delay=0.5)
+    second_uri, second = servers("second")
+    provider = HedgedProvider([first_uri, second_uri])
+
+    provider.make_request('eth_sendRawTransaction', ["0x00"])
+    provider.stats[second_uri].record(0.001)
+    assert provider.make_request('eth_getTransactionCount', ["0x00", 'pending'])['result'] == "first"
+    assert provider.make_request('eth_getTransactionReceipt', ["0x00"])['result'] == "first"
+    assert second.calls == 0
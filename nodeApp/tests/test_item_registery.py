@@ -1,13 +1,16 @@
 import pytest
-from brownie import ItemRegistry, accounts, reverts
+from brownie import ItemRegistry, accounts, reverts, web3
+
+def user_id(public_key):
+    return web3.keccak(text=public_key)
 
 @pytest.fixture
 def item_registry():
     return ItemRegistry.deploy({'from': accounts[0]})
 
 def test_add_item(item_registry, accounts):
-    # Use a public key (could be a string like an address, etc.)
-    public_key = "user_public_key_1"  # Use Ethereum address as public key
+    # Owners are identified by the keccak256 of their public key
+    public_key = user_id("user_public_key_1")
 
     tx = item_registry.addItem("Electronics", "Smartphone", public_key, {'from': accounts[0]})
     itemId = tx.return_value
@@ -29,8 +32,8 @@ def test_get_nonexistent_item(item_registry):
         item_registry.getItem(999)
 
 def test_add_multiple_items(item_registry, accounts):
-    public_key1 = "user_public_key_2"
-    public_key2 = "user_public_key_3"
+    public_key1 = user_id("user_public_key_2")
+    public_key2 = user_id("user_public_key_3")
 
     # Add first item
     tx1 = item_registry.addItem("Books", "Blockchain Basics", public_key1, {'from': accounts[0]})
@@ -53,8 +56,8 @@ def test_add_multiple_items(item_registry, accounts):
     assert owner2 == public_key2
 
 def test_item_counter_increments_correctly(item_registry, accounts):
-    public_key1 = "user_public_key_4"
-    public_key2 = "user_public_key_5"
+    public_key1 = user_id("user_public_key_4")
+    public_key2 = user_id("user_public_key_5")
 
     # Add first item
     tx1 = item_registry.addItem("Category1", "Item A", public_key1, {'from': accounts[0]})
@@ -65,3 +68,47 @@ def test_item_counter_increments_correctly(item_registry, accounts):
     itemId2 = tx2.return_value
 
     assert itemId2 == itemId1 + 1  # Check that item counter is incremented correctly
+
+def test_add_items(item_registry, accounts):
+    item_registry.addItem("Books", "Blockchain Basics", user_id("user_public_key_6"), {'from': accounts[0]})
+
+    tx = item_registry.addItems(
+        ["Movies", "Music", "Games"],
+        ["Inception", "Thriller", "Tetris"],
+        [user_id("user_public_key_7"), user_id("user_public_key_8"), user_id("user_public_key_9")],
+        {'from': accounts[0]}
+    )
+    assert tx.return_value == (2, 3)
+    assert tx.events['ItemsAdded']['firstItemId'] == 2
+    assert item_registry.getItem(4) == ("Games", "Tetris", user_id("user_public_key_9"))
+
+    with reverts("length_mismatch"):
+        item_registry.addItems(["Movies"], ["Inception", "Thriller"], [user_id("user_public_key_7")], {'from': accounts[0]})
+
+def test_get_items(item_registry, accounts):
+    item_registry.addItems(
+        ["Books", "Movies", "Music"],
+        ["Blockchain Basics", "Inception", "Thriller"],
+        [user_id("user_public_key_10"), user_id("user_public_key_11"), user_id("user_public_key_12")],
+        {'from': accounts[0]}
+    )
+
+    itemIds, categories, itemInfos, owners, total = item_registry.getItems(2, 10)
+    assert list(itemIds) == [2, 3]
+    assert list(categories) == ["Movies", "Music"]
+    assert list(owners) == [user_id("user_public_key_11"), user_id("user_public_key_12")]
+    assert total == 3
+
+    itemIds, *_, total = item_registry.getItems(4, 10)
+    assert list(itemIds) == []
+    assert total == 3
+
+def test_add_items_gas_per_item(item_registry, accounts):
+    def items(count):
+        return (["Category"] * count, ["Item info"] * count, [user_id("user_public_key")] * count)
+
+    single = item_registry.addItem(*[column[0] for column in items(1)], {'from': accounts[0]}).gas_used
+    batch = item_registry.addItems(*items(50), {'from': accounts[0]}).gas_used
+
+    # The base transaction cost is paid once per batch
+    assert batch / 50 < single - 15000
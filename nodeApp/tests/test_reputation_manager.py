@@ -1,12 +1,15 @@
 import pytest
-from brownie import ReputationManager, accounts
+from brownie import ReputationManager, accounts, web3
+
+def user_id(public_key):
+    return web3.keccak(text=public_key)
 
 @pytest.fixture
 def reputation_manager():
     return ReputationManager.deploy({'from': accounts[0]})
 
 def test_update_and_get_reputation(reputation_manager, accounts):
-    user = "user_public_key_1"
+    user = user_id("user_public_key_1")
     field_id = 1
     score = 1
 
@@ -25,3 +28,67 @@ def test_update_and_get_reputation(reputation_manager, accounts):
     reputation_manager.updateReputation(user, field_id, -1, {'from': accounts[0]})
     recent_score = reputation_manager.getReputation(user, field_id)
     assert recent_score == 1
+
+def test_reputation_window_wraps(reputation_manager, accounts):
+    user = user_id("user_public_key_2")
+    window = reputation_manager.MAX_RECENT_SCORES()
+
+    for _ in range(window):
+        reputation_manager.updateReputation(user, 1, 1, {'from': accounts[0]})
+    assert reputation_manager.getReputation(user, 1) == window
+
+    # Every new score evicts the oldest one
+    for i in range(1, window // 2 + 1):
+        reputation_manager.updateReputation(user, 1, -1, {'from': accounts[0]})
+        assert reputation_manager.getReputation(user, 1) == window - 2 * i
+
+def test_get_reputation_gas_does_not_grow_with_history(reputation_manager, accounts):
+    user = user_id("user_public_key_3")
+
+    reputation_manager.updateReputation(user, 1, 1, {'from': accounts[0]})
+    gas_short_history = reputation_manager.getReputation.estimate_gas(user, 1)
+
+    for _ in range(reputation_manager.MAX_RECENT_SCORES() + 10):
+        reputation_manager.updateReputation(user, 1, 1, {'from': accounts[0]})
+    gas_long_history = reputation_manager.getReputation.estimate_gas(user, 1)
+
+    # A single storage read, no loop over the recent scores
+    assert gas_long_history == gas_short_history
+    assert gas_long_history < 30000
+
+def test_update_reputation_gas_stays_flat_when_window_is_full(reputation_manager, accounts):
+    user = user_id("user_public_key_4")
+    window = reputation_manager.MAX_RECENT_SCORES()
+
+    gas_used = [
+        reputation_manager.updateReputation(user, 1, 1, {'from': accounts[0]}).gas_used
+        for _ in range(window + 2)
+    ]
+
+    # Evicting a score costs one extra read, not a pass over the window
+    assert gas_used[window] - gas_used[window - 1] < 5000
+    assert gas_used[window + 1] == gas_used[window]
+
+def test_packed_scores_keep_their_sign(reputation_manager, accounts):
+    user = user_id("user_public_key_5")
+    window = reputation_manager.MAX_RECENT_SCORES()
+
+    reputation_manager.updateReputations([user] * window, 1, [-128] * window, {'from': accounts[0]})
+    assert reputation_manager.getReputation(user, 1) == -128 * window
+
+    # Neighbouring scores in the same word are left untouched
+    reputation_manager.updateReputation(user, 1, 127, {'from': accounts[0]})
+    assert reputation_manager.getReputation(user, 1) == -128 * (window - 1) + 127
+    reputation_manager.updateReputation(user, 1, -1, {'from': accounts[0]})
+    assert reputation_manager.getReputation(user, 1) == -128 * (window - 2) + 127 - 1
+
+def test_update_reputation_writes_few_slots(reputation_manager, accounts):
+    user = user_id("user_public_key_6")
+
+    # Counters share one slot and 32 scores share a word: a fresh user costs
+    # two new slots, the next scores only rewrite them
+    first = reputation_manager.updateReputation(user, 1, 1, {'from': accounts[0]}).gas_used
+    second = reputation_manager.updateReputation(user, 1, 1, {'from': accounts[0]}).gas_used
+
+    assert first < 80000
+    assert second < 40000
@@ -0,0 +1,126 @@
+import time
+
+import pytest
+
+from node.transaction_queue import TransactionQueue, TxStatus
+
+class StubChain:
+    """Chain whose receipts are set by the test."""
+    def __init__(self):
+        self.sent = []
+        self.receipts = {}
+        self.market_fees = {'maxFeePerGas': 100, 'maxPriorityFeePerGas': 10}
+
+    def get_transaction_count(self):
+        return 7
+
+    def fees(self):
+        return dict(self.market_fees)
+
+    def build_transaction(self, contract, function, args, nonce, fees):
+        return {'function': function, 'nonce': nonce, **fees}
+
+    def build_cancel_transaction(self, nonce, fees):
+        return {'function': None, 'nonce': nonce, **fees}
+
+    def send_transaction(self, tx):
+        self.sent.append(tx)
+        return f"0x{len(self.sent)}"
+
+    def get_receipt(self, tx_hash):
+        return self.receipts.get(tx_hash)
+
+@pytest.fixture
+def chain():
+    return StubChain()
+
+@pytest.fixture
+def transaction_queue(chain, monkeypatch):
+    monkeypatch.setattr(TransactionQueue, 'POLL_INTERVAL', 0.01)
+    transaction_queue = TransactionQueue(chain)
+    transaction_queue.start()
+    yield transaction_queue
+    transaction_queue.stop()
+
+def wait_until(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+def test_mined(chain, transaction_queue):
+    ticket = transaction_queue.submit('ItemRegistry', 'addItem', 1)
+    assert wait_until(lambda: chain.sent)
+    chain.receipts["0x1"] = {'status': 1, 'blockNumber': 5}
+
+    ticket = transaction_queue.wait(ticket.ticket_id, 2)
+    assert ticket.status == TxStatus.MINED
+    assert (ticket.nonce, ticket.block_number) == (7, 5)
+
+def test_reverted_transaction_fails(chain, transaction_queue):
+    ticket = transaction_queue.submit('ItemRegistry', 'addItem', 1)
+    assert wait_until(lambda: chain.sent)
+    chain.receipts["0x1"] = {'status': 0, 'blockNumber': 5}
+
+    ticket = transaction_queue.wait(ticket.ticket_id, 2)
+    assert ticket.status == TxStatus.FAILED
+    assert ticket.error == "Transaction reverted."
+
+def test_stuck_transaction_is_replaced_with_bumped_fees(chain, transaction_queue, monkeypatch):
+    monkeypatch.setattr(TransactionQueue, 'RESUBMIT_AFTER', 0.05)
+    ticket = transaction_queue.submit('ItemRegistry', 'addItem', 1)
+    assert wait_until(lambda: len(chain.sent) >= 2)
+
+    first, replacement = chain.sent[:2]
+    assert replacement['nonce'] == first['nonce']
+    assert replacement['maxFeePerGas'] == int(100 * TransactionQueue.FEE_BUMP) + 1
+    assert replacement['maxPriorityFeePerGas'] == int(10 * TransactionQueue.FEE_BUMP) + 1
+
+    # The first broadcast may still be the one that gets mined
+    chain.receipts["0x1"] = {'status': 1, 'blockNumber': 5}
+    ticket = transaction_queue.wait(ticket.ticket_id, 2)
+    assert ticket.status == TxStatus.MINED
+    assert "0x1" in ticket.replaced_hashes
+
+def test_fee_bump_pays_at_least_market_fees(chain, transaction_queue, monkeypatch):
+    monkeypatch.setattr(TransactionQueue, 'RESUBMIT_AFTER', 0.05)
+    transaction_queue.submit('ItemRegistry', 'addItem', 1)
+    assert wait_until(lambda: chain.sent)
+    chain.market_fees = {'maxFeePerGas': 1000, 'maxPriorityFeePerGas': 10}
+
+    assert wait_until(lambda: len(chain.sent) >= 2)
+    assert chain.sent[1]['maxFeePerGas'] == 1000
+
+def test_gives_up_after_max_attempts(chain, transaction_queue, monkeypatch):
+    monkeypatch.setattr(TransactionQueue, 'RESUBMIT_AFTER', 0.01)
+    ticket = transaction_queue.submit('ItemRegistry', 'addItem', 1)
+
+    ticket = transaction_queue.wait(ticket.ticket_id, 2)
+    assert ticket.status == TxStatus.FAILED
+    assert ticket.error == "Transaction not mined."
+    assert len(chain.sent) == TransactionQueue.MAX_ATTEMPTS + 1
+
+    # The nonce is taken by an empty transaction outbidding the last attempt,
+    # so a dropped transaction leaves no gap
+    *attempts, cancel = chain.sent
+    assert cancel['function'] is None
+    assert cancel['nonce'] == ticket.nonce
+    assert cancel['maxFeePerGas'] > attempts[-1]['maxFeePerGas']
+
+    next_ticket = transaction_queue.submit('ItemRegistry', 'addItem', 2)
+    assert wait_until(lambda: len(chain.sent) > TransactionQueue.MAX_ATTEMPTS + 1)
+    assert transaction_queue.get(next_ticket.ticket_id).nonce == ticket.nonce + 1
+
+def test_finished_tickets_expire(chain, transaction_queue, monkeypatch):
+    monkeypatch.setattr(TransactionQueue, 'MAX_FINISHED_TICKETS', 2)
+    tickets = [transaction_queue.submit('ItemRegistry', 'addItem', i) for i in range(3)]
+    assert wait_until(lambda: len(chain.sent) == 3)
+    pending = transaction_queue.submit('ItemRegistry', 'addItem', 3)
+    chain.receipts.update({f"0x{i}": {'status': 1, 'blockNumber': i} for i in range(1, 4)})
+
+    assert wait_until(lambda: transaction_queue.get(tickets[0].ticket_id) is None)
+    assert transaction_queue.get(tickets[2].ticket_id).status == TxStatus.MINED
+    # Unfinished tickets are kept whatever their number
+    assert transaction_queue.get(pending.ticket_id) is not None
@@ -1,5 +1,8 @@
 import pytest
-from brownie import UserRegistry, accounts, reverts
+from brownie import UserRegistry, accounts, reverts, web3
+
+def user_id(public_key):
+    return web3.keccak(text=public_key)
 
 @pytest.fixture
 def user_registry():
@@ -15,6 +18,11 @@ def test_register_user(user_registry, accounts):
     tx = user_registry.registerUser(nick, public_key, additional_data, is_bot, {'from': accounts[0]})
     assert "register_success" in tx.return_value
 
+    # The public key itself is only published in the event
+    assert tx.events['UserRegistered']['userId'] == user_id(public_key)
+    assert tx.events['UserRegistered']['public_key'] == public_key
+    assert user_registry.getUserIdByNick(nick) == user_id(public_key)
+
     # Try to register the same nick (should fail)
     with reverts("nick_already_taken"):
         user_registry.registerUser(nick, public_key, "Other data", is_bot, {'from': accounts[0]})
@@ -32,9 +40,10 @@ def test_get_user_info(user_registry, accounts):
     user_registry.registerUser(nick, public_key, additional_data, is_bot, {'from': accounts[0]})
 
     # Retrieve and check user info
-    public_key_returned, expert_fields, additional_data_returned, is_bot_returned = user_registry.getUserInfo(nick)
+    nick_returned, expert_fields, additional_data_returned, is_bot_returned = user_registry.getUserInfo(user_id(public_key))
 
-    assert public_key_returned == public_key  # Check the public key
+    assert nick_returned == nick
+    assert user_registry.getNickByAddress(user_id(public_key)) == nick
     assert additional_data_returned == additional_data
     assert is_bot_returned == is_bot
 
@@ -44,17 +53,37 @@ def test_add_expert_field(user_registry, accounts):
     user_registry.registerUser(nick, public_key, "Data", False, {'from': accounts[0]})
 
     # Add expert field 1
-    user_registry.addExpertField(nick, 1, {'from': accounts[0]})
-    _, expert_fields, _, _ = user_registry.getUserInfo(nick)
+    user_registry.addExpertField(user_id(public_key), 1, {'from': accounts[0]})
+    _, expert_fields, _, _ = user_registry.getUserInfo(user_id(public_key))
 
     assert expert_fields == [1]
 
     # Add expert field 2
-    user_registry.addExpertField(nick, 2, {'from': accounts[0]})
-    _, expert_fields, _, _ = user_registry.getUserInfo(nick)
+    user_registry.addExpertField(user_id(public_key), 2, {'from': accounts[0]})
+    _, expert_fields, _, _ = user_registry.getUserInfo(user_id(public_key))
 
     assert expert_fields == [1, 2]
 
     # Try to add the same expert field again (should fail)
     with reverts("field_already_added"):
-        user_registry.addExpertField(nick, 1, {'from': accounts[0]})
+        user_registry.addExpertField(user_id(public_key), 1, {'from': accounts[0]})
+
+def test_get_voter_eligibility(user_registry, accounts):
+    user_registry.registerUser("Dave", "dave_public_key", "Data", True, {'from': accounts[0]})
+    user_registry.addExpertField(user_id("dave_public_key"), 3, {'from': accounts[0]})
+
+    assert user_registry.getVoterEligibility(user_id("dave_public_key"), 3) == (True, True, True)
+    assert user_registry.getVoterEligibility(user_id("dave_public_key"), 4) == (True, True, False)
+    assert user_registry.getVoterEligibility(user_id("unknown_public_key"), 3) == (False, False, False)
+
+def test_register_user_gas_does_not_store_public_key(user_registry, accounts):
+    # A 2048 bit RSA key in PEM format is about 450 bytes
+    short_key = "k" * 32
+    long_key = "k" * 480
+
+    gas_short = user_registry.registerUser("Short", short_key, "Data", False, {'from': accounts[0]}).gas_used
+    gas_long = user_registry.registerUser("Long", long_key, "Data", False, {'from': accounts[0]}).gas_used
+
+    # Only calldata, hashing and the event grow with the key; storing it
+    # would cost 20000 gas per 32 bytes
+    assert (gas_long - gas_short) / (len(long_key) - len(short_key)) < 40
@@ -0,0 +1,39 @@
+from eth_account import Account
+from web3 import Web3
+from web3.providers.base import BaseProvider
+
+from node.user_regitry_interface import UserRegistryInterface
+
+class RecordingProvider(BaseProvider):
+    """Provider accepting every raw transaction broadcast to it."""
+    def __init__(self):
+        super().__init__()
+        self.raw_transactions = []
+
+    def make_request(self, method, params):
+        assert method == 'eth_sendRawTransaction'
+        self.raw_transactions.append(params[0])
+        return {'jsonrpc': '2.0', 'id': 1, 'result': '0x' + '11' * 32}
+
+def test_send_transaction_signs_with_local_account():
+    provider = RecordingProvider()
+    interface = UserRegistryInterface()
+    interface.web3 = Web3(provider)
+    interface.account = Account.create()
+    interface._setup_done.set()
+
+    tx = {
+        'type': 2,
+        'chainId': 1,
+        'to': '0x' + '22' * 20,
+        'data': '0x',
+        'value': 0,
+        'nonce': 3,
+        'gas': 21000,
+        'maxFeePerGas': 20,
+        'maxPriorityFeePerGas': 2,
+    }
+    assert interface.send_transaction(tx) == '11' * 32
+
+    [raw_transaction] = provider.raw_transactions
+    assert Account.recover_transaction(raw_transaction) == interface.account.address